@@ -4,6 +4,7 @@ Bootcamp F2025
 Main process to setup and manage all the other working processes
 """
 
+import logging
 import multiprocessing as mp
 import queue
 import time
@@ -15,9 +16,18 @@ from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.command import command
 from modules.command import command_worker
-from modules.heartbeat import heartbeat_receiver_worker
-from modules.heartbeat import heartbeat_sender_worker
+from modules.command import decision
+from modules.heartbeat import connection_state
+from modules.heartbeat import link_supervisor_worker
+from modules.replay import tlog_replay
+from modules.router import message_router_worker
+from modules.router import routed_connection
+from modules.telemetry import telemetry
 from modules.telemetry import telemetry_worker
+from utilities.workers import latency_histogram
+from utilities.workers import latency_stamps
+from utilities.workers import latest_value_slot
+from utilities.workers import periodic_scheduler
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from utilities.workers import worker_manager
@@ -25,6 +35,10 @@ from utilities.workers import worker_manager
 
 # MAVLink connection
 CONNECTION_STRING = "tcp:localhost:12345"
+# Replay a recorded .tlog instead of connecting to the drone, None to connect
+REPLAY_TLOG_PATH = None
+# How many times faster than recorded to replay, <= 0 for as fast as possible
+REPLAY_SPEED = 1
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
@@ -32,20 +46,44 @@ CONNECTION_STRING = "tcp:localhost:12345"
 # Set queue max sizes (<= 0 for infinity)
 
 QUEUE_MAX_SIZE = 10
+# What carries items between workers, see tests/benchmark/benchmark_queue_backends.py
+QUEUE_BACKEND = queue_proxy_wrapper.QueueBackend.MANAGER
 
 # Set worker counts
-HEARTBEAT_SENDER_WORKER_COUNT = 1
-HEARTBEAT_RECEIVER_WORKER_COUNT = 1
+MESSAGE_ROUTER_WORKER_COUNT = 1  # Must be 1, the router is the only reader of the connection
+# Sends heartbeats and monitors the drone's heartbeats
+LINK_SUPERVISOR_WORKER_COUNT = 1
 TELEMETRY_WORKER_COUNT = 1
 COMMAND_WORKER_COUNT = 1
 
 # Any other constants
-TARGET = command.Position(10, 20, 30)
+# Longest time between connection events while the state does not change, None for only changes
+HEARTBEAT_KEEPALIVE_PERIOD = 30  # seconds
+# Disconnect once the heartbeat being this late has phi accrual suspicion at least this,
+# phi 5 is a 1 in 100 000 chance, None to disconnect after 5 missed heartbeats
+HEARTBEAT_PHI_THRESHOLD = 5
+# Target of each vehicle, keyed by MAVLink system ID
+TARGETS = {1: command.Position(10, 20, 30)}
 HEIGHT_TOLERANCE = 0.5
 Z_SPEED = 1
 ANGLE_TOLERANCE = 5
 TURNING_SPEED = 5
+# How long to wait for a COMMAND_ACK, and how many times to send an unacknowledged command again
+COMMAND_ACK_TIMEOUT = 1  # seconds
+COMMAND_RETRIES = 2
+TELEMETRY_MODE = telemetry.TelemetryMode.STREAMING
+TELEMETRY_BATCH_SIZE = 1
+# Rates (Hz) to request from the drone, lowered while command lags behind, None to leave unchanged
+TELEMETRY_ATTITUDE_RATE = 10
+TELEMETRY_POSITION_RATE = 10
+# Command only acts on the newest telemetry, so share it directly instead of queueing every sample
+# The slot holds one vehicle, use the queue when TARGETS has several
+USE_LATEST_TELEMETRY_SLOT = True
+# Without the slot, only decide on the newest queued telemetry of each vehicle, skipping stale ones
+CONFLATE_COMMAND_INPUT = True
 RUN_TIME = 100
+# How often to log the time spent in each pipeline stage, also logged on exit
+LATENCY_REPORT_PERIOD = 10  # seconds
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -79,7 +117,14 @@ def main() -> int:
     # To test, you will run each of your workers individually to see if they work
     # (test "drones" are provided for you test your workers)
     # NOTE: If you want to have type annotations for the connection, it is of type mavutil.mavfile
-    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    if REPLAY_TLOG_PATH is None:
+        connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    else:
+        result, connection = tlog_replay.TlogReplay.create(REPLAY_TLOG_PATH, REPLAY_SPEED)
+        if not result:
+            print("ERROR: Failed to open replay log")
+            return -1
+
     connection.wait_heartbeat(timeout=30)  # Wait for the "drone" to connect
 
     # =============================================================================================
@@ -88,38 +133,97 @@ def main() -> int:
     # Create a worker controller
     controller = worker_controller.WorkerController()
 
-    # Create a multiprocess manager for synchronized queues
+    # Create a multiprocess manager for synchronized queues, only used by the manager backend
     mp_manager = mp.Manager()
 
     # Create queues
+    router_to_heartbeat_receiver_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
+    )
+    router_to_telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
+    )
+    router_to_command_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
+    )
+    message_router_output_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
+    )
     heartbeat_receiver_output_queue = queue_proxy_wrapper.QueueProxyWrapper(
-        mp_manager, QUEUE_MAX_SIZE
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
+    )
+    telemetry_output_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
+    )
+    command_output_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, QUEUE_MAX_SIZE, QUEUE_BACKEND
     )
-    telemetry_output_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
-    command_output_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+
+    latest_telemetry_slot = None
+    if USE_LATEST_TELEMETRY_SLOT:
+        if len(TARGETS) > 1:
+            print("ERROR: Latest telemetry slot holds one vehicle, use the queue for several")
+            return -1
+
+        result, latest_telemetry_slot = latest_value_slot.LatestValueSlot.create(
+            telemetry.TelemetryData.RECORD_SIZE
+        )
+        if not result:
+            print("Failed to create latest telemetry slot")
+            return -1
+
+    result, latency_histograms = latency_histogram.LatencyHistograms.create(
+        latency_stamps.HISTOGRAM_NAMES
+    )
+    if not result:
+        print("Failed to create latency histograms")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert latency_histograms is not None
+
+    # Workers that read from the drone get their messages from the router
+    heartbeat_receiver_connection = routed_connection.RoutedConnection(
+        connection, router_to_heartbeat_receiver_queue
+    )
+    telemetry_connection = routed_connection.RoutedConnection(connection, router_to_telemetry_queue)
+    command_connection = routed_connection.RoutedConnection(connection, router_to_command_queue)
 
     # Create worker properties for each worker type (what inputs it takes, how many workers)
-    # Heartbeat sender
-    result, heartbeat_sender_properties = worker_manager.WorkerProperties.create(
-        count=HEARTBEAT_SENDER_WORKER_COUNT,
-        target=heartbeat_sender_worker.heartbeat_sender_worker,
-        work_arguments=(connection,),
+    # Message router
+    result, message_router_properties = worker_manager.WorkerProperties.create(
+        count=MESSAGE_ROUTER_WORKER_COUNT,
+        target=message_router_worker.message_router_worker,
+        work_arguments=(
+            connection,
+            [
+                (["HEARTBEAT"], router_to_heartbeat_receiver_queue),
+                (["ATTITUDE", "LOCAL_POSITION_NED"], router_to_telemetry_queue),
+                (["COMMAND_ACK"], router_to_command_queue),
+            ],
+            message_router_output_queue,
+        ),
         input_queues=[],
-        output_queues=[],
+        output_queues=[message_router_output_queue],
         controller=controller,
         local_logger=main_logger,
     )
 
     if not result:
-        print("Failed to create arguments for Heartbeat sender")
+        print("Failed to create arguments for Message router")
         return -1
 
-    assert heartbeat_sender_properties is not None
-    # Heartbeat receiver
-    result, heartbeat_receiver_properties = worker_manager.WorkerProperties.create(
-        count=HEARTBEAT_RECEIVER_WORKER_COUNT,
-        target=heartbeat_receiver_worker.heartbeat_receiver_worker,
-        work_arguments=(connection,),
+    assert message_router_properties is not None
+    # Link supervisor
+    result, link_supervisor_properties = worker_manager.WorkerProperties.create(
+        count=LINK_SUPERVISOR_WORKER_COUNT,
+        target=link_supervisor_worker.link_supervisor_worker,
+        work_arguments=(
+            connection,
+            heartbeat_receiver_connection,
+            HEARTBEAT_KEEPALIVE_PERIOD,
+            HEARTBEAT_PHI_THRESHOLD,
+        ),
         input_queues=[],
         output_queues=[heartbeat_receiver_output_queue],
         controller=controller,
@@ -127,15 +231,22 @@ def main() -> int:
     )
 
     if not result:
-        print("Failed to create arguments for Heartbeat receiver")
+        print("Failed to create arguments for Link supervisor")
         return -1
 
-    assert heartbeat_receiver_properties is not None
+    assert link_supervisor_properties is not None
     # Telemetry
     result, telemetry_properties = worker_manager.WorkerProperties.create(
         count=TELEMETRY_WORKER_COUNT,
         target=telemetry_worker.telemetry_worker,
-        work_arguments=(connection,),
+        work_arguments=(
+            telemetry_connection,
+            TELEMETRY_MODE,
+            TELEMETRY_BATCH_SIZE,
+            TELEMETRY_ATTITUDE_RATE,
+            TELEMETRY_POSITION_RATE,
+            latest_telemetry_slot,
+        ),
         input_queues=[],
         output_queues=[telemetry_output_queue],
         controller=controller,
@@ -152,12 +263,17 @@ def main() -> int:
         count=COMMAND_WORKER_COUNT,
         target=command_worker.command_worker,
         work_arguments=(
-            connection,
-            TARGET,
+            command_connection,
+            TARGETS,
             HEIGHT_TOLERANCE,
             Z_SPEED,
             ANGLE_TOLERANCE,
             TURNING_SPEED,
+            COMMAND_ACK_TIMEOUT,
+            COMMAND_RETRIES,
+            latest_telemetry_slot,
+            latency_histograms,
+            CONFLATE_COMMAND_INPUT,
         ),
         input_queues=[telemetry_output_queue],
         output_queues=[command_output_queue],
@@ -172,27 +288,27 @@ def main() -> int:
     assert command_properties is not None
 
     # Create the workers (processes) and obtain their managers
-    result, heartbeat_sender_manager = worker_manager.WorkerManager.create(
-        worker_properties=heartbeat_sender_properties,
+    result, message_router_manager = worker_manager.WorkerManager.create(
+        worker_properties=message_router_properties,
         local_logger=main_logger,
     )
 
     if not result:
-        print("Failed to create manger for Heartbeat sender")
+        print("Failed to create manger for Message router")
         return -1
 
-    assert heartbeat_sender_manager is not None
+    assert message_router_manager is not None
 
-    result, heartbeat_receiver_manager = worker_manager.WorkerManager.create(
-        worker_properties=heartbeat_receiver_properties,
+    result, link_supervisor_manager = worker_manager.WorkerManager.create(
+        worker_properties=link_supervisor_properties,
         local_logger=main_logger,
     )
 
     if not result:
-        print("Failed to create manger for Heartbeat receiver")
+        print("Failed to create manger for Link supervisor")
         return -1
 
-    assert heartbeat_receiver_manager is not None
+    assert link_supervisor_manager is not None
 
     result, telemetry_manager = worker_manager.WorkerManager.create(
         worker_properties=telemetry_properties,
@@ -217,8 +333,8 @@ def main() -> int:
     assert command_manager is not None
 
     # Start worker processes
-    heartbeat_sender_manager.start_workers()
-    heartbeat_receiver_manager.start_workers()
+    message_router_manager.start_workers()
+    link_supervisor_manager.start_workers()
     telemetry_manager.start_workers()
     command_manager.start_workers()
 
@@ -226,20 +342,54 @@ def main() -> int:
 
     # Main's work: read from all queues that output to main, and log any commands that we make
     # Continue running for 100 seconds or until the drone disconnects
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(controller)
+    if not result:
+        print("Failed to create PeriodicScheduler")
+        return -1
+
+    assert scheduler is not None
+
+    def log_latency() -> None:
+        for line in latency_histograms.report():
+            main_logger.info(f"Latency {line}")
+
+    scheduler.add("latency report", LATENCY_REPORT_PERIOD, log_latency, LATENCY_REPORT_PERIOD)
+
     start_time = time.time()
     is_connected = True
 
     while time.time() - start_time < RUN_TIME and is_connected:
-        try:
-            status = heartbeat_receiver_output_queue.queue.get(timeout=0.1)
-            main_logger.info(f"Heartbeat status: {status}")
+        scheduler.run_due()
 
-            if status == "Disconnected":
-                is_connected = False
+        # Link quality of every source on the link, published with each router rate report
+        try:
+            snapshots = message_router_output_queue.queue.get_nowait()
+            if snapshots is not None:
+                for snapshot in snapshots:
+                    main_logger.info(f"Link quality {snapshot}")
+        except queue.Empty:
+            pass
 
-            command_status = command_output_queue.queue.get(timeout=0.1)
-            main_logger.info(f"Command: {command_status}")
+        # Connection events only arrive when the state changes, or as an occasional keepalive
+        try:
+            event = heartbeat_receiver_output_queue.queue.get_nowait()
+            if event is not None:
+                main_logger.info(f"Heartbeat {event}")
+
+                # One of several vehicles or components going silent does not end the run
+                if (
+                    isinstance(event, connection_state.ConnectionEvent)
+                    and event.kind == connection_state.ConnectionEventKind.DISCONNECTED
+                ):
+                    is_connected = False
+        except queue.Empty:
+            pass
 
+        try:
+            command_record = command_output_queue.queue.get(timeout=0.1)
+            # Decisions arrive as binary records, only format them if they will be logged
+            if command_record is not None and main_logger.logger.isEnabledFor(logging.INFO):
+                main_logger.info(f"Command: {decision.DecisionRecord.from_bytes(command_record)}")
         except queue.Empty:
             pass
 
@@ -253,16 +403,29 @@ def main() -> int:
     command_output_queue.fill_and_drain_queue()
     telemetry_output_queue.fill_and_drain_queue()
     heartbeat_receiver_output_queue.fill_and_drain_queue()
+    message_router_output_queue.fill_and_drain_queue()
+    router_to_command_queue.fill_and_drain_queue()
+    router_to_telemetry_queue.fill_and_drain_queue()
+    router_to_heartbeat_receiver_queue.fill_and_drain_queue()
 
     main_logger.info("Queues cleared")
 
     # Clean up worker processes
 
-    heartbeat_sender_manager.join_workers()
-    heartbeat_receiver_manager.join_workers()
+    message_router_manager.join_workers()
+    link_supervisor_manager.join_workers()
     telemetry_manager.join_workers()
     command_manager.join_workers()
 
+    if latest_telemetry_slot is not None:
+        latest_telemetry_slot.close()
+        latest_telemetry_slot.unlink()
+
+    log_latency()
+
+    latency_histograms.close()
+    latency_histograms.unlink()
+
     main_logger.info("Stopped")
 
     # We can reset controller in case we want to reuse it
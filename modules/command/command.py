@@ -2,10 +2,19 @@
 Decision-making logic.
 """
 
+import logging
 import math
+import time
 
+import numpy as np
 from pymavlink import mavutil
 
+from utilities.mavlink import frame_templates
+from utilities.workers import latency_stamps
+from . import command_filter
+from . import decision
+from . import pending_commands
+from . import vehicle_table
 from ..common.modules.logger import logger
 from ..telemetry import telemetry
 
@@ -32,28 +41,83 @@ class Command:  # pylint: disable=too-many-instance-attributes
 
     __private_key = object()
 
+    # Vehicle that telemetry without a system ID is from
+    DEFAULT_SYSTEM_ID = 1
+
+    # Same command is sent again after this long in flight, in case it was lost,
+    # unless it is still waiting on an acknowledgement and is retried from the pending table
+    __RESEND_TIMEOUT = 1  # seconds
+    # Smallest change in target that is a different command
+    __ALTITUDE_CHANGE_THRESHOLD = 0.1  # m
+    __HEADING_CHANGE_THRESHOLD = 1  # deg
+    # Fraction to narrow a tolerance by while correcting it
+    __HYSTERESIS = 0.5
+
+    DEFAULT_ACK_TIMEOUT = 1  # seconds
+    # Longest a command in progress may take, e.g. turning 180 deg at 5 deg/s
+    __RESULT_TIMEOUT = 60  # seconds
+    # Acknowledgement latencies kept for percentiles
+    __ACK_LATENCY_WINDOW_SIZE = 1000
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
-        target: Position,
+        targets: "dict[int, Position]",
         height_tolerance: float,
         z_speed: float,
         angle_tolerance: float,
         turning_speed: float,
         local_logger: logger.Logger,
+        ack_timeout: float = DEFAULT_ACK_TIMEOUT,
+        command_retries: int = 0,
     ) -> "tuple[bool, Command | None]":
         """
         Falliable create (instantiation) method to create a Command object.
+
+        targets are the target positions of each vehicle keyed by MAVLink system ID.
+        ack_timeout is how long (s) to wait for a COMMAND_ACK before sending the command again.
+        command_retries is how many times to send an unacknowledged command again, 0 to never.
+        Relative yaw commands are never sent again, the next telemetry decides a new angle.
         """
         if connection is None:
             local_logger.error("Connection is None", True)
             return False, None
 
+        result, vehicles = vehicle_table.VehicleTable.create(
+            {system_id: (target.x, target.y, target.z) for system_id, target in targets.items()}
+        )
+        if not result:
+            local_logger.error("Failed to create vehicle table", True)
+            return False, None
+
+        command_filters = []
+        for _ in range(len(vehicles)):
+            result, new_filter = command_filter.CommandFilter.create(
+                cls.__RESEND_TIMEOUT,
+                cls.__ALTITUDE_CHANGE_THRESHOLD,
+                cls.__HEADING_CHANGE_THRESHOLD,
+                cls.__HYSTERESIS,
+            )
+            if not result:
+                local_logger.error("Failed to create command filter", True)
+                return False, None
+
+            command_filters.append(new_filter)
+
+        result, pending = pending_commands.PendingCommands.create(
+            ack_timeout, cls.__RESULT_TIMEOUT, command_retries, cls.__ACK_LATENCY_WINDOW_SIZE
+        )
+        if not result:
+            local_logger.error("Failed to create pending command table", True)
+            return False, None
+
         return True, Command(
             cls.__private_key,
             connection,
-            target,
+            vehicles,
+            command_filters,
+            pending,
             height_tolerance,
             z_speed,
             angle_tolerance,
@@ -65,7 +129,9 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self,
         key: object,
         connection: mavutil.mavfile,
-        target: Position,
+        vehicles: vehicle_table.VehicleTable,
+        command_filters: "list[command_filter.CommandFilter]",
+        pending: pending_commands.PendingCommands,
         height_tolerance: float,
         z_speed: float,
         angle_tolerance: float,
@@ -75,106 +141,272 @@ class Command:  # pylint: disable=too-many-instance-attributes
         assert key is Command.__private_key, "Use create() method"
 
         self.__connection = connection
-        self.__target = target
+        # Targets and average velocity of each vehicle
+        self.__vehicles = vehicles
+        # Command in flight to each vehicle, by row
+        self.__command_filters = command_filters
+        # Commands sent and not yet acknowledged
+        self.__pending = pending
+        # Pre-packed COMMAND_LONG of each (system ID, command ID), None if the link does not allow
+        self.__frame_templates: "dict[tuple[int, int], frame_templates.FrameTemplate | None]" = {}
         self.__height_tolerance = height_tolerance
         self.__z_speed = z_speed
         self.__angle_tolerance = angle_tolerance
         self.__turning_speed = turning_speed
         self.__logger = local_logger
 
-        # For tracking average velocity
-        self.__velocity_samples = []
-
     def run(
         self,
         telemetry_data: telemetry.TelemetryData,
-    ) -> "tuple[bool, str]":
+    ) -> "tuple[True, decision.DecisionRecord] | tuple[False, None]":
         """
-        Make a decision based on received telemetry data.
+        Make a decision based on received telemetry data, for the vehicle that sent it.
         """
+        system_id = telemetry_data.system_id
+        if system_id is None:
+            system_id = self.DEFAULT_SYSTEM_ID
+
+        row = self.__vehicles.row(system_id)
+        if row is None:
+            self.__logger.warning(f"No target for system {system_id}", True)
+            return False, None
+
+        target = self.__vehicles.target(row)
+
         # Log average velocity for this trip so far
-        self.__velocity_samples.append(
+        velocity_statistics = self.__vehicles.velocity_statistics[row]
+        velocity_statistics.add(
             (telemetry_data.x_velocity, telemetry_data.y_velocity, telemetry_data.z_velocity)
         )
+        # Only format it if it will be logged
+        if self.__logger.logger.isEnabledFor(logging.INFO):
+            avg_x, avg_y, avg_z = velocity_statistics.mean()
+            self.__logger.info(
+                f"Average velocity of system {system_id}: ({avg_x}, {avg_y}, {avg_z}) m/s", True
+            )
 
-        sum_x = 0
-        sum_y = 0
-        sum_z = 0
-        velocity_len = len(self.__velocity_samples)
+        # Use COMMAND_LONG (76) message to the vehicle, with target_componenet=0
+        # The appropriate commands to use are instructed below
 
-        for velocity in self.__velocity_samples:
-            sum_x += velocity[0]
-            sum_y += velocity[1]
-            sum_z += velocity[2]
+        # Commands already in flight are not sent again unless they changed
+        vehicle_filter = self.__command_filters[row]
+        height_tolerance, angle_tolerance = vehicle_filter.tolerances(
+            self.__height_tolerance, self.__angle_tolerance
+        )
+        current_decision, altitude_delta, angle_delta_deg = decision.decide(
+            target,
+            (telemetry_data.x, telemetry_data.y, telemetry_data.z),
+            telemetry_data.yaw,
+            height_tolerance,
+            angle_tolerance,
+        )
+        self.__stamp(telemetry_data, latency_stamps.Stage.DECISION)
 
-        avg_x = sum_x / velocity_len
-        avg_y = sum_y / velocity_len
-        avg_z = sum_z / velocity_len
+        now = time.time()
+        is_sent = False
 
-        self.__logger.info(f"Average velocity: ({avg_x}, {avg_y}, {avg_z}) m/s", True)
+        # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
+        # Returned to main as the decision record, logged as
+        # "CHANGE_ALTITUDE: {amount you changed it by, delta height in meters}"
+
+        if current_decision == decision.Decision.CHANGE_ALTITUDE:
+            is_sent = vehicle_filter.should_send(
+                current_decision,
+                target[2],
+                altitude_delta,
+                now,
+                self.__pending.is_pending(system_id, mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT),
+            )
+            if is_sent:
+                self.__send(
+                    system_id,
+                    mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
+                    (self.__z_speed, 0, 0, 0, 0, 0, target[2]),
+                    now,
+                )
+
+        # Adjust direction (yaw) using MAV_CMD_CONDITION_YAW (115).
+        # Must use relative angle to current state
+        # Returned to main as the decision record, logged as
+        # "CHANGING_YAW: {degree you changed it by in range [-180, 180]}"
+        # Positive angle is counter-clockwise as in a right handed system
 
-        # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
-        # The appropriate commands to use are instructed below
+        elif current_decision == decision.Decision.CHANGING_YAW:
+            direction = 1
+            if angle_delta_deg >= 0:
+                direction = -1
 
-        # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
-        # String to return to main: "CHANGE_ALTITUDE: {amount you changed it by, delta height in meters}"
+            heading_deg = math.degrees(telemetry_data.yaw) + angle_delta_deg
+            is_sent = vehicle_filter.should_send(
+                current_decision,
+                heading_deg,
+                angle_delta_deg,
+                now,
+                self.__pending.is_pending(system_id, mavutil.mavlink.MAV_CMD_CONDITION_YAW),
+            )
+            if is_sent:
+                self.__send(
+                    system_id,
+                    mavutil.mavlink.MAV_CMD_CONDITION_YAW,
+                    (angle_delta_deg, self.__turning_speed, direction, 1, 0, 0, 0),
+                    now,
+                    False,
+                )
+
+        else:
+            # Nothing in flight needs to arrive anymore
+            vehicle_filter.should_send(current_decision, 0.0, 0.0, now)
+            self.__pending.discard(system_id)
+
+        if is_sent:
+            self.__stamp(telemetry_data, latency_stamps.Stage.SEND)
+
+        time_since_boot = telemetry_data.time_since_boot
+        if time_since_boot is None:
+            time_since_boot = 0
+
+        return True, decision.DecisionRecord(
+            current_decision,
+            system_id,
+            is_sent,
+            altitude_delta,
+            angle_delta_deg,
+            time_since_boot,
+            now,
+        )
+
+    def run_batch(
+        self,
+        system_ids: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        z: np.ndarray,
+        yaw: np.ndarray,
+    ) -> "tuple[True, np.ndarray, np.ndarray, np.ndarray] | tuple[False, None, None, None]":
+        """
+        Make the decision run() would with no command in flight for every sample in a block
+        at once, without sending any commands. system_ids, x, y, z (m) and yaw (rad) are
+        equal length arrays, such as the columns of a TelemetryBatch, and may mix vehicles.
+
+        Returns arrays of decision.Decision values, altitude deltas (m) and yaw deltas (deg).
+        """
+        if not len(system_ids) == len(x) == len(y) == len(z) == len(yaw):
+            self.__logger.error("Batch arrays have different lengths", True)
+            return False, None, None, None
+
+        # Same as run() for samples without a system ID
+        rows = self.__vehicles.rows(system_ids, self.DEFAULT_SYSTEM_ID)
+        if np.any(rows < 0):
+            self.__logger.error("Batch has vehicles without a target", True)
+            return False, None, None, None
+
+        targets = self.__vehicles.targets[rows]
+        decisions, altitude_deltas, angle_deltas_deg = decision.decide_batch(
+            (targets[:, 0], targets[:, 1], targets[:, 2]),
+            np.asarray(x, dtype=np.float64),
+            np.asarray(y, dtype=np.float64),
+            np.asarray(z, dtype=np.float64),
+            np.asarray(yaw, dtype=np.float64),
+            self.__height_tolerance,
+            self.__angle_tolerance,
+        )
+
+        return True, decisions, altitude_deltas, angle_deltas_deg
 
-        altitude_delta = self.__target.z - telemetry_data.z
+    def update_acks(self) -> None:
+        """
+        Match the COMMAND_ACKs received so far to the commands in flight, and send again the
+        commands that were not acknowledged in time. Does not wait for acknowledgements.
+        """
+        now = time.time()
 
-        if abs(altitude_delta) > self.__height_tolerance:
+        while True:
+            msg = self.__connection.recv_match(type="COMMAND_ACK", blocking=False)
+            if msg is None:
+                break
+
+            # Timed from when mavutil parsed it, however long it waited to be read here
+            receive_time = getattr(msg, "_timestamp", now)
+            latency = self.__pending.acknowledge(
+                msg.get_srcSystem(), msg.command, msg.result, receive_time
+            )
+            if latency is None:
+                self.__logger.warning(
+                    f"Unexpected COMMAND_ACK for command {msg.command} from system "
+                    f"{msg.get_srcSystem()}",
+                    True,
+                )
+
+        for system_id, command_id, pending in self.__pending.due_retries(now):
             self.__connection.mav.command_long_send(
-                1,
-                0,
-                mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
-                0,
-                self.__z_speed,
-                0,
-                0,
-                0,
-                0,
-                0,
-                self.__target.z,
+                system_id, 0, command_id, pending.confirmation, *pending.params
             )
-            return True, f"CHANGE_ALTITUDE: {altitude_delta}"
 
-        # Adjust direction (yaw) using MAV_CMD_CONDITION_YAW (115). Must use relative angle to current state
-        # String to return to main: "CHANGING_YAW: {degree you changed it by in range [-180, 180]}"
-        # Positive angle is counter-clockwise as in a right handed system
+    def ack_counts(self) -> "tuple[int, int, int, int]":
+        """
+        Number of commands accepted, rejected, sent again, and given up on without an ACK.
+        """
+        return (
+            self.__pending.accepted_count,
+            self.__pending.rejected_count,
+            self.__pending.retried_count,
+            self.__pending.expired_count,
+        )
 
-        dx = self.__target.x - telemetry_data.x
-        dy = self.__target.y - telemetry_data.y
-        angle_to_target = math.atan2(dy, dx)
+    def ack_latency_percentile(self, percentile: float) -> "float | None":
+        """
+        COMMAND_ACK latency (s) at the percentile in [0, 100], None if nothing was acknowledged.
+        """
+        return self.__pending.latency_percentile(percentile)
+
+    def command_counts(self) -> "tuple[int, int]":
+        """
+        Number of commands sent and number suppressed as already in flight, over all vehicles.
+        """
+        sent = sum(vehicle_filter.sent_count for vehicle_filter in self.__command_filters)
+        suppressed = sum(
+            vehicle_filter.suppressed_count for vehicle_filter in self.__command_filters
+        )
 
-        angle_delta = angle_to_target - telemetry_data.yaw
+        return sent, suppressed
 
-        while angle_delta > math.pi:
-            angle_delta -= 2 * math.pi
+    def __send(
+        self,
+        system_id: int,
+        command_id: int,
+        params: "tuple[float, ...]",
+        now: float,
+        is_retryable: bool = True,
+    ) -> None:
+        """
+        Send a COMMAND_LONG to the vehicle and track it in the pending table, without waiting
+        for its acknowledgement. update_acks() matches the acknowledgement later.
 
-        while angle_delta < -math.pi:
-            angle_delta += 2 * math.pi
+        is_retryable is False for relative commands, which are not sent again if unacknowledged.
+        """
+        key = (system_id, command_id)
+        if key not in self.__frame_templates:
+            _, self.__frame_templates[key] = frame_templates.FrameTemplate.create(
+                self.__connection.mav,
+                self.__connection.mav.command_long_encode(system_id, 0, command_id, 0, *params),
+                frame_templates.COMMAND_LONG_PARAMS_FORMAT,
+            )
 
-        angle_delta_deg = math.degrees(angle_delta)
+        template = self.__frame_templates[key]
+        if template is not None:
+            template.send(*params)
+        else:
+            self.__connection.mav.command_long_send(system_id, 0, command_id, 0, *params)
 
-        direction = 1
-        if angle_delta_deg >= 0:
-            direction = -1
+        self.__pending.add(system_id, command_id, params, now, is_retryable)
 
-        if abs(angle_delta_deg) > self.__angle_tolerance:
-            self.__connection.mav.command_long_send(
-                1,
-                0,
-                mavutil.mavlink.MAV_CMD_CONDITION_YAW,
-                0,
-                angle_delta_deg,
-                self.__turning_speed,
-                direction,
-                1,
-                0,
-                0,
-                0,
-            )
-            return True, f"CHANGING_YAW: {angle_delta_deg}"
-        return True, "ON_TARGET"
+    @staticmethod
+    def __stamp(telemetry_data: telemetry.TelemetryData, stage: latency_stamps.Stage) -> None:
+        """
+        Mark the stage as reached if the telemetry data is being timed.
+        """
+        if telemetry_data.stamps is not None:
+            telemetry_data.stamps.stamp(stage)
 
 
 # =================================================================================================
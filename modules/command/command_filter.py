@@ -0,0 +1,134 @@
+"""
+Deciding whether a command needs to be sent again.
+"""
+
+import math
+
+from . import decision
+
+
+class CommandFilter:  # pylint: disable=too-many-instance-attributes
+    """
+    Tracks the command in flight to one vehicle, so the same command is not sent every tick.
+
+    A command is sent again only if it changed meaningfully, the vehicle overshot its target,
+    or it has been in flight longer than the resend timeout without waiting on an acknowledgement,
+    as the pending command table sends unacknowledged commands again itself.
+    While a correction is in flight its tolerance is narrowed by the hysteresis, so the vehicle
+    is brought well inside the tolerance instead of toggling at its edge.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        resend_timeout: float,
+        altitude_change_threshold: float,
+        heading_change_threshold: float,
+        hysteresis: float,
+    ) -> "tuple[bool, CommandFilter | None]":
+        """
+        resend_timeout is how long (s) to wait before sending the same command again.
+        altitude_change_threshold (m) and heading_change_threshold (deg) are how much the target
+        has to move to be a different command.
+        hysteresis is the fraction in [0, 1) to narrow the tolerance by while correcting.
+        """
+        if resend_timeout <= 0.0 or altitude_change_threshold < 0.0:
+            return False, None
+
+        if heading_change_threshold < 0.0 or not 0.0 <= hysteresis < 1.0:
+            return False, None
+
+        return True, CommandFilter(
+            cls.__create_key,
+            resend_timeout,
+            altitude_change_threshold,
+            heading_change_threshold,
+            hysteresis,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        resend_timeout: float,
+        altitude_change_threshold: float,
+        heading_change_threshold: float,
+        hysteresis: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is CommandFilter.__create_key, "Use create() method"
+
+        self.__resend_timeout = resend_timeout
+        self.__change_thresholds = {
+            decision.Decision.CHANGE_ALTITUDE: altitude_change_threshold,
+            decision.Decision.CHANGING_YAW: heading_change_threshold,
+        }
+        self.__hysteresis = hysteresis
+
+        # ON_TARGET when nothing is in flight
+        self.__state = decision.Decision.ON_TARGET
+        self.__in_flight_target = 0.0
+        self.__in_flight_error_sign = 0.0
+        self.__sent_time = 0.0
+
+        self.sent_count = 0
+        self.suppressed_count = 0
+
+    def tolerances(self, height_tolerance: float, angle_tolerance: float) -> "tuple[float, float]":
+        """
+        Height and angle tolerances to decide with, narrowed for the correction in flight.
+        """
+        if self.__state == decision.Decision.CHANGE_ALTITUDE:
+            height_tolerance *= 1.0 - self.__hysteresis
+        elif self.__state == decision.Decision.CHANGING_YAW:
+            angle_tolerance *= 1.0 - self.__hysteresis
+
+        return height_tolerance, angle_tolerance
+
+    def should_send(
+        self,
+        current_decision: decision.Decision,
+        target: float,
+        error: float,
+        now: float,
+        is_awaiting_ack: bool = False,
+    ) -> bool:
+        """
+        Whether to send the command for the decision, and track it as in flight if so.
+
+        target is what the command aims for: the target altitude (m) for CHANGE_ALTITUDE,
+        or the target heading (deg) for CHANGING_YAW.
+        error is how far the vehicle is from the target, a change of sign is an overshoot.
+        Both are ignored for ON_TARGET.
+        now is the current time (s).
+        is_awaiting_ack is whether the same command is still waiting on an acknowledgement,
+        its retries are left to the pending command table instead of the resend timeout.
+        """
+        if current_decision == decision.Decision.ON_TARGET:
+            self.__state = decision.Decision.ON_TARGET
+            return False
+
+        error_sign = math.copysign(1.0, error)
+        if (
+            current_decision == self.__state
+            and error_sign == self.__in_flight_error_sign
+            and (is_awaiting_ack or now - self.__sent_time < self.__resend_timeout)
+        ):
+            change = target - self.__in_flight_target
+            if current_decision == decision.Decision.CHANGING_YAW:
+                change = (change + 180.0) % 360.0 - 180.0
+
+            if math.fabs(change) <= self.__change_thresholds[current_decision]:
+                self.suppressed_count += 1
+                return False
+
+        self.__state = current_decision
+        self.__in_flight_target = target
+        self.__in_flight_error_sign = error_sign
+        self.__sent_time = now
+        self.sent_count += 1
+
+        return True
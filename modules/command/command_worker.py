@@ -4,13 +4,124 @@ Command worker to make decisions based on Telemetry Data.
 
 import os
 import pathlib
+import queue
+import time
 
+import numpy as np
 from pymavlink import mavutil
 
+from utilities.workers import latency_histogram
+from utilities.workers import latency_stamps
+from utilities.workers import latest_value_slot
+from utilities.workers import periodic_scheduler
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import command
+from . import decision
 from ..common.modules.logger import logger
+from ..telemetry import telemetry
+
+
+LATEST_SLOT_POLL_PERIOD = 0.001  # seconds
+# Longest wait for telemetry before checking for COMMAND_ACKs, from the queue or the latest slot
+ACK_POLL_PERIOD = 0.1  # seconds
+REPORT_PERIOD = 10  # seconds
+
+
+def newest_per_vehicle(
+    items: "list[telemetry.TelemetryData | telemetry.TelemetryBatch | None]",
+) -> "list[telemetry.TelemetryData]":
+    """
+    Newest telemetry of each vehicle among items, oldest first, for conflated input.
+    """
+    newest = {}
+    for item in items:
+        if item is None:
+            continue
+
+        # Only the newest sample of a batch is current enough to act on
+        if isinstance(item, telemetry.TelemetryBatch):
+            item, _ = item.get(-1)
+
+        # Newest goes last
+        newest.pop(item.system_id, None)
+        newest[item.system_id] = item
+
+    return list(newest.values())
+
+
+def decide_batch(
+    cmd: command.Command, telemetry_batch: telemetry.TelemetryBatch
+) -> "tuple[True, list[decision.DecisionRecord]] | tuple[False, None]":
+    """
+    Decide on every sample of a batch at once with Command.run_batch(), then act on the newest
+    sample of each vehicle with Command.run(), as only it is current enough to send commands for.
+
+    Returns the decision record of each sample, in order.
+    """
+    system_ids = telemetry_batch.column("system_id")
+    result, decisions, altitude_deltas, angle_deltas_deg = cmd.run_batch(
+        system_ids,
+        telemetry_batch.column("x"),
+        telemetry_batch.column("y"),
+        telemetry_batch.column("z"),
+        telemetry_batch.column("yaw"),
+    )
+    if not result:
+        return False, None
+
+    # Same as Command.run() for samples without a system ID or time
+    system_ids = np.nan_to_num(system_ids, nan=command.Command.DEFAULT_SYSTEM_ID).astype(int)
+    times_since_boot = np.nan_to_num(telemetry_batch.column("time_since_boot")).astype(int)
+
+    now = time.time()
+    records = [
+        decision.DecisionRecord(
+            decision.Decision(kind),
+            system_id,
+            False,
+            altitude_delta,
+            angle_delta_deg,
+            time_since_boot,
+            now,
+        )
+        for kind, system_id, altitude_delta, angle_delta_deg, time_since_boot in zip(
+            decisions.tolist(),
+            system_ids.tolist(),
+            altitude_deltas.tolist(),
+            angle_deltas_deg.tolist(),
+            times_since_boot.tolist(),
+        )
+    ]
+
+    newest_rows = {system_id: row for row, system_id in enumerate(system_ids.tolist())}
+    for row in sorted(newest_rows.values()):
+        result, record = cmd.run(telemetry_batch.get(row)[0])
+        if not result:
+            return False, None
+
+        records[row] = record
+
+    return True, records
+
+
+def log_acks(cmd: command.Command, local_logger: logger.Logger) -> None:
+    """
+    Log how commands were acknowledged, and how long acknowledgements took.
+    """
+    accepted, rejected, retried, expired = cmd.ack_counts()
+    local_logger.info(
+        f"Commands accepted: {accepted}, rejected: {rejected}, retried: {retried}, "
+        f"unacknowledged: {expired}",
+        True,
+    )
+
+    percentiles = [cmd.ack_latency_percentile(percentile) for percentile in (50, 90, 99)]
+    if percentiles[0] is not None:
+        p50, p90, p99 = (latency * 1000 for latency in percentiles)
+        local_logger.info(
+            f"COMMAND_ACK latency p50: {p50:.1f} ms, p90: {p90:.1f} ms, p99: {p99:.1f} ms", True
+        )
 
 
 # =================================================================================================
@@ -18,24 +129,34 @@ from ..common.modules.logger import logger
 # =================================================================================================
 def command_worker(
     connection: mavutil.mavfile,
-    target: command.Position,
-    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
-    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
-    controller: worker_controller.WorkerController,
+    targets: "dict[int, command.Position]",
     height_tolerance: float,
     z_speed: float,
     angle_tolerance: float,
     turning_speed: float,
+    ack_timeout: float,
+    command_retries: int,
+    latest_slot: latest_value_slot.LatestValueSlot | None,
+    latency_histograms: latency_histogram.LatencyHistograms | None,
+    conflate_input: bool,
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
 ) -> None:
     """
     Worker process.
 
-    connection is the MAVLink connection to the drone
-    target is the target position
-    input_queue is where we receive telemetry data
-    output_queue is where we send command status strings
-    controller is how the main process communicates to this worker process
+    connection is the MAVLink connection to the drone, COMMAND_ACKs are read from it
+    targets are the target positions of each vehicle, keyed by MAVLink system ID
     height_tolerance, z_speed, angle_tolerance, turning_speed are command parameters
+    ack_timeout is how long to wait for a COMMAND_ACK, command_retries how often to send again
+    latest_slot is where to read the newest telemetry data instead of the input queue, None for queue
+    latency_histograms is where to record the time spent in each pipeline stage, None to not record
+    conflate_input is whether to only decide on the newest queued telemetry of each vehicle,
+    skipping what it has fallen behind on, instead of every queued sample in order
+    input_queue is where we receive telemetry data, as TelemetryData or TelemetryBatch
+    output_queue is where we send the decision for each sample, as decision.DecisionRecord bytes
+    controller is how the main process communicates to this worker process
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -60,7 +181,15 @@ def command_worker(
     # Instantiate class object (command.Command)
 
     result, cmd = command.Command.create(
-        connection, target, height_tolerance, z_speed, angle_tolerance, turning_speed, local_logger
+        connection,
+        targets,
+        height_tolerance,
+        z_speed,
+        angle_tolerance,
+        turning_speed,
+        local_logger,
+        ack_timeout,
+        command_retries,
     )
 
     if not result:
@@ -69,21 +198,82 @@ def command_worker(
 
     assert cmd is not None
 
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(controller)
+    if not result:
+        local_logger.error("Failed to create PeriodicScheduler", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert scheduler is not None
+
+    latest_version = 0
+    # Telemetry not decided on because newer telemetry of the same vehicle was queued
+    skipped_count = 0
+
+    def log_report() -> None:
+        log_acks(cmd, local_logger)
+        if conflate_input:
+            local_logger.info(f"Skipped {skipped_count} stale telemetry samples", True)
+
+    scheduler.add("report", REPORT_PERIOD, log_report, REPORT_PERIOD)
+
     while not controller.is_exit_requested():
         controller.check_pause()
 
-        telemetry_data = input_queue.queue.get()
-        if telemetry_data is None:
-            continue
+        cmd.update_acks()
+        scheduler.run_due()
 
-        result, status = cmd.run(telemetry_data)
+        if latest_slot is not None:
+            result, record, latest_version = latest_slot.wait_newer(
+                latest_version, ACK_POLL_PERIOD, LATEST_SLOT_POLL_PERIOD
+            )
+            if not result:
+                continue
+
+            items = [telemetry.TelemetryData.from_bytes(record)]
+        elif conflate_input:
+            items = input_queue.get_available(ACK_POLL_PERIOD)
+        else:
+            try:
+                items = [input_queue.queue.get(timeout=ACK_POLL_PERIOD)]
+            except queue.Empty:
+                continue
+
+        # Batches are decided on whole, unless only the newest telemetry is wanted
+        if not conflate_input and isinstance(items[0], telemetry.TelemetryBatch):
+            result, records = decide_batch(cmd, items[0])
+            if not result:
+                local_logger.error("Failed to run command on batch", True)
+                continue
+
+            for record in records:
+                output_queue.queue.put(record.to_bytes())
 
-        if not result:
-            local_logger.error("Failed to run command", True)
             continue
 
-        output_queue.queue.put(status)
+        samples = newest_per_vehicle(items)
+        skipped_count += sum(item is not None for item in items) - len(samples)
+
+        for telemetry_data in samples:
+            if telemetry_data.stamps is not None:
+                telemetry_data.stamps.stamp(latency_stamps.Stage.DEQUEUE)
+
+            result, record = cmd.run(telemetry_data)
+
+            if not result:
+                local_logger.error("Failed to run command", True)
+                continue
+
+            if latency_histograms is not None and telemetry_data.stamps is not None:
+                for name, duration in telemetry_data.stamps.durations():
+                    latency_histograms.record(name, duration)
+
+            # Main only decodes it to log it
+            output_queue.queue.put(record.to_bytes())
 
+    log_report()
+    sent, suppressed = cmd.command_counts()
+    local_logger.info(f"Commands sent: {sent}, suppressed as in flight: {suppressed}", True)
     local_logger.info("Command worker exiting", True)
 
 
@@ -0,0 +1,177 @@
+"""
+Deciding how to move towards the target, for one sample or a block of samples at once.
+"""
+
+import enum
+import math
+import struct
+
+import numpy as np
+
+
+class Decision(enum.IntEnum):
+    """
+    What to do, in order of priority.
+    """
+
+    CHANGE_ALTITUDE = 0
+    CHANGING_YAW = 1
+    ON_TARGET = 2
+
+
+def decide(
+    target: "tuple[float, float, float]",
+    position: "tuple[float, float, float]",
+    yaw: float,
+    height_tolerance: float,
+    angle_tolerance: float,
+) -> "tuple[Decision, float, float]":
+    """
+    Decide for a single sample.
+
+    target and position are (x, y, z) in metres, yaw is in radians,
+    height_tolerance is in metres and angle_tolerance in degrees.
+
+    Returns the decision, altitude delta (m) and yaw delta (deg in [-180, 180], positive is
+    counter-clockwise as in a right handed system).
+    """
+    altitude_delta = target[2] - position[2]
+
+    dx = target[0] - position[0]
+    dy = target[1] - position[1]
+    angle_to_target = math.atan2(dy, dx)
+
+    angle_delta = angle_to_target - yaw
+
+    while angle_delta > math.pi:
+        angle_delta -= 2 * math.pi
+
+    while angle_delta < -math.pi:
+        angle_delta += 2 * math.pi
+
+    angle_delta_deg = math.degrees(angle_delta)
+
+    if abs(altitude_delta) > height_tolerance:
+        return Decision.CHANGE_ALTITUDE, altitude_delta, angle_delta_deg
+
+    if abs(angle_delta_deg) > angle_tolerance:
+        return Decision.CHANGING_YAW, altitude_delta, angle_delta_deg
+
+    return Decision.ON_TARGET, altitude_delta, angle_delta_deg
+
+
+def decide_batch(
+    target: "tuple[float | np.ndarray, float | np.ndarray, float | np.ndarray]",
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    yaw: np.ndarray,
+    height_tolerance: float,
+    angle_tolerance: float,
+) -> "tuple[np.ndarray, np.ndarray, np.ndarray]":
+    """
+    Same as decide() for every sample in equal length arrays at once.
+    Each target component is one value for every sample or an array with one per sample.
+
+    Returns arrays of Decision values, altitude deltas and yaw deltas.
+    """
+    altitude_delta = target[2] - z
+
+    angle_to_target = np.arctan2(target[1] - y, target[0] - x)
+    angle_delta = angle_to_target - yaw
+
+    # Same steps of 2 pi as the loops in decide(), including keeping exactly +-pi
+    two_pi = 2 * math.pi
+    angle_delta = angle_delta - two_pi * np.maximum(np.ceil((angle_delta - math.pi) / two_pi), 0)
+    angle_delta = angle_delta + two_pi * np.maximum(np.ceil((-math.pi - angle_delta) / two_pi), 0)
+
+    angle_delta_deg = np.degrees(angle_delta)
+
+    decisions = np.select(
+        [np.abs(altitude_delta) > height_tolerance, np.abs(angle_delta_deg) > angle_tolerance],
+        [Decision.CHANGE_ALTITUDE, Decision.CHANGING_YAW],
+        Decision.ON_TARGET,
+    ).astype(np.uint8)
+
+    return decisions, altitude_delta, angle_delta_deg
+
+
+class DecisionRecord:
+    """
+    Decision made for one sample, sent to main as a small binary record
+    and only formatted as text when logged.
+    """
+
+    __slots__ = (
+        "kind",
+        "system_id",
+        "is_sent",
+        "altitude_delta",
+        "angle_delta_deg",
+        "time_since_boot",
+        "decision_time",
+    )
+
+    # Fields in __slots__ order
+    __RECORD_FORMAT = struct.Struct("<BB?2dId")
+    RECORD_SIZE = __RECORD_FORMAT.size  # bytes
+
+    def __init__(
+        self,
+        kind: Decision,
+        system_id: int,
+        is_sent: bool,
+        altitude_delta: float,  # m
+        angle_delta_deg: float,  # deg
+        time_since_boot: int,  # ms
+        decision_time: float,  # s
+    ) -> None:
+        self.kind = kind
+        self.system_id = system_id
+
+        # Whether a command was sent, False if there was nothing to send
+        # or the same command was already in flight
+        self.is_sent = is_sent
+
+        self.altitude_delta = altitude_delta
+        self.angle_delta_deg = angle_delta_deg
+
+        # Vehicle time of the sample decided on, 0 if unknown, and wall clock time of the decision
+        self.time_since_boot = time_since_boot
+        self.decision_time = decision_time
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs into a fixed size record.
+        """
+        return self.__RECORD_FORMAT.pack(
+            self.kind,
+            self.system_id,
+            self.is_sent,
+            self.altitude_delta,
+            self.angle_delta_deg,
+            self.time_since_boot,
+            self.decision_time,
+        )
+
+    @classmethod
+    def from_bytes(cls, record: "bytes | bytearray | memoryview") -> "DecisionRecord":
+        """
+        Unpacks a record created by to_bytes().
+        """
+        kind, *values = cls.__RECORD_FORMAT.unpack_from(record)
+
+        return DecisionRecord(Decision(kind), *values)
+
+    def __reduce__(self) -> "tuple":
+        # Pickle as the binary record, much smaller than the default for queues
+        return DecisionRecord.from_bytes, (self.to_bytes(),)
+
+    def __str__(self) -> str:
+        if self.kind == Decision.CHANGE_ALTITUDE:
+            return f"CHANGE_ALTITUDE: {self.altitude_delta}"
+
+        if self.kind == Decision.CHANGING_YAW:
+            return f"CHANGING_YAW: {self.angle_delta_deg}"
+
+        return "ON_TARGET"
@@ -0,0 +1,205 @@
+"""
+Commands waiting for a COMMAND_ACK.
+"""
+
+import numpy as np
+
+
+class PendingCommand:
+    """
+    Command sent to a vehicle and not yet acknowledged.
+    """
+
+    __slots__ = ("params", "is_retryable", "confirmation", "sent_time", "is_in_progress")
+
+    def __init__(self, params: "tuple[float, ...]", is_retryable: bool, sent_time: float) -> None:
+        """
+        params are the 7 COMMAND_LONG parameters, to send the same command again.
+        is_retryable is whether sending the same parameters again is safe.
+        sent_time is when it was last sent (s).
+        """
+        self.params = params
+        self.is_retryable = is_retryable
+        self.confirmation = 0
+        # Time of the last send, or of the in progress acknowledgement once there is one
+        self.sent_time = sent_time
+        # Vehicle acknowledged it is working on the command, the final result is still to come
+        self.is_in_progress = False
+
+
+class PendingCommands:  # pylint: disable=too-many-instance-attributes
+    """
+    Table of commands in flight keyed by (system ID, command ID), as a vehicle acknowledges
+    at most one of each command at a time.
+
+    Nothing here blocks: acknowledgements are matched as they are handed in and retries are
+    collected for the caller to send.
+    """
+
+    __create_key = object()
+
+    # MAV_RESULT_ACCEPTED and MAV_RESULT_IN_PROGRESS
+    __RESULT_ACCEPTED = 0
+    __RESULT_IN_PROGRESS = 5
+
+    @classmethod
+    def create(
+        cls, ack_timeout: float, result_timeout: float, max_retries: int, latency_window_size: int
+    ) -> "tuple[bool, PendingCommands | None]":
+        """
+        ack_timeout is how long (s) to wait for an acknowledgement before retrying.
+        result_timeout is how long (s) to wait for the final result of a command in progress.
+        max_retries is how many times to send a command again, 0 to never retry.
+        latency_window_size is how many of the latest acknowledgement latencies to keep.
+        """
+        if (
+            ack_timeout <= 0.0
+            or result_timeout <= 0.0
+            or max_retries < 0
+            or latency_window_size < 1
+        ):
+            return False, None
+
+        return True, PendingCommands(
+            cls.__create_key, ack_timeout, result_timeout, max_retries, latency_window_size
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        ack_timeout: float,
+        result_timeout: float,
+        max_retries: int,
+        latency_window_size: int,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is PendingCommands.__create_key, "Use create() method"
+
+        self.__ack_timeout = ack_timeout
+        self.__result_timeout = result_timeout
+        self.__max_retries = max_retries
+        self.__pending: "dict[tuple[int, int], PendingCommand]" = {}
+
+        # Ring buffer of the latest latencies
+        self.__latencies = np.zeros(latency_window_size)
+        self.__latency_count = 0
+
+        self.accepted_count = 0
+        self.rejected_count = 0
+        self.retried_count = 0
+        self.expired_count = 0
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def add(
+        self,
+        system_id: int,
+        command_id: int,
+        params: "tuple[float, ...]",
+        now: float,
+        is_retryable: bool = True,
+    ) -> None:
+        """
+        Track a command that was just sent, replacing the same command still in flight.
+
+        Commands that are not retryable, such as relative ones that would be applied twice
+        if only the acknowledgement was lost, are dropped when they time out instead.
+        """
+        self.__pending[(system_id, command_id)] = PendingCommand(params, is_retryable, now)
+
+    def is_pending(self, system_id: int, command_id: int) -> bool:
+        """
+        Whether the command is in flight, waiting on an acknowledgement or its final result.
+        """
+        return (system_id, command_id) in self.__pending
+
+    def discard(self, system_id: int) -> None:
+        """
+        Stop tracking the commands to a vehicle, when they no longer need to arrive.
+        """
+        for key in [key for key in self.__pending if key[0] == system_id]:
+            del self.__pending[key]
+
+    def acknowledge(
+        self, system_id: int, command_id: int, result: int, now: float
+    ) -> "float | None":
+        """
+        Match an acknowledgement to the command in flight.
+
+        Returns the latency (s) from when the command was last sent to its first
+        acknowledgement, None if no such command was in flight.
+        """
+        pending = self.__pending.get((system_id, command_id))
+        if pending is None:
+            return None
+
+        latency = now - pending.sent_time
+        if not pending.is_in_progress:
+            self.__latencies[self.__latency_count % len(self.__latencies)] = latency
+            self.__latency_count += 1
+
+        # The vehicle has it, wait for the final result instead of retrying
+        if result == self.__RESULT_IN_PROGRESS:
+            pending.is_in_progress = True
+            pending.sent_time = now
+            return latency
+
+        del self.__pending[(system_id, command_id)]
+
+        if result == self.__RESULT_ACCEPTED:
+            self.accepted_count += 1
+        else:
+            self.rejected_count += 1
+
+        return latency
+
+    def due_retries(self, now: float) -> "list[tuple[int, int, PendingCommand]]":
+        """
+        Commands not acknowledged within the timeout, as (system ID, command ID, command).
+
+        Their confirmation is incremented and they are tracked as sent now, so the caller
+        must send them. Commands out of retries or not retryable are dropped, as are commands
+        in progress with no final result within the result timeout.
+        """
+        retries = []
+        expired = []
+        for key, pending in self.__pending.items():
+            # Sending a command in progress again would restart it
+            if pending.is_in_progress:
+                if now - pending.sent_time >= self.__result_timeout:
+                    expired.append(key)
+
+                continue
+
+            if now - pending.sent_time < self.__ack_timeout:
+                continue
+
+            if not pending.is_retryable or pending.confirmation >= self.__max_retries:
+                expired.append(key)
+                continue
+
+            pending.confirmation += 1
+            pending.sent_time = now
+            retries.append((key[0], key[1], pending))
+
+        for key in expired:
+            del self.__pending[key]
+
+        self.retried_count += len(retries)
+        self.expired_count += len(expired)
+
+        return retries
+
+    def latency_percentile(self, percentile: float) -> "float | None":
+        """
+        Acknowledgement latency (s) at the percentile in [0, 100] over the latest window,
+        None if nothing has been acknowledged.
+        """
+        if self.__latency_count == 0:
+            return None
+
+        count = min(self.__latency_count, len(self.__latencies))
+        return float(np.percentile(self.__latencies[:count], percentile))
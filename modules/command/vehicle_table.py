@@ -0,0 +1,104 @@
+"""
+Per-vehicle targets and state, looked up by MAVLink system ID.
+"""
+
+import numpy as np
+
+from utilities.stats import streaming_stats
+
+
+class VehicleTable:
+    """
+    Fixed set of vehicles, each a row of the table.
+
+    Targets are one array with a row per vehicle, and system IDs map to rows
+    through an array covering every possible ID, so lookups are O(1) and vectorize.
+    """
+
+    __create_key = object()
+
+    # MAVLink system IDs are 1 byte
+    __SYSTEM_ID_COUNT = 256
+
+    @classmethod
+    def create(
+        cls, targets: "dict[int, tuple[float, float, float]]"
+    ) -> "tuple[bool, VehicleTable | None]":
+        """
+        targets are the (x, y, z) target positions in metres keyed by system ID.
+        """
+        if len(targets) == 0:
+            return False, None
+
+        for system_id in targets:
+            if not 0 < system_id < cls.__SYSTEM_ID_COUNT:
+                return False, None
+
+        velocity_statistics = []
+        for _ in targets:
+            result, statistics = streaming_stats.RunningStatistics.create(3)
+            if not result:
+                return False, None
+
+            velocity_statistics.append(statistics)
+
+        return True, VehicleTable(cls.__create_key, targets, velocity_statistics)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        targets: "dict[int, tuple[float, float, float]]",
+        velocity_statistics: "list[streaming_stats.RunningStatistics]",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is VehicleTable.__create_key, "Use create() method"
+
+        self.system_ids = np.array(list(targets.keys()), dtype=np.uint8)
+        self.targets = np.array(list(targets.values()), dtype=np.float64)
+
+        # Row of each system ID, -1 for vehicles not in the table
+        self.__rows = np.full(self.__SYSTEM_ID_COUNT, -1, dtype=np.int16)
+        self.__rows[self.system_ids] = np.arange(len(self.system_ids))
+        self.__row_list = self.__rows.tolist()
+        self.__target_list = [(float(x), float(y), float(z)) for x, y, z in targets.values()]
+
+        # Average velocity of each vehicle over its trip so far
+        self.velocity_statistics = velocity_statistics
+
+    def __len__(self) -> int:
+        return len(self.system_ids)
+
+    def row(self, system_id: int) -> "int | None":
+        """
+        Row of a vehicle, None if it is not in the table.
+        """
+        if not 0 <= system_id < self.__SYSTEM_ID_COUNT:
+            return None
+
+        row = self.__row_list[system_id]
+        return None if row < 0 else row
+
+    def rows(self, system_ids: np.ndarray, default_system_id: "int | None" = None) -> np.ndarray:
+        """
+        Row of each vehicle in an array of system IDs, -1 for vehicles not in the table.
+
+        A missing system ID (NaN, as in a TelemetryBatch) is looked up as default_system_id,
+        None to treat it as not in the table.
+        """
+        system_ids = np.asarray(system_ids)
+        if default_system_id is not None and np.issubdtype(system_ids.dtype, np.floating):
+            system_ids = np.where(np.isnan(system_ids), default_system_id, system_ids)
+
+        valid = (system_ids >= 0) & (system_ids < self.__SYSTEM_ID_COUNT)
+        rows = np.full(system_ids.shape, -1, dtype=np.int16)
+        rows[valid] = self.__rows[system_ids[valid].astype(np.intp)]
+
+        return rows
+
+    def target(self, row: int) -> "tuple[float, float, float]":
+        """
+        Target position of the vehicle in the row.
+        """
+        return self.__target_list[row]
@@ -0,0 +1,188 @@
+"""
+Connection state of the drone from its heartbeats, as events when it changes.
+"""
+
+import enum
+
+from . import phi_accrual
+
+
+class ConnectionEventKind(enum.Enum):
+    """
+    What the event reports.
+    """
+
+    CONNECTED = 0
+    DISCONNECTED = 1
+    # Periodic summary while the state has not changed
+    KEEPALIVE = 2
+
+
+class ConnectionEvent:
+    """
+    Connection state at the time of the event.
+    """
+
+    __slots__ = ("kind", "is_connected", "timestamp", "missed_heartbeats", "received_heartbeats")
+
+    def __init__(
+        self,
+        kind: ConnectionEventKind,
+        is_connected: bool,
+        timestamp: float,
+        missed_heartbeats: int,
+        received_heartbeats: int,
+    ) -> None:
+        self.kind = kind
+        self.is_connected = is_connected
+        # Seconds since epoch
+        self.timestamp = timestamp
+        # Consecutive heartbeats missed
+        self.missed_heartbeats = missed_heartbeats
+        # Heartbeats received since the previous event
+        self.received_heartbeats = received_heartbeats
+
+    def __str__(self) -> str:
+        """
+        To string.
+        """
+        return (
+            f"{self.kind.name}: connected {self.is_connected}, timestamp {self.timestamp:.3f}, "
+            f"missed {self.missed_heartbeats}, received {self.received_heartbeats}"
+        )
+
+
+class ConnectionStateTracker:  # pylint: disable=too-many-instance-attributes
+    """
+    Tracks whether the drone is connected from whether each heartbeat period had a heartbeat,
+    and only reports when that changes, or a keepalive summary at a low rate.
+
+    With a phi accrual detector, the detector decides when the drone is disconnected
+    instead of a count of missed heartbeats, and updates can come more often than heartbeats.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        disconnect_threshold: int,
+        keepalive_period: "float | None",
+        detector: phi_accrual.PhiAccrualDetector | None = None,
+        phi_threshold: float = 0.0,
+    ) -> "tuple[bool, ConnectionStateTracker | None]":
+        """
+        disconnect_threshold is how many heartbeats in a row are missed before disconnecting.
+        keepalive_period is the longest time (s) between events, None for only state changes.
+        detector is the phi accrual detector to disconnect with instead, None for the count.
+        phi_threshold is the phi at which the detector disconnects.
+        """
+        if disconnect_threshold <= 0:
+            return False, None
+
+        if keepalive_period is not None and keepalive_period <= 0.0:
+            return False, None
+
+        if detector is not None and phi_threshold <= 0.0:
+            return False, None
+
+        return True, ConnectionStateTracker(
+            cls.__create_key, disconnect_threshold, keepalive_period, detector, phi_threshold
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        disconnect_threshold: int,
+        keepalive_period: "float | None",
+        detector: phi_accrual.PhiAccrualDetector | None,
+        phi_threshold: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert (
+            class_private_create_key is ConnectionStateTracker.__create_key
+        ), "Use create() method"
+
+        self.__disconnect_threshold = disconnect_threshold
+        self.__keepalive_period = keepalive_period
+        self.__detector = detector
+        self.__phi_threshold = phi_threshold
+
+        # None until the first heartbeat or enough missed ones to decide
+        self.__is_connected: "bool | None" = None
+        self.__missed_heartbeats = 0
+        self.__received_heartbeats = 0
+        self.__last_event_time: "float | None" = None
+
+    def update(self, is_received: bool, now: float) -> "ConnectionEvent | None":
+        """
+        is_received is whether a heartbeat came in this period, now is the time (s since epoch).
+        With a detector, is_received is whether a heartbeat came since the last update.
+
+        Returns the event if the state changed or a keepalive is due, otherwise None.
+        """
+        if self.__last_event_time is None:
+            self.__last_event_time = now
+            # Never connecting is a disconnect too
+            if self.__detector is not None:
+                self.__detector.start(now)
+
+        if is_received:
+            if self.__detector is not None:
+                # The time without heartbeats during an outage is not a usual interval
+                if self.__is_connected is True:
+                    self.__detector.heartbeat(now)
+                else:
+                    self.__detector.start(now)
+
+            self.__missed_heartbeats = 0
+            self.__received_heartbeats += 1
+            if self.__is_connected is not True:
+                self.__is_connected = True
+                return self.__event(ConnectionEventKind.CONNECTED, now)
+        else:
+            if self.__detector is not None:
+                self.__missed_heartbeats = self.__detector.missed_heartbeats(now)
+                is_lost = self.__detector.phi(now) >= self.__phi_threshold
+            else:
+                self.__missed_heartbeats += 1
+                is_lost = self.__missed_heartbeats >= self.__disconnect_threshold
+
+            if is_lost and self.__is_connected is not False:
+                self.__is_connected = False
+                return self.__event(ConnectionEventKind.DISCONNECTED, now)
+
+        if (
+            self.__keepalive_period is not None
+            and now - self.__last_event_time >= self.__keepalive_period
+        ):
+            return self.__event(ConnectionEventKind.KEEPALIVE, now)
+
+        return None
+
+    def __event(self, kind: ConnectionEventKind, now: float) -> ConnectionEvent:
+        """
+        Event with the current state, counting heartbeats again for the next one.
+        """
+        self.__last_event_time = now
+
+        event = ConnectionEvent(
+            kind, self.is_connected(), now, self.__missed_heartbeats, self.__received_heartbeats
+        )
+        self.__received_heartbeats = 0
+
+        return event
+
+    def is_connected(self) -> bool:
+        """
+        Whether the drone is connected, False before the first heartbeat.
+        """
+        return self.__is_connected is True
+
+    def missed_heartbeats(self) -> int:
+        """
+        Heartbeats missed in a row.
+        """
+        return self.__missed_heartbeats
@@ -2,8 +2,13 @@
 Heartbeat receiving logic.
 """
 
+import time
+
 from pymavlink import mavutil
 
+from . import connection_state
+from . import heartbeat_registry
+from . import phi_accrual
 from ..common.modules.logger import logger
 
 
@@ -17,66 +22,157 @@ class HeartbeatReceiver:
 
     __private_key = object()
 
+    __HEARTBEAT_PERIOD = 1  # seconds
+    # Heartbeat periods in a row without a heartbeat before disconnecting
+    __DISCONNECT_THRESHOLD = 5
+
+    # Phi accrual detection checks often so it can disconnect as soon as phi crosses
+    __PHI_POLL_PERIOD = 0.1  # seconds
+    __PHI_WINDOW_SIZE = 100
+    __PHI_MIN_STANDARD_DEVIATION = 0.1  # seconds
+    # Tolerate a single missing heartbeat on a steady link
+    __PHI_ACCEPTABLE_PAUSE = __HEARTBEAT_PERIOD
+
+    # Vehicles and components (camera, gimbal, companion computer) tracked on the link
+    __REGISTRY_CAPACITY = 512
+    __VEHICLE_DISCONNECT_TIMEOUT = __DISCONNECT_THRESHOLD * __HEARTBEAT_PERIOD  # seconds
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        keepalive_period: "float | None" = None,
+        phi_threshold: "float | None" = None,
     ) -> "tuple[True, HeartbeatReceiver] | tuple[False, None]":
         """
         Falliable create (instantiation) method to create a HeartbeatReceiver object.
+
+        keepalive_period is the longest time (s) between events, None for only state changes.
+        phi_threshold is the phi accrual suspicion to disconnect at,
+        None to disconnect after a fixed count of missed heartbeats.
         """
         if connection is None:
             local_logger.error("Connection is None", True)
             return False, None
 
-        return True, HeartbeatReceiver(cls.__private_key, connection, local_logger)
+        detector = None
+        receive_timeout = cls.__HEARTBEAT_PERIOD
+        if phi_threshold is not None:
+            result, detector = phi_accrual.PhiAccrualDetector.create(
+                cls.__PHI_WINDOW_SIZE,
+                cls.__HEARTBEAT_PERIOD,
+                cls.__PHI_MIN_STANDARD_DEVIATION,
+                cls.__PHI_ACCEPTABLE_PAUSE,
+            )
+            if not result:
+                local_logger.error("Failed to create phi accrual detector", True)
+                return False, None
+
+            receive_timeout = cls.__PHI_POLL_PERIOD
+
+        result, tracker = connection_state.ConnectionStateTracker.create(
+            cls.__DISCONNECT_THRESHOLD,
+            keepalive_period,
+            detector,
+            0.0 if phi_threshold is None else phi_threshold,
+        )
+        if not result:
+            local_logger.error("Failed to create connection state tracker", True)
+            return False, None
+
+        result, registry = heartbeat_registry.HeartbeatRegistry.create(
+            cls.__REGISTRY_CAPACITY, cls.__VEHICLE_DISCONNECT_TIMEOUT
+        )
+        if not result:
+            local_logger.error("Failed to create heartbeat registry", True)
+            return False, None
+
+        return True, HeartbeatReceiver(
+            cls.__private_key, connection, tracker, registry, receive_timeout, local_logger
+        )
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
+        tracker: connection_state.ConnectionStateTracker,
+        registry: heartbeat_registry.HeartbeatRegistry,
+        receive_timeout: float,
         local_logger: logger.Logger,  # Put your own arguments here
     ) -> None:
         assert key is HeartbeatReceiver.__private_key, "Use create() method"
 
         self.__connection = connection
+        self.__tracker = tracker
+        self.__registry = registry
+        self.__receive_timeout = receive_timeout
         self.__logger = local_logger
 
-        self.__is_connected = False
-        self.__missed_heartbeats = 0
-        self.__disconnect_threshold = 5
+        self.__vehicle_events: "list[heartbeat_registry.VehicleEvent]" = []
 
-    def run(self) -> "tuple[bool, str]":
+    def run(self) -> "tuple[bool, connection_state.ConnectionEvent | None]":
         """
         Attempt to recieve a heartbeat message.
         If disconnected for over a threshold number of periods,
         the connection is considered disconnected.
-        """
-        msg = self.__connection.recv_match(type="HEARTBEAT", blocking=True, timeout=1)
+        A heartbeat from any vehicle or component keeps the link connected,
+        each one is also tracked on its own, see take_vehicle_events().
 
+        Returns an event when the connection state changes or a keepalive is due, otherwise None.
+        """
+        msg = self.__connection.recv_match(
+            type="HEARTBEAT", blocking=True, timeout=self.__receive_timeout
+        )
+        now = time.time()
         if msg is not None:
             self.__logger.debug("Heartbeat Received", True)
 
-            self.__missed_heartbeats = 0
-
-            if not self.__is_connected:
-                self.__is_connected = True
-                self.__logger.info("Connected to Drone", True)
-        else:
-            self.__missed_heartbeats += 1
-            self.__logger.warning(f"Missed Heartbeat ({self.__missed_heartbeats})", True)
-
-            if self.__missed_heartbeats >= self.__disconnect_threshold:
-                self.__is_connected = False
-                self.__logger.error("Disconnected from Drone", True)
+            result, vehicle_event = self.__registry.heartbeat(
+                msg.get_srcSystem(),
+                msg.get_srcComponent(),
+                msg.type,
+                msg.autopilot,
+                msg.base_mode,
+                msg.custom_mode,
+                now,
+            )
+            if not result:
+                self.__logger.warning(
+                    f"Not tracking {msg.get_srcSystem()}/{msg.get_srcComponent()}, "
+                    "heartbeat registry full",
+                    True,
+                )
+            elif vehicle_event is not None:
+                self.__vehicle_events.append(vehicle_event)
+
+        self.__vehicle_events.extend(self.__registry.check(now))
+
+        missed_heartbeats = self.__tracker.missed_heartbeats()
+        event = self.__tracker.update(msg is not None, now)
+
+        # Phi accrual detection checks several times per heartbeat, only log new misses
+        if self.__tracker.missed_heartbeats() > missed_heartbeats:
+            self.__logger.warning(f"Missed Heartbeat ({self.__tracker.missed_heartbeats()})", True)
+
+        if event is not None and event.kind == connection_state.ConnectionEventKind.CONNECTED:
+            self.__logger.info("Connected to Drone", True)
+        elif event is not None and event.kind == connection_state.ConnectionEventKind.DISCONNECTED:
+            self.__logger.error("Disconnected from Drone", True)
+
+        return True, event
+
+    def take_vehicle_events(self) -> "list[heartbeat_registry.VehicleEvent]":
+        """
+        Vehicles and components that connected or disconnected since the last call.
+        """
+        vehicle_events = self.__vehicle_events
+        self.__vehicle_events = []
 
-        if self.__is_connected:
-            status = "Connected"
-        else:
-            status = "Disconnected"
+        for vehicle_event in vehicle_events:
+            self.__logger.info(f"Vehicle {vehicle_event}", True)
 
-        return True, status
+        return vehicle_events
 
 
 # =================================================================================================
@@ -18,13 +18,20 @@ from ..common.modules.logger import logger
 # =================================================================================================
 def heartbeat_receiver_worker(
     connection: mavutil.mavfile,
+    keepalive_period: "float | None",
+    phi_threshold: "float | None",
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
 ) -> None:
     """
     Worker process.
 
-    args... describe what the arguments are
+    connection is where the drone's heartbeats are read from
+    keepalive_period is the longest time (s) between events, None for only state changes
+    phi_threshold is the phi accrual suspicion to disconnect at, None for a count of misses
+    output_queue is where we send connection_state.ConnectionEvent when the state changes,
+        and heartbeat_registry.VehicleEvent when a vehicle or component does
+    controller is how the main process communicates to this worker process
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -48,7 +55,9 @@ def heartbeat_receiver_worker(
     # =============================================================================================
     # Instantiate class object (heartbeat_receiver.HeartbeatReceiver)
 
-    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(connection, local_logger)
+    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, keepalive_period, phi_threshold
+    )
 
     if not result:
         local_logger.error("Failed to create Heartbeat Receiver", True)
@@ -58,14 +67,21 @@ def heartbeat_receiver_worker(
 
     while not controller.is_exit_requested():
         controller.check_pause()
-        result, status = receiver.run()
+        result, event = receiver.run()
 
         if not result:
             local_logger.error("Failed to check heartbeat", True)
             continue
 
-        output_queue.queue.put(status)
-        local_logger.debug(f"Status: {status}", True)
+        for vehicle_event in receiver.take_vehicle_events():
+            output_queue.queue.put(vehicle_event)
+
+        # Only changes are sent, main does not need to hear the same state every period
+        if event is None:
+            continue
+
+        output_queue.queue.put(event)
+        local_logger.debug(f"Event: {event}", True)
 
     local_logger.info("Heartbeat receiver worker exiting", True)
 
@@ -0,0 +1,211 @@
+"""
+Liveness, type and mode of each vehicle and component on the link, from their heartbeats.
+"""
+
+import numpy as np
+
+from . import connection_state
+
+
+# MAVLink system and component IDs are 1 byte each
+ID_COUNT = 256
+
+
+class VehicleEvent:  # pylint: disable=too-many-instance-attributes
+    """
+    A vehicle or component connected or disconnected.
+    """
+
+    __slots__ = (
+        "kind",
+        "system_id",
+        "component_id",
+        "timestamp",
+        "mav_type",
+        "autopilot",
+        "base_mode",
+        "custom_mode",
+    )
+
+    def __init__(
+        self,
+        kind: connection_state.ConnectionEventKind,
+        system_id: int,
+        component_id: int,
+        timestamp: float,
+        mav_type: int,
+        autopilot: int,
+        base_mode: int,
+        custom_mode: int,
+    ) -> None:
+        self.kind = kind
+        self.system_id = system_id
+        self.component_id = component_id
+        # Seconds since epoch
+        self.timestamp = timestamp
+        # From its latest heartbeat: MAV_TYPE, MAV_AUTOPILOT, MAV_MODE_FLAG bits, autopilot mode
+        self.mav_type = mav_type
+        self.autopilot = autopilot
+        self.base_mode = base_mode
+        self.custom_mode = custom_mode
+
+    def __str__(self) -> str:
+        """
+        To string.
+        """
+        return (
+            f"{self.kind.name} {self.system_id}/{self.component_id}: type {self.mav_type}, "
+            f"autopilot {self.autopilot}, mode {self.base_mode}/{self.custom_mode}, "
+            f"timestamp {self.timestamp:.3f}"
+        )
+
+
+class HeartbeatRegistry:  # pylint: disable=too-many-instance-attributes
+    """
+    Table of every (system ID, component ID) heard from, a row each in the order first heard.
+
+    Each column is an array with a row per component, and (system ID, component ID) pairs map
+    to rows through an array covering every possible pair, so a heartbeat updates its row in O(1)
+    and checking every component for a disconnect is vectorized.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls, capacity: int, disconnect_timeout: float
+    ) -> "tuple[bool, HeartbeatRegistry | None]":
+        """
+        capacity is the most components the table holds.
+        disconnect_timeout is how long (s) without a heartbeat before a component is disconnected.
+        """
+        if not 0 < capacity <= ID_COUNT * ID_COUNT:
+            return False, None
+
+        if disconnect_timeout <= 0.0:
+            return False, None
+
+        return True, HeartbeatRegistry(cls.__create_key, capacity, disconnect_timeout)
+
+    def __init__(
+        self, class_private_create_key: object, capacity: int, disconnect_timeout: float
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is HeartbeatRegistry.__create_key, "Use create() method"
+
+        self.__disconnect_timeout = disconnect_timeout
+
+        # Row of each system ID * ID_COUNT + component ID, -1 for components not heard from
+        self.__rows = [-1] * (ID_COUNT * ID_COUNT)
+        self.__count = 0
+
+        self.system_ids = np.zeros(capacity, dtype=np.uint8)
+        self.component_ids = np.zeros(capacity, dtype=np.uint8)
+        self.last_heartbeat_times = np.zeros(capacity, dtype=np.float64)
+        self.mav_types = np.zeros(capacity, dtype=np.uint8)
+        self.autopilots = np.zeros(capacity, dtype=np.uint8)
+        self.base_modes = np.zeros(capacity, dtype=np.uint8)
+        self.custom_modes = np.zeros(capacity, dtype=np.uint32)
+        self.is_connected = np.zeros(capacity, dtype=np.bool_)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def row(self, system_id: int, component_id: int) -> "int | None":
+        """
+        Row of a component, None if it has not been heard from.
+        """
+        if not (0 <= system_id < ID_COUNT and 0 <= component_id < ID_COUNT):
+            return None
+
+        row = self.__rows[system_id * ID_COUNT + component_id]
+        return None if row < 0 else row
+
+    def heartbeat(
+        self,
+        system_id: int,
+        component_id: int,
+        mav_type: int,
+        autopilot: int,
+        base_mode: int,
+        custom_mode: int,
+        now: float,
+    ) -> "tuple[bool, VehicleEvent | None]":
+        """
+        Record a heartbeat that arrived at now (s since epoch).
+
+        Returns False if the IDs are invalid or the table is full,
+        and the event if the component was not connected before.
+        """
+        if not (0 <= system_id < ID_COUNT and 0 <= component_id < ID_COUNT):
+            return False, None
+
+        key = system_id * ID_COUNT + component_id
+        row = self.__rows[key]
+        if row < 0:
+            if self.__count == len(self.system_ids):
+                return False, None
+
+            row = self.__count
+            self.__count += 1
+            self.__rows[key] = row
+            self.system_ids[row] = system_id
+            self.component_ids[row] = component_id
+
+        self.last_heartbeat_times[row] = now
+        self.mav_types[row] = mav_type
+        self.autopilots[row] = autopilot
+        self.base_modes[row] = base_mode
+        self.custom_modes[row] = custom_mode
+
+        if self.is_connected[row]:
+            return True, None
+
+        self.is_connected[row] = True
+        return True, self.__event(connection_state.ConnectionEventKind.CONNECTED, row, now)
+
+    def check(self, now: float) -> "list[VehicleEvent]":
+        """
+        Disconnect every connected component without a heartbeat for the timeout by now (s).
+
+        Returns an event for each.
+        """
+        count = self.__count
+        is_lost = self.is_connected[:count] & (
+            now - self.last_heartbeat_times[:count] >= self.__disconnect_timeout
+        )
+        lost_rows = np.flatnonzero(is_lost)
+        if len(lost_rows) == 0:
+            return []
+
+        self.is_connected[lost_rows] = False
+
+        return [
+            self.__event(connection_state.ConnectionEventKind.DISCONNECTED, int(row), now)
+            for row in lost_rows
+        ]
+
+    def connected_count(self) -> int:
+        """
+        How many components are connected.
+        """
+        return int(np.count_nonzero(self.is_connected[: self.__count]))
+
+    def __event(
+        self, kind: connection_state.ConnectionEventKind, row: int, now: float
+    ) -> VehicleEvent:
+        """
+        Event with the row's latest heartbeat.
+        """
+        return VehicleEvent(
+            kind,
+            int(self.system_ids[row]),
+            int(self.component_ids[row]),
+            now,
+            int(self.mav_types[row]),
+            int(self.autopilots[row]),
+            int(self.base_modes[row]),
+            int(self.custom_modes[row]),
+        )
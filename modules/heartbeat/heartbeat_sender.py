@@ -5,6 +5,7 @@ Heartbeat sending logic.
 from pymavlink import mavutil
 
 from modules.common.modules.logger import logger
+from utilities.mavlink import frame_templates
 
 
 # =================================================================================================
@@ -46,18 +47,34 @@ class HeartbeatSender:
         self.__connection = connection
         self.__logger = local_logger
 
-    def run(self) -> bool:
-        """
-        Attempt to send a heartbeat message.
-        """
-        try:
-            self.__connection.mav.heartbeat_send(
+        # Heartbeat never changes, so send it pre-packed, None if the link does not allow it
+        _, self.__heartbeat = frame_templates.FrameTemplate.create(
+            connection.mav,
+            connection.mav.heartbeat_encode(
                 mavutil.mavlink.MAV_TYPE_GCS,
                 mavutil.mavlink.MAV_AUTOPILOT_INVALID,
                 0,
                 0,
                 0,
-            )
+            ),
+            "",
+        )
+
+    def run(self) -> bool:
+        """
+        Attempt to send a heartbeat message.
+        """
+        try:
+            if self.__heartbeat is not None:
+                self.__heartbeat.send()
+            else:
+                self.__connection.mav.heartbeat_send(
+                    mavutil.mavlink.MAV_TYPE_GCS,
+                    mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+                    0,
+                    0,
+                    0,
+                )
             self.__logger.debug("Heartbeat sent", True)
             return True
         except Exception as e:  # pylint: disable=broad-exception-caught
@@ -4,15 +4,19 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
+from utilities.workers import periodic_scheduler
 from utilities.workers import worker_controller
 from . import heartbeat_sender
 from ..common.modules.logger import logger
 
 
+HEARTBEAT_PERIOD = 1  # seconds
+JITTER_REPORT_PERIOD = 60  # seconds
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
@@ -56,16 +60,29 @@ def heartbeat_sender_worker(
     # =============================================================================================
     # Instantiate class object (heartbeat_sender.HeartbeatSender)
 
-    # Main loop: do work.
-    while not controller.is_exit_requested():
-        controller.check_pause()
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(controller)
+    if not result:
+        local_logger.error("Failed to create PeriodicScheduler", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert scheduler is not None
 
-        result = sender.run()
-        if not result:
+    def send_heartbeat() -> None:
+        if not sender.run():
             local_logger.error("Failed to send heartbeat", True)
 
-        time.sleep(1)
+    def log_jitter() -> None:
+        for line in scheduler.report():
+            local_logger.info(line, True)
+
+    scheduler.add("heartbeat", HEARTBEAT_PERIOD, send_heartbeat)
+    scheduler.add("jitter report", JITTER_REPORT_PERIOD, log_jitter)
+
+    # Main loop: do work until exit is requested
+    scheduler.run()
 
+    log_jitter()
     local_logger.info("Heartbeat sender worker exiting", True)
 
 
@@ -0,0 +1,223 @@
+"""
+Link supervisor worker that sends heartbeats and monitors the drone's heartbeats in one process.
+"""
+
+import asyncio
+import os
+import pathlib
+
+from pymavlink import mavutil
+
+from utilities.workers import periodic_scheduler
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import connection_state
+from . import heartbeat_receiver
+from . import heartbeat_registry
+from . import heartbeat_sender
+from ..common.modules.logger import logger
+
+
+HEARTBEAT_PERIOD = 1  # seconds
+JITTER_REPORT_PERIOD = 60  # seconds
+# Longest wait before noticing an exit or pause request
+CONTROLLER_POLL_PERIOD = 0.1  # seconds
+
+# Link connection state, or a vehicle or component on the link connecting or disconnecting
+LinkEvent = connection_state.ConnectionEvent | heartbeat_registry.VehicleEvent
+
+
+async def watch_controller(
+    controller: worker_controller.WorkerController, stop: asyncio.Event, resumed: asyncio.Event
+) -> None:
+    """
+    Sets stop when main requests an exit, and clears resumed while main requests a pause.
+    """
+    loop = asyncio.get_running_loop()
+    while not controller.is_exit_requested():
+        # check_pause() blocks while paused, so it waits on a thread instead of the event loop
+        pause_check = loop.run_in_executor(None, controller.check_pause)
+        done, _ = await asyncio.wait({pause_check}, timeout=CONTROLLER_POLL_PERIOD)
+        if len(done) == 0:
+            resumed.clear()
+            await pause_check
+            resumed.set()
+
+        await asyncio.to_thread(controller.wait_for_exit, CONTROLLER_POLL_PERIOD)
+
+    stop.set()
+    # Tasks waiting to resume see the stop
+    resumed.set()
+
+
+async def monitor_heartbeats(
+    receiver: heartbeat_receiver.HeartbeatReceiver,
+    events: "asyncio.Queue[LinkEvent | None]",
+    stop: asyncio.Event,
+    resumed: asyncio.Event,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Checks for the drone's heartbeat, passing on connection and vehicle events.
+    """
+    while not stop.is_set():
+        await resumed.wait()
+
+        # Waiting for a heartbeat blocks, so it waits on a thread instead of the event loop
+        try:
+            result, event = await asyncio.to_thread(receiver.run)
+        # A dropped link must not take down sending with it
+        except OSError as e:
+            local_logger.error(f"Failed to read from connection: {e}", True)
+            result = False
+
+        if not result:
+            local_logger.error("Failed to check heartbeat", True)
+            # Rather than retrying a broken connection as fast as it fails
+            try:
+                await asyncio.wait_for(stop.wait(), HEARTBEAT_PERIOD)
+            except asyncio.TimeoutError:
+                pass
+
+            continue
+
+        for vehicle_event in receiver.take_vehicle_events():
+            await events.put(vehicle_event)
+
+        if event is not None:
+            await events.put(event)
+
+    # Nothing more to track
+    await events.put(None)
+
+
+async def track_connection(
+    events: "asyncio.Queue[LinkEvent | None]",
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Sends connection events to main and logs them.
+    """
+    while True:
+        event = await events.get()
+        if event is None:
+            break
+
+        local_logger.info(f"Connection event: {event}", True)
+
+        # Main may be slow to read, which must not hold up the other tasks
+        await asyncio.to_thread(output_queue.queue.put, event)
+
+
+async def supervise(
+    scheduler: periodic_scheduler.PeriodicScheduler,
+    receiver: heartbeat_receiver.HeartbeatReceiver,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Runs every task of the link until main requests an exit. A pause request pauses
+    sending and monitoring.
+    """
+    stop = asyncio.Event()
+    resumed = asyncio.Event()
+    resumed.set()
+    events = asyncio.Queue()
+
+    await asyncio.gather(
+        watch_controller(controller, stop, resumed),
+        scheduler.run_async(stop, resumed),
+        monitor_heartbeats(receiver, events, stop, resumed, local_logger),
+        track_connection(events, output_queue, local_logger),
+    )
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+def link_supervisor_worker(
+    connection: mavutil.mavfile,
+    receive_connection: mavutil.mavfile,
+    keepalive_period: "float | None",
+    phi_threshold: "float | None",
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    connection is the MAVLink connection to the drone, heartbeats are sent on it
+    receive_connection is where the drone's heartbeats are read from, can be connection
+    keepalive_period is the longest time (s) between events, None for only state changes
+    phi_threshold is the phi accrual suspicion to disconnect at, None for a count of misses
+    output_queue is where we send connection_state.ConnectionEvent when the state changes,
+        and heartbeat_registry.VehicleEvent when a vehicle or component does
+    controller is how the main process communicates to this worker process
+    """
+    # =============================================================================================
+    #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+    # =============================================================================================
+
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # =============================================================================================
+    #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+    # =============================================================================================
+    # Instantiate class objects (HeartbeatSender, HeartbeatReceiver)
+
+    result, sender = heartbeat_sender.HeartbeatSender.create(connection, local_logger)
+    if not result:
+        local_logger.error("Failed to create HeartbeatSender", True)
+        return
+
+    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        receive_connection, local_logger, keepalive_period, phi_threshold
+    )
+    if not result:
+        local_logger.error("Failed to create HeartbeatReceiver", True)
+        return
+
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(controller)
+    if not result:
+        local_logger.error("Failed to create PeriodicScheduler", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert sender is not None
+    assert receiver is not None
+    assert scheduler is not None
+
+    def send_heartbeat() -> None:
+        if not sender.run():
+            local_logger.error("Failed to send heartbeat", True)
+
+    def log_jitter() -> None:
+        for line in scheduler.report():
+            local_logger.info(line, True)
+
+    # On fixed deadlines so heartbeats do not drift
+    scheduler.add("heartbeat", HEARTBEAT_PERIOD, send_heartbeat)
+    scheduler.add("jitter report", JITTER_REPORT_PERIOD, log_jitter)
+
+    asyncio.run(supervise(scheduler, receiver, output_queue, controller, local_logger))
+
+    log_jitter()
+    local_logger.info("Link supervisor worker exiting", True)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,168 @@
+"""
+Phi accrual failure detection from heartbeat arrival times.
+"""
+
+import collections
+import math
+
+
+class PhiAccrualDetector:  # pylint: disable=too-many-instance-attributes
+    """
+    Learns the time between heartbeats and gives phi, how unlikely it is that the next heartbeat
+    is still coming after this long: phi = -log10(P(later)). Phi 1 is a 10% chance,
+    phi 5 a 1 in 100 000 chance, so one phi threshold suits both steady and jittery links.
+
+    P(later) is the larger of two models, so neither flags what the other explains:
+    - Jitter: intervals are normally distributed, using the logistic approximation of the
+      normal distribution so phi stays finite far into the tail.
+    - Loss: each heartbeat is lost independently at the rate seen in the intervals,
+      so k heartbeat periods without one has probability loss^k.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        window_size: int,
+        period: float,
+        min_standard_deviation: float,
+        acceptable_pause: float,
+    ) -> "tuple[bool, PhiAccrualDetector | None]":
+        """
+        window_size is how many of the latest intervals to learn from.
+        period is how often (s) heartbeats are sent, the expected interval before any are
+        measured and how lost heartbeats are counted.
+        min_standard_deviation (s) keeps a very steady link from making phi jump on tiny delays.
+        acceptable_pause (s) is added to the expected interval, to tolerate missing heartbeats.
+        """
+        if window_size < 2 or period <= 0.0 or min_standard_deviation <= 0.0:
+            return False, None
+
+        if acceptable_pause < 0.0:
+            return False, None
+
+        return True, PhiAccrualDetector(
+            cls.__create_key, window_size, period, min_standard_deviation, acceptable_pause
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        window_size: int,
+        period: float,
+        min_standard_deviation: float,
+        acceptable_pause: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is PhiAccrualDetector.__create_key, "Use create() method"
+
+        self.__period = period
+        self.__min_standard_deviation = min_standard_deviation
+        self.__acceptable_pause = acceptable_pause
+
+        # Each interval, and how many heartbeats were lost in it
+        self.__intervals: "collections.deque[float]" = collections.deque(maxlen=window_size)
+        self.__losses: "collections.deque[int]" = collections.deque(maxlen=window_size)
+        self.__interval_sum = 0.0
+        self.__interval_squared_sum = 0.0
+        self.__loss_sum = 0
+
+        # Start with an estimate a quarter period either side, replaced as it learns
+        spread = period / 4
+        self.__add_interval(period - spread)
+        self.__add_interval(period + spread)
+
+        self.__last_arrival: "float | None" = None
+
+    def __add_interval(self, interval: float) -> None:
+        """
+        Include an interval in the window, dropping the oldest when full.
+        """
+        if len(self.__intervals) == self.__intervals.maxlen:
+            oldest = self.__intervals[0]
+            self.__interval_sum -= oldest
+            self.__interval_squared_sum -= oldest * oldest
+            self.__loss_sum -= self.__losses[0]
+
+        # A heartbeat late by half a period or more is counted as lost
+        lost = max(int(interval / self.__period + 0.5) - 1, 0)
+
+        self.__intervals.append(interval)
+        self.__losses.append(lost)
+        self.__interval_sum += interval
+        self.__interval_squared_sum += interval * interval
+        self.__loss_sum += lost
+
+    def start(self, now: float) -> None:
+        """
+        Measure from now (s) as if a heartbeat arrived, without learning an interval.
+        For the first heartbeat, and the first one after an outage.
+        """
+        self.__last_arrival = now
+
+    def heartbeat(self, now: float) -> None:
+        """
+        A heartbeat arrived at now (s).
+        """
+        if self.__last_arrival is not None:
+            self.__add_interval(now - self.__last_arrival)
+
+        self.__last_arrival = now
+
+    def mean(self) -> float:
+        """
+        Mean interval (s).
+        """
+        return self.__interval_sum / len(self.__intervals)
+
+    def standard_deviation(self) -> float:
+        """
+        Standard deviation of the intervals (s), at least the minimum.
+        """
+        mean = self.mean()
+        variance = max(self.__interval_squared_sum / len(self.__intervals) - mean * mean, 0.0)
+
+        return max(math.sqrt(variance), self.__min_standard_deviation)
+
+    def loss(self) -> float:
+        """
+        Fraction of heartbeats lost.
+        """
+        return self.__loss_sum / (self.__loss_sum + len(self.__intervals))
+
+    def phi(self, now: float) -> float:
+        """
+        Suspicion that the heartbeats have stopped, 0 before the first heartbeat or start().
+        """
+        if self.__last_arrival is None:
+            return 0.0
+
+        elapsed = now - self.__last_arrival
+        y = (elapsed - self.mean() - self.__acceptable_pause) / self.standard_deviation()
+
+        # Logistic approximation of the normal tail, P(later) = 1 / (1 + exp(-exponent))
+        exponent = -y * (1.5976 + 0.070566 * y * y)
+        if exponent > 0.0:
+            phi = math.log10(1.0 + math.exp(-exponent))
+        else:
+            # Same, rearranged so exp() does not overflow far into the tail
+            phi = -exponent / math.log(10) + math.log10(1.0 + math.exp(exponent))
+
+        missed = self.missed_heartbeats(now)
+        loss = self.loss()
+        if missed > 0 and loss > 0.0:
+            phi = min(phi, -missed * math.log10(loss))
+
+        return phi
+
+    def missed_heartbeats(self, now: float) -> int:
+        """
+        How many heartbeat periods have passed by now (s) since the last heartbeat.
+        """
+        if self.__last_arrival is None:
+            return 0
+
+        return int((now - self.__last_arrival) / self.__period)
@@ -0,0 +1,148 @@
+"""
+Replaying recorded MAVLink telemetry logs.
+"""
+
+import pathlib
+import time
+
+from pymavlink import mavutil
+
+
+class TlogReplay:
+    """
+    Stands in for a mavutil.mavfile connected to a drone, receiving the messages of a
+    recorded .tlog file at the pace they were recorded (or faster).
+
+    Anything sent is discarded.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, path: pathlib.Path, speed: float) -> "tuple[bool, TlogReplay | None]":
+        """
+        path is the .tlog file to replay.
+        speed is how many times faster than recorded to replay, <= 0 for as fast as possible.
+        """
+        try:
+            log = mavutil.mavlogfile(str(path))
+        # Catching all exceptions for library call
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            return False, None
+
+        return True, TlogReplay(cls.__create_key, log, speed)
+
+    def __init__(
+        self, class_private_create_key: object, log: mavutil.mavfile, speed: float
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is TlogReplay.__create_key, "Use create() method"
+
+        self.__log = log
+        self.__speed = speed
+
+        # Wall clock time minus scaled log time, set by the first message to pace the rest
+        self.__time_offset = None
+
+        # Next message, read from the log but not yet due
+        self.__next_msg = None
+        self.__is_finished = False
+
+        self.sent_bytes = 0
+        self.mav = mavutil.mavlink.MAVLink(self, srcSystem=255, srcComponent=0)
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Discards outgoing messages, used by mav.
+        """
+        self.sent_bytes += len(buffer)
+
+    def is_finished(self) -> bool:
+        """
+        Whether every message in the log has been received.
+        """
+        return self.__is_finished
+
+    def __due_time(self, msg: object) -> float:
+        """
+        Wall clock time the message is to be received at.
+        """
+        if self.__speed <= 0.0:
+            return 0.0
+
+        # Time of the message in the log, set by mavlogfile
+        # pylint: disable-next=protected-access
+        log_time = msg._timestamp / self.__speed
+        if self.__time_offset is None:
+            self.__time_offset = time.time() - log_time
+
+        return self.__time_offset + log_time
+
+    def recv_match(
+        self,
+        condition: "str | None" = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "object | None":
+        """
+        Same interface as `mavfile.recv_match()`, condition is not supported.
+
+        Messages of other types are discarded like on a real connection.
+        """
+        assert condition is None, "condition is not supported"
+
+        message_types = type
+        if message_types is not None and not isinstance(message_types, (list, set)):
+            message_types = [message_types]
+
+        start_time = time.time()
+        while True:
+            remaining_time = None
+            if timeout is not None:
+                remaining_time = timeout - (time.time() - start_time)
+
+            if self.__next_msg is None:
+                self.__next_msg = self.__log.recv_match(blocking=False)
+
+            # Nothing more to receive, the drone went silent
+            if self.__next_msg is None:
+                self.__is_finished = True
+                if blocking and remaining_time is not None and remaining_time > 0.0:
+                    time.sleep(remaining_time)
+
+                return None
+
+            wait_time = self.__due_time(self.__next_msg) - time.time()
+            if wait_time > 0.0:
+                if not blocking:
+                    return None
+
+                if remaining_time is not None:
+                    if remaining_time <= 0.0:
+                        return None
+
+                    wait_time = min(wait_time, remaining_time)
+
+                time.sleep(wait_time)
+                continue
+
+            msg = self.__next_msg
+            self.__next_msg = None
+
+            if message_types is None or msg.get_type() in message_types:
+                # Received now, like on a live connection
+                # pylint: disable-next=protected-access
+                msg._timestamp = time.time()
+                return msg
+
+    def wait_heartbeat(
+        self, blocking: bool = True, timeout: "float | None" = None
+    ) -> "object | None":
+        """
+        Same interface as `mavfile.wait_heartbeat()`.
+        """
+        return self.recv_match(type="HEARTBEAT", blocking=blocking, timeout=timeout)
@@ -0,0 +1,211 @@
+"""
+Link quality of each MAVLink source from the messages it sends.
+"""
+
+import collections
+import math
+
+
+# MAVLink sequence numbers wrap at 256
+SEQUENCE_MODULUS = 256
+# A jump back this far is taken as reordering or a restarted sender rather than loss
+REORDER_THRESHOLD = SEQUENCE_MODULUS // 2
+
+
+class LinkQualitySnapshot:
+    """
+    Link quality of one source over its recent window.
+    """
+
+    __slots__ = (
+        "system_id",
+        "component_id",
+        "message_rate",
+        "byte_rate",
+        "loss",
+        "heartbeat_jitter",
+        "silence",
+    )
+
+    def __init__(
+        self,
+        system_id: int,
+        component_id: int,
+        message_rate: float,
+        byte_rate: float,
+        loss: float,
+        heartbeat_jitter: "float | None",
+        silence: float,
+    ) -> None:
+        self.system_id = system_id
+        self.component_id = component_id
+        # Messages and bytes per second over the window, up to now
+        self.message_rate = message_rate
+        self.byte_rate = byte_rate
+        # Fraction of messages lost, from gaps in the sequence numbers
+        self.loss = loss
+        # Standard deviation of the time between heartbeats (s), None before 3 heartbeats
+        self.heartbeat_jitter = heartbeat_jitter
+        # Time since the last message (s)
+        self.silence = silence
+
+    def __str__(self) -> str:
+        """
+        To string.
+        """
+        jitter = "-" if self.heartbeat_jitter is None else f"{self.heartbeat_jitter * 1000:.1f} ms"
+        return (
+            f"{self.system_id}/{self.component_id}: {self.message_rate:.1f} msg/s, "
+            f"{self.byte_rate:.0f} B/s, loss {self.loss * 100:.1f}%, "
+            f"heartbeat jitter {jitter}, silent {self.silence:.1f} s"
+        )
+
+
+class SourceWindow:
+    """
+    Recent messages of one source, with running totals so adding a message is O(1).
+    """
+
+    __slots__ = ("messages", "byte_total", "lost_total", "last_seq", "heartbeat_times")
+
+    def __init__(self, message_window_size: int, heartbeat_window_size: int) -> None:
+        # (arrival time, size in bytes, messages lost just before it)
+        self.messages: "collections.deque[tuple[float, int, int]]" = collections.deque(
+            maxlen=message_window_size
+        )
+        self.byte_total = 0
+        self.lost_total = 0
+        self.last_seq: "int | None" = None
+        self.heartbeat_times: "collections.deque[float]" = collections.deque(
+            maxlen=heartbeat_window_size
+        )
+
+
+class LinkQualityMonitor:
+    """
+    Tracks message rate, byte rate, loss and heartbeat jitter of each (system ID, component ID)
+    over fixed size windows of its most recent messages and heartbeats.
+
+    A saturated link keeps a high byte rate while losing messages and delaying heartbeats,
+    a silent vehicle stops sending altogether.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls, message_window_size: int, heartbeat_window_size: int
+    ) -> "tuple[bool, LinkQualityMonitor | None]":
+        """
+        message_window_size is how many of each source's latest messages to keep.
+        heartbeat_window_size is how many of each source's latest heartbeat times to keep.
+        """
+        if message_window_size < 2 or heartbeat_window_size < 3:
+            return False, None
+
+        return True, LinkQualityMonitor(
+            cls.__create_key, message_window_size, heartbeat_window_size
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        message_window_size: int,
+        heartbeat_window_size: int,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is LinkQualityMonitor.__create_key, "Use create() method"
+
+        self.__message_window_size = message_window_size
+        self.__heartbeat_window_size = heartbeat_window_size
+
+        self.__sources: "dict[tuple[int, int], SourceWindow]" = {}
+
+    def add(
+        self,
+        system_id: int,
+        component_id: int,
+        seq: int,
+        size: int,
+        is_heartbeat: bool,
+        now: float,
+    ) -> None:
+        """
+        Include a received message.
+
+        seq is its MAVLink sequence number, size its length in bytes,
+        now the time it arrived (s, monotonic).
+        """
+        source = self.__sources.get((system_id, component_id))
+        if source is None:
+            source = SourceWindow(self.__message_window_size, self.__heartbeat_window_size)
+            self.__sources[(system_id, component_id)] = source
+
+        lost = 0
+        if source.last_seq is not None:
+            lost = (seq - source.last_seq - 1) % SEQUENCE_MODULUS
+            if lost >= REORDER_THRESHOLD:
+                lost = 0
+
+        source.last_seq = seq
+
+        if len(source.messages) == self.__message_window_size:
+            _, oldest_size, oldest_lost = source.messages[0]
+            source.byte_total -= oldest_size
+            source.lost_total -= oldest_lost
+
+        source.messages.append((now, size, lost))
+        source.byte_total += size
+        source.lost_total += lost
+
+        if is_heartbeat:
+            source.heartbeat_times.append(now)
+
+    def snapshots(self, now: float) -> "list[LinkQualitySnapshot]":
+        """
+        Link quality of every source seen, now is the current time (s, monotonic).
+        """
+        snapshots = []
+        for (system_id, component_id), source in self.__sources.items():
+            oldest_time = source.messages[0][0]
+            newest_time = source.messages[-1][0]
+
+            # Up to now, so the rates fall while a source is silent
+            elapsed = now - oldest_time
+            message_rate = 0.0
+            byte_rate = 0.0
+            if elapsed > 0.0:
+                message_rate = len(source.messages) / elapsed
+                byte_rate = source.byte_total / elapsed
+
+            loss = source.lost_total / (source.lost_total + len(source.messages))
+
+            snapshots.append(
+                LinkQualitySnapshot(
+                    system_id,
+                    component_id,
+                    message_rate,
+                    byte_rate,
+                    loss,
+                    self.__jitter(source.heartbeat_times),
+                    now - newest_time,
+                )
+            )
+
+        return snapshots
+
+    @staticmethod
+    def __jitter(times: "collections.deque[float]") -> "float | None":
+        """
+        Sample standard deviation of the time between consecutive arrivals.
+        """
+        if len(times) < 3:
+            return None
+
+        intervals = [times[i + 1] - times[i] for i in range(len(times) - 1)]
+        mean = sum(intervals) / len(intervals)
+        variance = sum((interval - mean) ** 2 for interval in intervals) / (len(intervals) - 1)
+
+        return math.sqrt(variance)
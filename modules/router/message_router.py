@@ -0,0 +1,151 @@
+"""
+MAVLink message routing logic.
+"""
+
+import queue
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from . import link_quality
+from ..common.modules.logger import logger
+
+
+class MessageRouter:
+    """
+    MessageRouter class to own the MAVLink link, parse each frame once,
+    and dispatch messages by type to the subscribed queues.
+    """
+
+    __private_key = object()
+
+    __RECEIVE_TIMEOUT = 0.1  # seconds
+    # Link quality windows of each source
+    __LINK_QUALITY_MESSAGE_WINDOW_SIZE = 500
+    __LINK_QUALITY_HEARTBEAT_WINDOW_SIZE = 10
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+    ) -> "tuple[True, MessageRouter] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a MessageRouter object.
+        """
+        if connection is None:
+            local_logger.error("Connection is None", True)
+            return False, None
+
+        result, monitor = link_quality.LinkQualityMonitor.create(
+            cls.__LINK_QUALITY_MESSAGE_WINDOW_SIZE, cls.__LINK_QUALITY_HEARTBEAT_WINDOW_SIZE
+        )
+        if not result:
+            local_logger.error("Failed to create link quality monitor", True)
+            return False, None
+
+        return True, MessageRouter(cls.__private_key, connection, monitor, local_logger)
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        monitor: link_quality.LinkQualityMonitor,
+        local_logger: logger.Logger,
+    ) -> None:
+        assert key is MessageRouter.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__monitor = monitor
+        self.__logger = local_logger
+
+        # Message type to the queues subscribed to it
+        self.__subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]" = {}
+
+        # Per type counters since the last rate report
+        self.__received_counts: "dict[str, int]" = {}
+        self.__dropped_counts: "dict[str, int]" = {}
+        self.__window_start = time.time()
+
+    def subscribe(
+        self,
+        message_types: "list[str]",
+        output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    ) -> bool:
+        """
+        Send every message of the given types to the output queue.
+        """
+        if len(message_types) == 0:
+            self.__logger.error("No message types to subscribe to", True)
+            return False
+
+        for message_type in message_types:
+            subscribers = self.__subscriptions.setdefault(message_type, [])
+            if output_queue not in subscribers:
+                subscribers.append(output_queue)
+
+        return True
+
+    def run(self) -> "tuple[bool, str | None]":
+        """
+        Receive a single message from the drone and send it to its subscribers.
+
+        Returns the type of the routed message, or None if nothing arrived before the timeout.
+        """
+        msg = self.__connection.recv_match(blocking=True, timeout=self.__RECEIVE_TIMEOUT)
+        if msg is None:
+            return True, None
+
+        message_type = msg.get_type()
+        if message_type == "BAD_DATA":
+            self.__logger.warning("Received bad data", True)
+            return False, None
+
+        self.__received_counts[message_type] = self.__received_counts.get(message_type, 0) + 1
+        self.__monitor.add(
+            msg.get_srcSystem(),
+            msg.get_srcComponent(),
+            msg.get_seq(),
+            len(msg.get_msgbuf()),
+            message_type == "HEARTBEAT",
+            time.monotonic(),
+        )
+
+        for output_queue in self.__subscriptions.get(message_type, []):
+            # Never block the link on a slow consumer, the other subscribers would starve
+            try:
+                output_queue.queue.put_nowait(msg)
+            except queue.Full:
+                self.__dropped_counts[message_type] = self.__dropped_counts.get(message_type, 0) + 1
+
+        return True, message_type
+
+    def get_message_rates(self) -> "tuple[dict[str, float], dict[str, int]]":
+        """
+        Returns the receive rate (Hz) and dropped count of each message type
+        since the previous call, then starts a new counting window.
+        """
+        now = time.time()
+        elapsed = now - self.__window_start
+
+        rates = {}
+        if elapsed > 0.0:
+            rates = {
+                message_type: count / elapsed
+                for message_type, count in self.__received_counts.items()
+            }
+
+        dropped = self.__dropped_counts
+
+        self.__received_counts = {}
+        self.__dropped_counts = {}
+        self.__window_start = now
+
+        return rates, dropped
+
+    def get_link_quality(self) -> "list[link_quality.LinkQualitySnapshot]":
+        """
+        Returns the link quality of each (system ID, component ID) that has sent messages.
+        """
+        return self.__monitor.snapshots(time.monotonic())
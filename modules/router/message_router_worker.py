@@ -0,0 +1,93 @@
+"""
+Message router worker that distributes MAVLink messages to the other workers.
+"""
+
+import os
+import pathlib
+import queue
+
+from pymavlink import mavutil
+
+from utilities.workers import periodic_scheduler
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import message_router
+from ..common.modules.logger import logger
+
+
+RATE_REPORT_PERIOD = 5  # seconds
+
+
+def message_router_worker(
+    connection: mavutil.mavfile,
+    subscriptions: "list[tuple[list[str], queue_proxy_wrapper.QueueProxyWrapper]]",
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    connection is the MAVLink connection to the drone, this worker is the only one reading from it
+    subscriptions are the message types to send to each output queue
+    output_queue is where we send the link quality of every source every RATE_REPORT_PERIOD,
+        as a list of link_quality.LinkQualitySnapshot
+    controller is how the main process communicates to this worker process
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # Instantiate class object (message_router.MessageRouter)
+    result, router = message_router.MessageRouter.create(connection, local_logger)
+    if not result:
+        local_logger.error("Failed to create MessageRouter", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert router is not None
+
+    for message_types, subscribed_queue in subscriptions:
+        if not router.subscribe(message_types, subscribed_queue):
+            local_logger.error(f"Failed to subscribe to {message_types}", True)
+            return
+
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(controller)
+    if not result:
+        local_logger.error("Failed to create PeriodicScheduler", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert scheduler is not None
+
+    def report() -> None:
+        rates, dropped = router.get_message_rates()
+        local_logger.info(f"Message rates (Hz): {rates}, dropped: {dropped}", True)
+
+        # Routing must not wait on a slow consumer, it gets the next report instead
+        try:
+            output_queue.queue.put_nowait(router.get_link_quality())
+        except queue.Full:
+            local_logger.warning("Link quality report dropped, output queue full", True)
+
+    # First report after a full period of messages
+    scheduler.add("rate report", RATE_REPORT_PERIOD, report, RATE_REPORT_PERIOD)
+
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        result, _ = router.run()
+        if not result:
+            local_logger.error("Failed to route message", True)
+
+        scheduler.run_due()
+
+    local_logger.info("Message router worker exiting", True)
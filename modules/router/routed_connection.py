@@ -0,0 +1,110 @@
+"""
+Receive side of a MAVLink connection fed by the message router.
+"""
+
+import collections
+import queue
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+
+
+class RoutedConnection:
+    """
+    Stands in for a mavutil.mavfile in workers that only read from the drone,
+    taking messages from a router queue instead of parsing the link themselves.
+
+    Messages of a type that was not asked for are kept until they are asked for,
+    rather than being thrown away like `mavfile.recv_match()` does. Only the newest
+    __PENDING_MAX_SIZE are kept, the oldest are dropped and counted like the router's.
+    """
+
+    __PENDING_MAX_SIZE = 100
+
+    def __init__(
+        self,
+        connection: mavutil.mavfile,
+        input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    ) -> None:
+        """
+        connection is the shared MAVLink connection, only used for sending.
+        input_queue is the router queue subscribed to the message types this worker reads.
+        """
+        self.mav = connection.mav
+        self.__input_queue = input_queue
+        self.__pending = collections.deque(maxlen=self.__PENDING_MAX_SIZE)
+
+        # Per type count of pending messages dropped since the last call to get_dropped()
+        self.__dropped_counts: "dict[str, int]" = {}
+
+    def get_dropped(self) -> "dict[str, int]":
+        """
+        Returns the number of pending messages of each type dropped to make room for newer ones
+        since the previous call.
+        """
+        dropped = self.__dropped_counts
+        self.__dropped_counts = {}
+
+        return dropped
+
+    def __take_pending(self, message_types: "list[str] | None") -> "object | None":
+        """
+        Removes and returns the oldest pending message of the given types.
+        """
+        for i, msg in enumerate(self.__pending):
+            if message_types is None or msg.get_type() in message_types:
+                del self.__pending[i]
+                return msg
+
+        return None
+
+    def recv_match(
+        self,
+        condition: "str | None" = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "object | None":
+        """
+        Same interface as `mavfile.recv_match()`, condition is not supported.
+        """
+        assert condition is None, "condition is not supported"
+
+        message_types = type
+        if message_types is not None and not isinstance(message_types, (list, set)):
+            message_types = [message_types]
+
+        msg = self.__take_pending(message_types)
+        if msg is not None:
+            return msg
+
+        start_time = time.time()
+        while True:
+            try:
+                if not blocking:
+                    msg = self.__input_queue.queue.get_nowait()
+                elif timeout is None:
+                    msg = self.__input_queue.queue.get()
+                else:
+                    remaining_time = timeout - (time.time() - start_time)
+                    if remaining_time <= 0.0:
+                        return None
+
+                    msg = self.__input_queue.queue.get(timeout=remaining_time)
+            except queue.Empty:
+                return None
+
+            # Sentinel from filling and draining the queue
+            if msg is None:
+                continue
+
+            if message_types is None or msg.get_type() in message_types:
+                return msg
+
+            if len(self.__pending) == self.__pending.maxlen:
+                dropped_type = self.__pending[0].get_type()
+                self.__dropped_counts[dropped_type] = self.__dropped_counts.get(dropped_type, 0) + 1
+
+            self.__pending.append(msg)
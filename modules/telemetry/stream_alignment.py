@@ -0,0 +1,158 @@
+"""
+Aligning telemetry streams to a common timestamp.
+"""
+
+import collections
+import math
+
+
+class StreamHistory:
+    """
+    Short history of a telemetry stream, where each sample has 3 values and their rates of change
+    (e.g. position and velocity, or attitude and angular rate).
+
+    Gives the stream's values at any time by interpolating between the samples around it,
+    or extrapolating from the nearest sample with its rates.
+    Memory and time per call are bounded by the history size.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls, history_size: int, is_angle: bool, max_extrapolation: int
+    ) -> "tuple[True, StreamHistory] | tuple[False, None]":
+        """
+        history_size is the number of samples kept, at least 2 to interpolate.
+        is_angle is whether the values are angles in radians, kept in [-pi, pi].
+        max_extrapolation is the longest time (ms) past the nearest sample to extrapolate,
+        further than that the values are held.
+        """
+        if history_size < 2:
+            return False, None
+
+        if max_extrapolation < 0:
+            return False, None
+
+        return True, StreamHistory(cls.__private_key, history_size, is_angle, max_extrapolation)
+
+    def __init__(
+        self, key: object, history_size: int, is_angle: bool, max_extrapolation: int
+    ) -> None:
+        assert key is StreamHistory.__private_key, "Use create() method"
+
+        self.__samples = collections.deque(maxlen=history_size)
+        self.__is_angle = is_angle
+        self.__max_extrapolation = max_extrapolation
+
+    @staticmethod
+    def __wrap_angle(angle: float) -> float:
+        """
+        Wrap into [-pi, pi].
+        """
+        return math.atan2(math.sin(angle), math.cos(angle))
+
+    def add(
+        self,
+        time_ms: int,
+        values: "tuple[float, float, float]",
+        rates: "tuple[float, float, float]",
+    ) -> None:
+        """
+        Record a sample, rates are per second.
+
+        A repeated time replaces the previous sample, and time going backwards
+        (e.g. the autopilot rebooted) starts a new history.
+        """
+        if len(self.__samples) > 0:
+            newest_time = self.__samples[-1][0]
+            if time_ms < newest_time:
+                self.__samples.clear()
+            elif time_ms == newest_time:
+                self.__samples.pop()
+
+        self.__samples.append((time_ms, values, rates))
+
+    def newest_time(self) -> "int | None":
+        """
+        Time (ms) of the latest sample, None if there are none.
+        """
+        if len(self.__samples) == 0:
+            return None
+
+        return self.__samples[-1][0]
+
+    def at(
+        self, time_ms: int
+    ) -> "tuple[True, tuple[float, float, float], tuple[float, float, float]] | tuple[False, None, None]":
+        """
+        Values and rates of the stream at the time.
+        """
+        if len(self.__samples) == 0:
+            return False, None, None
+
+        # Extrapolate from the ends
+        oldest_time, oldest_values, oldest_rates = self.__samples[0]
+        if time_ms <= oldest_time:
+            return (
+                True,
+                self.__extrapolate(oldest_values, oldest_rates, time_ms - oldest_time),
+                oldest_rates,
+            )
+
+        newest_time, newest_values, newest_rates = self.__samples[-1]
+        if time_ms >= newest_time:
+            return (
+                True,
+                self.__extrapolate(newest_values, newest_rates, time_ms - newest_time),
+                newest_rates,
+            )
+
+        # Interpolate between the samples around the time, searching from the newest
+        for i in range(len(self.__samples) - 1, 0, -1):
+            before_time, before_values, before_rates = self.__samples[i - 1]
+            if before_time > time_ms:
+                continue
+
+            after_time, after_values, after_rates = self.__samples[i]
+            fraction = (time_ms - before_time) / (after_time - before_time)
+
+            values = tuple(
+                self.__interpolate(before, after, fraction)
+                for before, after in zip(before_values, after_values)
+            )
+            rates = tuple(
+                before + (after - before) * fraction
+                for before, after in zip(before_rates, after_rates)
+            )
+            return True, values, rates
+
+        # Unreachable since the time is between the oldest and newest samples
+        return False, None, None
+
+    def __extrapolate(
+        self,
+        values: "tuple[float, float, float]",
+        rates: "tuple[float, float, float]",
+        delta_ms: int,
+    ) -> "tuple[float, float, float]":
+        """
+        Move the values along their rates, for at most the maximum extrapolation time.
+        """
+        delta_ms = max(-self.__max_extrapolation, min(delta_ms, self.__max_extrapolation))
+        delta = delta_ms / 1000
+
+        extrapolated = tuple(value + rate * delta for value, rate in zip(values, rates))
+        if self.__is_angle:
+            extrapolated = tuple(self.__wrap_angle(value) for value in extrapolated)
+
+        return extrapolated
+
+    def __interpolate(self, before: float, after: float, fraction: float) -> float:
+        """
+        Linear interpolation, angles take the short way around.
+        """
+        if not self.__is_angle:
+            return before + (after - before) * fraction
+
+        return self.__wrap_angle(before + self.__wrap_angle(after - before) * fraction)
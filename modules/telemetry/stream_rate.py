@@ -0,0 +1,145 @@
+"""
+Closed loop control of the rate a message is streamed at.
+"""
+
+
+class StreamRateController:  # pylint: disable=too-many-instance-attributes
+    """
+    Decides the rate to request a message stream at, from the rate it is actually received at
+    and whether the consumers of the telemetry keep up.
+
+    The rate is lowered while the backlog of unconsumed telemetry keeps growing or stays at
+    its limit, and raised back towards the desired rate once the backlog is cleared.
+    """
+
+    __create_key = object()
+
+    # Backlog must grow for this many updates in a row to be lag, not noise
+    __LAG_UPDATES = 2
+    # Backlog at this fraction of its limit is lag even if it is not growing, as a full queue cannot
+    __FULL_FRACTION = 0.9
+    # Backlog must be empty for this many updates in a row before raising the rate again
+    __RECOVERY_UPDATES = 5
+    __DECREASE_FACTOR = 0.5
+    __INCREASE_FACTOR = 1.25
+
+    # Achieved rate within this fraction of the requested rate is verified
+    __RATE_TOLERANCE = 0.8
+    # Give up re-sending the request if the rate is not achieved after this many attempts
+    __MAX_REQUEST_ATTEMPTS = 3
+
+    @classmethod
+    def create(
+        cls, desired_rate: float, min_rate: float
+    ) -> "tuple[True, StreamRateController] | tuple[False, None]":
+        """
+        desired_rate is the rate (Hz) to stream at when consumers keep up.
+        min_rate is the lowest rate (Hz) to lower it to.
+        """
+        if min_rate <= 0.0 or desired_rate < min_rate:
+            return False, None
+
+        return True, StreamRateController(cls.__create_key, desired_rate, min_rate)
+
+    def __init__(self, key: object, desired_rate: float, min_rate: float) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert key is StreamRateController.__create_key, "Use create() method"
+
+        self.__desired_rate = desired_rate
+        self.__min_rate = min_rate
+        self.__requested_rate = desired_rate
+        self.__request_attempts = 1
+
+        self.__message_count = 0
+        self.__last_update_time = None
+        self.__achieved_rate = None
+
+        self.__last_backlog = 0
+        self.__lag_updates = 0
+        self.__recovery_updates = 0
+
+    def requested_rate(self) -> float:
+        """
+        Rate (Hz) that should be requested from the drone.
+        """
+        return self.__requested_rate
+
+    def achieved_rate(self) -> "float | None":
+        """
+        Rate (Hz) the message was received at between the last two updates, None before that.
+        """
+        return self.__achieved_rate
+
+    def is_verified(self) -> bool:
+        """
+        Whether the message was received close to the requested rate between the last two updates.
+        """
+        return (
+            self.__achieved_rate is not None
+            and self.__achieved_rate >= self.__requested_rate * self.__RATE_TOLERANCE
+        )
+
+    def add_message(self) -> None:
+        """
+        Count a received message.
+        """
+        self.__message_count += 1
+
+    def update(self, now: float, backlog: int, max_backlog: int = 0) -> bool:
+        """
+        Measure the achieved rate since the last update and adjust the requested rate.
+
+        now is the current time in seconds.
+        backlog is the number of items produced but not yet consumed.
+        max_backlog is the most the backlog can hold, <= 0 for no limit.
+
+        Returns whether the requested rate has to be sent to the drone.
+        """
+        if self.__last_update_time is None:
+            self.__last_update_time = now
+            self.__message_count = 0
+            self.__last_backlog = backlog
+            return False
+
+        elapsed = now - self.__last_update_time
+        if elapsed <= 0.0:
+            return False
+
+        self.__achieved_rate = self.__message_count / elapsed
+        self.__last_update_time = now
+        self.__message_count = 0
+
+        is_growing = backlog > 0 and backlog > self.__last_backlog
+        is_full = max_backlog > 0 and backlog >= max_backlog * self.__FULL_FRACTION
+        self.__last_backlog = backlog
+        self.__lag_updates = self.__lag_updates + 1 if is_growing or is_full else 0
+        self.__recovery_updates = self.__recovery_updates + 1 if backlog == 0 else 0
+
+        if self.__lag_updates >= self.__LAG_UPDATES and self.__requested_rate > self.__min_rate:
+            self.__set_requested_rate(self.__requested_rate * self.__DECREASE_FACTOR)
+            return True
+
+        if (
+            self.__recovery_updates >= self.__RECOVERY_UPDATES
+            and self.__requested_rate < self.__desired_rate
+        ):
+            self.__set_requested_rate(self.__requested_rate * self.__INCREASE_FACTOR)
+            return True
+
+        # Request may have been lost, or the drone may not support the rate
+        if not self.is_verified() and self.__request_attempts < self.__MAX_REQUEST_ATTEMPTS:
+            self.__request_attempts += 1
+            return True
+
+        return False
+
+    def __set_requested_rate(self, rate: float) -> None:
+        """
+        Change the requested rate, clamped to the allowed range.
+        """
+        self.__requested_rate = min(max(rate, self.__min_rate), self.__desired_rate)
+        self.__request_attempts = 1
+        self.__lag_updates = 0
+        self.__recovery_updates = 0
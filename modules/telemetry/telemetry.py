@@ -2,18 +2,54 @@
 Telemetry gathering logic.
 """
 
+import enum
+import math
+import struct
 import time
+import typing
 
+import numpy as np
 from pymavlink import mavutil
 
+from utilities.workers import latency_stamps
+from . import stream_alignment
+from . import stream_rate
 from ..common.modules.logger import logger
 
 
 class TelemetryData:  # pylint: disable=too-many-instance-attributes
     """
     Python struct to represent Telemtry Data. Contains the most recent attitude and position reading.
+
+    Has a fixed layout so it can be sent between processes as a small binary record.
     """
 
+    FIELDS = (
+        "time_since_boot",
+        "x",
+        "y",
+        "z",
+        "x_velocity",
+        "y_velocity",
+        "z_velocity",
+        "roll",
+        "pitch",
+        "yaw",
+        "roll_speed",
+        "pitch_speed",
+        "yaw_speed",
+        "attitude_time_since_boot",
+        "position_time_since_boot",
+        "system_id",
+    )
+    __slots__ = FIELDS + ("stamps",)
+
+    # Fields in FIELDS order followed by a bitmask of which fields and stamps are not None,
+    # then the stamps
+    __RECORD_FORMAT = struct.Struct("<I12d2IBI")
+    __STAMPS_VALID_BIT = 1 << len(FIELDS)
+    RECORD_SIZE = __RECORD_FORMAT.size + latency_stamps.LatencyStamps.RECORD_FORMAT.size  # bytes
+
     def __init__(
         self,
         time_since_boot: int | None = None,  # ms
@@ -29,6 +65,10 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         roll_speed: float | None = None,  # rad/s
         pitch_speed: float | None = None,  # rad/s
         yaw_speed: float | None = None,  # rad/s
+        attitude_time_since_boot: int | None = None,  # ms
+        position_time_since_boot: int | None = None,  # ms
+        system_id: int | None = None,
+        stamps: latency_stamps.LatencyStamps | None = None,
     ) -> None:
         self.time_since_boot = time_since_boot
         self.x = x
@@ -44,6 +84,72 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         self.pitch_speed = pitch_speed
         self.yaw_speed = yaw_speed
 
+        # Source timestamps of the attitude (roll to yaw_speed)
+        # and position (x to z_velocity) fields
+        self.attitude_time_since_boot = attitude_time_since_boot
+        self.position_time_since_boot = position_time_since_boot
+
+        # MAVLink system ID of the vehicle, None for the only vehicle
+        self.system_id = system_id
+
+        # Times this sample passed each pipeline stage, extended by each worker it passes through
+        self.stamps = stamps
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs into a fixed size record, None is packed as 0 and marked in the bitmask.
+
+        Raises struct.error if a field does not fit the record: the times must be whole
+        milliseconds in [0, 2^32), and the system ID in [0, 255].
+        """
+        values = []
+        valid_mask = 0
+        for i, name in enumerate(self.FIELDS):
+            value = getattr(self, name)
+            if value is None:
+                value = 0
+            else:
+                valid_mask |= 1 << i
+
+            values.append(value)
+
+        stamps = self.stamps
+        if stamps is None:
+            stamps = latency_stamps.LatencyStamps()
+        else:
+            valid_mask |= self.__STAMPS_VALID_BIT
+
+        return self.__RECORD_FORMAT.pack(*values, valid_mask) + stamps.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, record: "bytes | bytearray | memoryview") -> "TelemetryData":
+        """
+        Unpacks a record created by to_bytes().
+        """
+        *values, valid_mask = cls.__RECORD_FORMAT.unpack_from(record)
+
+        data = cls.__new__(cls)
+        for i, name in enumerate(cls.FIELDS):
+            setattr(data, name, values[i] if valid_mask & (1 << i) else None)
+
+        data.stamps = None
+        if valid_mask & cls.__STAMPS_VALID_BIT:
+            data.stamps = latency_stamps.LatencyStamps.from_bytes(
+                record[cls.__RECORD_FORMAT.size :]
+            )
+
+        return data
+
+    def __reduce__(self) -> "tuple":
+        # Pickle as the binary record, much smaller than the default for queues
+        try:
+            return TelemetryData.from_bytes, (self.to_bytes(),)
+        except struct.error:
+            pass
+
+        # Out of the record's range, pickle the fields as they are
+        return TelemetryData, tuple(getattr(self, name) for name in self.__slots__)
+
     def __str__(self) -> str:
         return f"""{{
             time_since_boot: {self.time_since_boot},
@@ -58,13 +164,126 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
             yaw: {self.yaw},
             roll_speed: {self.roll_speed},
             pitch_speed: {self.pitch_speed},
-            yaw_speed: {self.yaw_speed}
+            yaw_speed: {self.yaw_speed},
+            attitude_time_since_boot: {self.attitude_time_since_boot},
+            position_time_since_boot: {self.position_time_since_boot},
+            system_id: {self.system_id}
         }}"""
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+class TelemetryBatch:
+    """
+    Block of fused telemetry samples stored as columns, one per TelemetryData field
+    and one for the time each sample was received (s since epoch).
+
+    Each column is contiguous, and a missing value is NaN. Latency stamps are not kept.
+    """
+
+    FIELDS = TelemetryData.FIELDS + ("receive_time",)
+    __INTEGER_FIELDS = (
+        "time_since_boot",
+        "attitude_time_since_boot",
+        "position_time_since_boot",
+        "system_id",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Preallocates room for capacity samples.
+        """
+        self.data = np.full((len(self.FIELDS), capacity), np.nan)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def is_full(self) -> bool:
+        """
+        Whether the preallocated room is used up, appending more reallocates the columns.
+        """
+        return self.count >= self.data.shape[1]
+
+    def append(self, telemetry_data: TelemetryData, receive_time: float) -> None:
+        """
+        Adds a sample to the end of the batch, doubling the room if it is full.
+        """
+        if self.is_full():
+            grown = np.full((len(self.FIELDS), max(2 * self.data.shape[1], 1)), np.nan)
+            grown[:, : self.count] = self.data[:, : self.count]
+            self.data = grown
+
+        column = self.data[:, self.count]
+        for i, name in enumerate(TelemetryData.FIELDS):
+            value = getattr(telemetry_data, name)
+            if value is not None:
+                column[i] = value
+
+        column[-1] = receive_time
+        self.count += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Values of a field for the samples in the batch.
+        """
+        return self.data[self.FIELDS.index(name), : self.count]
+
+    def get(self, index: int) -> "tuple[TelemetryData, float]":
+        """
+        Sample at the index as TelemetryData and its receive time,
+        negative indices count from the end.
+        """
+        if index < 0:
+            index += self.count
+
+        assert 0 <= index < self.count, "Index out of range"
+
+        column = self.data[:, index].tolist()
+        values = {}
+        for i, name in enumerate(TelemetryData.FIELDS):
+            value = column[i]
+            if math.isnan(value):
+                value = None
+            elif name in self.__INTEGER_FIELDS:
+                value = int(value)
+
+            values[name] = value
+
+        return TelemetryData(**values), column[-1]
+
+    def save(self, file: "typing.BinaryIO") -> None:
+        """
+        Appends the batch to an open file, read it back with load().
+        """
+        np.save(file, self.data[:, : self.count])
+
+    @classmethod
+    def load(cls, file: "typing.BinaryIO") -> "TelemetryBatch":
+        """
+        Reads the next batch written by save().
+        """
+        data = np.load(file)
+
+        batch = cls(0)
+        batch.data = data
+        batch.count = data.shape[1]
+
+        return batch
+
+
+class TelemetryMode(enum.Enum):
+    """
+    How the telemetry worker produces TelemetryData.
+    """
+
+    # Wait for one of each message, output is limited by the slower message
+    POLLING = 0
+    # Output whenever either message arrives, using the latest of the other
+    STREAMING = 1
+
+
 class Telemetry:
     """
     Telemetry class to read position and attitude (orientation).
@@ -72,25 +291,64 @@ class Telemetry:
 
     __private_key = object()
 
+    # Attitude and position are aligned to the same time from their recent samples
+    __HISTORY_SIZE = 4
+    __MAX_EXTRAPOLATION = 1000  # ms
+
+    # Lowest rate to request when the consumers lag behind
+    __MIN_STREAM_RATE = 1  # Hz
+    __MESSAGE_IDS = {
+        "ATTITUDE": mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE,
+        "LOCAL_POSITION_NED": mavutil.mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED,
+    }
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        attitude_rate: "float | None" = None,
+        position_rate: "float | None" = None,
     ) -> "tuple[True, Telemetry] | tuple[False, None]":
         """
         Falliable create (instantiation) method to create a Telemetry object.
+
+        attitude_rate and position_rate are the rates (Hz) to request ATTITUDE and
+        LOCAL_POSITION_NED at, None to take whatever the drone sends.
         """
         if connection is None:
             local_logger.error("COnnection is None", True)
             return False, None
 
-        return True, Telemetry(cls.__private_key, connection, local_logger)
+        rate_controllers = {}
+        for message_type, rate in (
+            ("ATTITUDE", attitude_rate),
+            ("LOCAL_POSITION_NED", position_rate),
+        ):
+            if rate is None:
+                continue
+
+            result, rate_controller = stream_rate.StreamRateController.create(
+                rate, min(rate, cls.__MIN_STREAM_RATE)
+            )
+            if not result:
+                local_logger.error(f"Invalid {message_type} rate: {rate}", True)
+                return False, None
+
+            rate_controllers[message_type] = rate_controller
+
+        telem = Telemetry(cls.__private_key, connection, rate_controllers, local_logger)
+
+        for message_type in rate_controllers:
+            telem.__request_rate(message_type)
+
+        return True, telem
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
+        rate_controllers: "dict[str, stream_rate.StreamRateController]",
         local_logger: logger.Logger,
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
@@ -98,6 +356,18 @@ class Telemetry:
         self.__connection = connection
         self.__logger = local_logger
 
+        # Attitude and position histories of each vehicle, keyed by system ID
+        self.__histories = {}
+
+        # Time (ms since boot) of the last sample streamed for each vehicle, keyed by system ID
+        self.__streamed_times = {}
+
+        # Only for the messages with a requested rate
+        self.__rate_controllers = rate_controllers
+
+        # When the newest message was parsed from the link (s since epoch)
+        self.__receive_time = None
+
     def run(self) -> "tuple[bool, TelemetryData | None]":
         """
         Receive LOCAL_POSITION_NED and ATTITUDE messages from the drone,
@@ -105,7 +375,7 @@ class Telemetry:
         """
         # Read MAVLink message LOCAL_POSITION_NED (32)
         # Read MAVLink message ATTITUDE (30)
-        # Return the most recent of both, and use the most recent message's timestamp
+        # Return both aligned to the most recent message's timestamp
         attitude_msg = None
         position_msg = None
 
@@ -136,31 +406,245 @@ class Telemetry:
                     if position_msg is not None:
                         self.__logger.debug("Received LOCAL_POSITION_NED message", True)
 
-        if attitude_msg is None and position_msg is None:
+        if attitude_msg is None or position_msg is None:
+            self.__logger.error("Failed to receive messages", True)
+            return False, None
+
+        self.__record(attitude_msg)
+        self.__record(position_msg)
+
+        telemetry_data = self.__fuse(position_msg.get_srcSystem())
+        if telemetry_data is None:
+            self.__logger.error("Received messages from different vehicles", True)
+            return False, None
+
+        return True, telemetry_data
+
+    def run_streaming(self) -> "tuple[bool, TelemetryData | None]":
+        """
+        Receive a single LOCAL_POSITION_NED or ATTITUDE message from the drone,
+        combining it with the latest messages of the other type.
+
+        Returns None for the data until one of each message has been received from the vehicle,
+        and for messages that do not move its fused time forward, so no sample is repeated.
+        """
+        msg = self.__connection.recv_match(
+            type=["ATTITUDE", "LOCAL_POSITION_NED"], blocking=True, timeout=1.0
+        )
+        if msg is None:
             self.__logger.error("Failed to receive messages", True)
             return False, None
 
-        time_since_boot = max(attitude_msg.time_boot_ms, position_msg.time_boot_ms)
+        self.__logger.debug(f"Received {msg.get_type()} message", True)
+        self.__record(msg)
+
+        # None until the vehicle has sent both messages
+        system_id = msg.get_srcSystem()
+        telemetry_data = self.__fuse(system_id)
+        if telemetry_data is None:
+            return True, None
+
+        # Not newer than the other stream's newest message, which was already fused at its time
+        streamed_time = self.__streamed_times.get(system_id)
+        if streamed_time is not None and telemetry_data.time_since_boot <= streamed_time:
+            return True, None
+
+        self.__streamed_times[system_id] = telemetry_data.time_since_boot
+
+        return True, telemetry_data
+
+    def run_batch(
+        self, count: int, mode: TelemetryMode
+    ) -> "tuple[True, TelemetryBatch] | tuple[False, None]":
+        """
+        Collect count fused samples into a TelemetryBatch, receiving them as in the given mode.
+
+        Stops early with a shorter batch if receiving fails after some samples were collected.
+        """
+        batch = TelemetryBatch(count)
+
+        while not batch.is_full():
+            if mode == TelemetryMode.STREAMING:
+                result, telemetry_data = self.run_streaming()
+            else:
+                result, telemetry_data = self.run()
+
+            if not result:
+                break
+
+            # Streaming has not received both messages yet
+            if telemetry_data is None:
+                continue
+
+            batch.append(telemetry_data, time.time())
+
+        if len(batch) == 0:
+            self.__logger.error("Failed to collect any telemetry", True)
+            return False, None
+
+        return True, batch
+
+    def update_rates(self, backlog: int, max_backlog: int = 0) -> None:
+        """
+        Check the requested rates were achieved and lower them if the consumers lag behind.
+
+        backlog is the number of outputs not yet consumed, call periodically.
+        max_backlog is the most the backlog can hold, <= 0 for no limit.
+        """
+        now = time.time()
+        for message_type, rate_controller in self.__rate_controllers.items():
+            if not rate_controller.update(now, backlog, max_backlog):
+                continue
+
+            self.__logger.info(
+                f"{message_type} received at {rate_controller.achieved_rate():.1f} Hz "
+                f"with backlog {backlog}, requesting {rate_controller.requested_rate():.1f} Hz",
+                True,
+            )
+            self.__request_rate(message_type)
+
+    def __request_rate(self, message_type: str) -> None:
+        """
+        Ask each vehicle streaming telemetry to send the message at the rate decided by its
+        controller, or every vehicle if none has been heard from yet.
+        """
+        rate = self.__rate_controllers[message_type].requested_rate()
+
+        # System ID 0 is broadcast
+        system_ids = list(self.__histories.keys()) if len(self.__histories) > 0 else [0]
+
+        for system_id in system_ids:
+            # Use COMMAND_LONG (76) message, target_componenet=0 for every component
+            # MAV_CMD_SET_MESSAGE_INTERVAL (511) takes the message ID and interval in microseconds
+            self.__connection.mav.command_long_send(
+                system_id,
+                0,
+                mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
+                0,
+                self.__MESSAGE_IDS[message_type],
+                int(1e6 / rate),
+                0,
+                0,
+                0,
+                0,
+                0,
+            )
+
+    def __record(self, msg: object) -> None:
+        """
+        Add an ATTITUDE or LOCAL_POSITION_NED message to the history of its stream
+        for the vehicle that sent it.
+        """
+        rate_controller = self.__rate_controllers.get(msg.get_type())
+        if rate_controller is not None:
+            rate_controller.add_message()
+
+        # Set by mavutil when the message is parsed
+        # pylint: disable-next=protected-access
+        self.__receive_time = msg._timestamp
+
+        system_id = msg.get_srcSystem()
+        histories = self.__histories.get(system_id)
+        if histories is None:
+            histories = self.__create_histories()
+            if histories is None:
+                self.__logger.error(f"Failed to create histories for system {system_id}", True)
+                return
+
+            self.__histories[system_id] = histories
+
+        attitude_history, position_history = histories
+        history = attitude_history if msg.get_type() == "ATTITUDE" else position_history
+
+        # Time going backwards restarts the history (e.g. the autopilot rebooted)
+        newest_time = history.newest_time()
+        if newest_time is not None and msg.time_boot_ms < newest_time:
+            self.__streamed_times.pop(system_id, None)
+
+        if msg.get_type() == "ATTITUDE":
+            attitude_history.add(
+                msg.time_boot_ms,
+                (msg.roll, msg.pitch, msg.yaw),
+                (msg.rollspeed, msg.pitchspeed, msg.yawspeed),
+            )
+        else:
+            position_history.add(
+                msg.time_boot_ms,
+                (msg.x, msg.y, msg.z),
+                (msg.vx, msg.vy, msg.vz),
+            )
+
+    def __create_histories(
+        self,
+    ) -> "tuple[stream_alignment.StreamHistory, stream_alignment.StreamHistory] | None":
+        """
+        Empty attitude and position histories for a newly seen vehicle.
+        """
+        result, attitude_history = stream_alignment.StreamHistory.create(
+            self.__HISTORY_SIZE, True, self.__MAX_EXTRAPOLATION
+        )
+        if not result:
+            return None
+
+        result, position_history = stream_alignment.StreamHistory.create(
+            self.__HISTORY_SIZE, False, self.__MAX_EXTRAPOLATION
+        )
+        if not result:
+            return None
+
+        return attitude_history, position_history
+
+    def __fuse(self, system_id: int) -> "TelemetryData | None":
+        """
+        Combine the attitude and position histories of a vehicle into a TelemetryData object
+        at the time of its most recent message.
+
+        Returns None if the vehicle has not sent both messages.
+        """
+        histories = self.__histories.get(system_id)
+        if histories is None:
+            return None
+
+        attitude_history, position_history = histories
+        attitude_time = attitude_history.newest_time()
+        position_time = position_history.newest_time()
+        if attitude_time is None or position_time is None:
+            return None
+
+        time_since_boot = max(attitude_time, position_time)
+
+        stamps = latency_stamps.LatencyStamps()
+        stamps.stamp(latency_stamps.Stage.RECEIVE, self.__receive_time)
+
+        _, (roll, pitch, yaw), (roll_speed, pitch_speed, yaw_speed) = attitude_history.at(
+            time_since_boot
+        )
+        _, (x, y, z), (x_velocity, y_velocity, z_velocity) = position_history.at(time_since_boot)
 
         telemetry_data = TelemetryData(
             time_since_boot=time_since_boot,
-            x=position_msg.x,
-            y=position_msg.y,
-            z=position_msg.z,
-            x_velocity=position_msg.vx,
-            y_velocity=position_msg.vy,
-            z_velocity=position_msg.vz,
-            roll=attitude_msg.roll,
-            pitch=attitude_msg.pitch,
-            yaw=attitude_msg.yaw,
-            roll_speed=attitude_msg.rollspeed,
-            pitch_speed=attitude_msg.pitchspeed,
-            yaw_speed=attitude_msg.yawspeed,
+            x=x,
+            y=y,
+            z=z,
+            x_velocity=x_velocity,
+            y_velocity=y_velocity,
+            z_velocity=z_velocity,
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            roll_speed=roll_speed,
+            pitch_speed=pitch_speed,
+            yaw_speed=yaw_speed,
+            attitude_time_since_boot=attitude_time,
+            position_time_since_boot=position_time,
+            system_id=system_id,
+            stamps=stamps,
         )
+        stamps.stamp(latency_stamps.Stage.DECODE)
 
         self.__logger.debug(f"Telemetry Data: {telemetry_data}", True)
 
-        return True, telemetry_data
+        return telemetry_data
 
 
 # =================================================================================================
@@ -7,6 +7,9 @@ import pathlib
 
 from pymavlink import mavutil
 
+from utilities.workers import latency_stamps
+from utilities.workers import latest_value_slot
+from utilities.workers import periodic_scheduler
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import telemetry
@@ -16,8 +19,17 @@ from ..common.modules.logger import logger
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+# How often to check the stream rates against the output queue backlog
+RATE_UPDATE_PERIOD = 1  # seconds
+
+
 def telemetry_worker(
     connection: mavutil.mavfile,
+    mode: telemetry.TelemetryMode,
+    batch_size: int,
+    attitude_rate: "float | None",
+    position_rate: "float | None",
+    latest_slot: latest_value_slot.LatestValueSlot | None,
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
 ) -> None:
@@ -25,6 +37,11 @@ def telemetry_worker(
     Worker process.
 
     connection is the MAVLink connection to the drone
+    mode is whether to wait for both messages or output on every message
+    batch_size is the number of samples to send together as a TelemetryBatch, <= 1 to send each
+    attitude_rate and position_rate are the rates (Hz) to request, None to leave them unchanged
+    latest_slot is where to publish each sample instead of the output queue, None to use the queue,
+        it holds a single vehicle so samples from any other vehicle are dropped
     output_queue is where we send the telemetry data
     controller is how the main process communicates to this worker process
     """
@@ -50,7 +67,9 @@ def telemetry_worker(
     # =============================================================================================
     # Instantiate class object (telemetry.Telemetry)
 
-    result, telem = telemetry.Telemetry.create(connection, local_logger)
+    result, telem = telemetry.Telemetry.create(
+        connection, local_logger, attitude_rate, position_rate
+    )
 
     if not result:
         local_logger.error("Failed to create Telemetry", True)
@@ -58,15 +77,73 @@ def telemetry_worker(
 
     assert telem is not None
 
+    result, scheduler = periodic_scheduler.PeriodicScheduler.create(controller)
+    if not result:
+        local_logger.error("Failed to create PeriodicScheduler", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert scheduler is not None
+
+    def update_rates() -> None:
+        if latest_slot is None:
+            telem.update_rates(output_queue.queue.qsize(), output_queue.maxsize)
+        else:
+            # Nothing builds up in the latest slot, the consumer lags if it misses samples
+            telem.update_rates(latest_slot.take_overwritten_count(), 1)
+
+    scheduler.add("rate update", RATE_UPDATE_PERIOD, update_rates, RATE_UPDATE_PERIOD)
+
+    # Vehicle whose telemetry goes in the latest slot
+    slot_system_id = None
+
     while not controller.is_exit_requested():
         controller.check_pause()
 
-        result, telemetry_data = telem.run()
+        scheduler.run_due()
+
+        if batch_size > 1:
+            result, telemetry_batch = telem.run_batch(batch_size, mode)
+            if not result:
+                local_logger.error("Failed to get telemetry batch", True)
+                continue
+
+            output_queue.queue.put(telemetry_batch)
+            local_logger.debug(f"Sent {len(telemetry_batch)} telemetry samples to queue", True)
+            continue
+
+        if mode == telemetry.TelemetryMode.STREAMING:
+            result, telemetry_data = telem.run_streaming()
+        else:
+            result, telemetry_data = telem.run()
 
         if not result:
             local_logger.error("Failed to get telemetry data", True)
             continue
 
+        # Streaming has not received both messages yet
+        if telemetry_data is None:
+            continue
+
+        telemetry_data.stamps.stamp(latency_stamps.Stage.ENQUEUE)
+
+        if latest_slot is not None:
+            if slot_system_id is None:
+                slot_system_id = telemetry_data.system_id
+
+            # Another vehicle's samples would replace this one's before command reads them
+            if telemetry_data.system_id != slot_system_id:
+                local_logger.error(
+                    f"Latest slot holds system {slot_system_id}, "
+                    f"dropped telemetry of system {telemetry_data.system_id}",
+                    True,
+                )
+                continue
+
+            latest_slot.publish(telemetry_data.to_bytes())
+            local_logger.debug("Published telemetry data", True)
+            continue
+
         output_queue.queue.put(telemetry_data)
         local_logger.debug("Sent telemetry data to queue", True)
 
@@ -0,0 +1,117 @@
+"""
+Benchmark deciding for a block of telemetry samples one at a time against Command.run_batch().
+To run:
+```
+python -m tests.benchmark.benchmark_command_batch
+```
+"""
+
+import math
+import time
+
+import numpy as np
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.command import decision
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+
+
+SAMPLE_COUNT = 100_000
+SYSTEM_ID = 1
+TARGET = command.Position(10, 20, 30)
+HEIGHT_TOLERANCE = 0.5  # m
+Z_SPEED = 1  # m/s
+ANGLE_TOLERANCE = 5  # deg
+TURNING_SPEED = 5  # deg/s
+
+
+def main() -> int:
+    """
+    Decide for the same samples both ways and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-50.0, 50.0, SAMPLE_COUNT)
+    y = rng.uniform(-50.0, 50.0, SAMPLE_COUNT)
+    z = TARGET.z + rng.normal(0.0, 0.5, SAMPLE_COUNT)
+    yaw = rng.uniform(-math.pi, math.pi, SAMPLE_COUNT)
+    system_ids = np.full(SAMPLE_COUNT, SYSTEM_ID)
+
+    # Never sends, only needs to exist
+    connection = mavutil.mavlink_connection("udpout:localhost:14550")
+    result, cmd = command.Command.create(
+        connection,
+        {SYSTEM_ID: TARGET},
+        HEIGHT_TOLERANCE,
+        Z_SPEED,
+        ANGLE_TOLERANCE,
+        TURNING_SPEED,
+        main_logger,
+    )
+    if not result:
+        print("ERROR: Failed to create command")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert cmd is not None
+
+    # Scalar path as Command.run() takes it, one sample at a time
+    target = (TARGET.x, TARGET.y, TARGET.z)
+    x_list, y_list, z_list, yaw_list = x.tolist(), y.tolist(), z.tolist(), yaw.tolist()
+    start = time.perf_counter()
+    scalar_decisions = [
+        decision.decide(
+            target,
+            (x_list[i], y_list[i], z_list[i]),
+            yaw_list[i],
+            HEIGHT_TOLERANCE,
+            ANGLE_TOLERANCE,
+        )[0]
+        for i in range(SAMPLE_COUNT)
+    ]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, batch_decisions, _, _ = cmd.run_batch(system_ids, x, y, z, yaw)
+    batch_time = time.perf_counter() - start
+
+    assert batch_decisions.tolist() == scalar_decisions
+
+    main_logger.info(
+        f"Scalar: {SAMPLE_COUNT} samples in {scalar_time * 1000:.1f} ms, "
+        f"{SAMPLE_COUNT / scalar_time:.0f} samples/s"
+    )
+    main_logger.info(
+        f"Batch: {SAMPLE_COUNT} samples in {batch_time * 1000:.1f} ms, "
+        f"{SAMPLE_COUNT / batch_time:.0f} samples/s, {scalar_time / batch_time:.1f}x faster"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,162 @@
+"""
+Benchmark disconnect detection after 5 missed heartbeats against phi accrual detection.
+
+Simulates hours of 1 Hz heartbeats on steady, jittery and lossy links, fed to the connection
+state tracker the way HeartbeatReceiver polls, then stops them for good.
+Reports false disconnects per hour, and how long after the last heartbeat the real
+disconnect is detected.
+To run:
+```
+python -m tests.benchmark.benchmark_disconnect_detection
+```
+"""
+
+import random
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.heartbeat import connection_state
+from modules.heartbeat import phi_accrual
+
+
+SEED = 1
+DURATION = 20  # hours
+HEARTBEAT_PERIOD = 1  # seconds
+# Same as HeartbeatReceiver
+DISCONNECT_THRESHOLD = 5
+RECEIVE_TIMEOUT = 1  # seconds
+PHI_POLL_PERIOD = 0.1  # seconds
+PHI_WINDOW_SIZE = 100
+PHI_MIN_STANDARD_DEVIATION = 0.1  # seconds
+PHI_ACCEPTABLE_PAUSE = 1  # seconds
+PHI_THRESHOLD = 5
+# Name, standard deviation of the send time (s), loss, chance of an extra delay, mean delay (s)
+LINKS = [
+    ("Steady", 0.005, 0.0, 0.0, 0.0),
+    ("Jittery", 0.15, 0.0, 0.05, 0.5),
+    ("Lossy 10%", 0.02, 0.1, 0.0, 0.0),
+    ("Lossy 20%", 0.02, 0.2, 0.0, 0.0),
+]
+
+
+def generate_arrivals(
+    rng: random.Random, jitter: float, loss: float, delay_chance: float, mean_delay: float
+) -> "list[float]":
+    """
+    Arrival time (s) of each heartbeat that was not lost, in order.
+    """
+    arrivals = []
+    for i in range(DURATION * 3600 // HEARTBEAT_PERIOD):
+        if rng.random() < loss:
+            continue
+
+        arrival = i * HEARTBEAT_PERIOD + rng.gauss(0.0, jitter)
+        if rng.random() < delay_chance:
+            arrival += rng.expovariate(1 / mean_delay)
+
+        arrivals.append(arrival)
+
+    arrivals.sort()
+    return arrivals
+
+
+def run_tracker(
+    tracker: connection_state.ConnectionStateTracker, arrivals: "list[float]", timeout: float
+) -> "list[float]":
+    """
+    Waits up to timeout for each heartbeat like HeartbeatReceiver.run(),
+    until well after the last one.
+
+    Returns the time (s) of each disconnect.
+    """
+    end_time = arrivals[-1] + DISCONNECT_THRESHOLD * HEARTBEAT_PERIOD * 4
+    disconnect_times = []
+    now = 0.0
+    i = 0
+    while now < end_time:
+        if i < len(arrivals) and arrivals[i] - now <= timeout:
+            now = max(arrivals[i], now)
+            i += 1
+            event = tracker.update(True, now)
+        else:
+            now += timeout
+            event = tracker.update(False, now)
+
+        if event is not None and event.kind == connection_state.ConnectionEventKind.DISCONNECTED:
+            disconnect_times.append(now)
+
+    return disconnect_times
+
+
+def main() -> int:
+    """
+    Run each link with both detectors and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    for name, jitter, loss, delay_chance, mean_delay in LINKS:
+        arrivals = generate_arrivals(random.Random(SEED), jitter, loss, delay_chance, mean_delay)
+
+        result, count_tracker = connection_state.ConnectionStateTracker.create(
+            DISCONNECT_THRESHOLD, None
+        )
+        if not result:
+            print("ERROR: Failed to create tracker")
+            return -1
+
+        result, detector = phi_accrual.PhiAccrualDetector.create(
+            PHI_WINDOW_SIZE, HEARTBEAT_PERIOD, PHI_MIN_STANDARD_DEVIATION, PHI_ACCEPTABLE_PAUSE
+        )
+        if not result:
+            print("ERROR: Failed to create detector")
+            return -1
+
+        result, phi_tracker = connection_state.ConnectionStateTracker.create(
+            DISCONNECT_THRESHOLD, None, detector, PHI_THRESHOLD
+        )
+        if not result:
+            print("ERROR: Failed to create tracker")
+            return -1
+
+        # Get Pylance to stop complaining
+        assert count_tracker is not None
+        assert phi_tracker is not None
+
+        for detection, tracker, timeout in [
+            (f"{DISCONNECT_THRESHOLD} missed", count_tracker, RECEIVE_TIMEOUT),
+            (f"phi {PHI_THRESHOLD}", phi_tracker, PHI_POLL_PERIOD),
+        ]:
+            disconnect_times = run_tracker(tracker, arrivals, timeout)
+            false_count = sum(time < arrivals[-1] for time in disconnect_times)
+            detection_time = disconnect_times[-1] - arrivals[-1]
+            main_logger.info(
+                f"{name}, {detection}: {false_count / DURATION:.2f} false disconnects/h, "
+                f"detected {detection_time:.1f} s after the last heartbeat"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,116 @@
+"""
+Benchmark sending the COMMAND_LONG of Command.run() and the HEARTBEAT of HeartbeatSender.run()
+with pymavlink against pre-packed frame templates.
+To run:
+```
+python -m tests.benchmark.benchmark_frame_templates
+```
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.heartbeat import heartbeat_sender
+from utilities.mavlink import frame_templates
+
+
+SEND_COUNT = 100_000
+SYSTEM_ID = 1
+# Change altitude to 30 m at 1 m/s, as Command sends
+COMMAND_ID = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+PARAMS = (1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 30.0)
+
+
+def time_sends(send: "object", *args: "float | int") -> float:
+    """
+    Seconds per send.
+    """
+    start = time.perf_counter()
+    for _ in range(SEND_COUNT):
+        send(*args)
+
+    return (time.perf_counter() - start) / SEND_COUNT
+
+
+def main() -> int:
+    """
+    Send the same messages both ways and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    # Frames go nowhere, a local UDP port nobody listens on, but still cost a socket write
+    connection = mavutil.mavlink_connection("udpout:localhost:14550")
+
+    result, command_long = frame_templates.FrameTemplate.create(
+        connection.mav,
+        connection.mav.command_long_encode(SYSTEM_ID, 0, COMMAND_ID, 0, *PARAMS),
+        frame_templates.COMMAND_LONG_PARAMS_FORMAT,
+    )
+    if not result:
+        print("ERROR: Failed to create COMMAND_LONG template")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert command_long is not None
+
+    pymavlink_command_time = time_sends(
+        connection.mav.command_long_send, SYSTEM_ID, 0, COMMAND_ID, 0, *PARAMS
+    )
+    template_command_time = time_sends(command_long.send, *PARAMS)
+
+    result, sender = heartbeat_sender.HeartbeatSender.create(connection, main_logger)
+    if not result:
+        print("ERROR: Failed to create heartbeat sender")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert sender is not None
+
+    pymavlink_heartbeat_time = time_sends(
+        connection.mav.heartbeat_send,
+        mavutil.mavlink.MAV_TYPE_GCS,
+        mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+        0,
+        0,
+        0,
+    )
+    template_heartbeat_time = time_sends(sender.run)
+
+    for name, pymavlink_time, template_time in [
+        ("COMMAND_LONG", pymavlink_command_time, template_command_time),
+        ("HEARTBEAT (HeartbeatSender.run)", pymavlink_heartbeat_time, template_heartbeat_time),
+    ]:
+        main_logger.info(
+            f"{name}: pymavlink {pymavlink_time * 1e6:.2f} us, "
+            f"template {template_time * 1e6:.2f} us, {pymavlink_time / template_time:.1f}x faster"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,124 @@
+"""
+Benchmark the heartbeat registry with hundreds of vehicles and components on one link,
+to show the cost of each heartbeat does not grow with the number of components.
+To run:
+```
+python -m tests.benchmark.benchmark_heartbeat_registry
+```
+"""
+
+import random
+import time
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.heartbeat import heartbeat_registry
+
+
+COMPONENT_COUNTS = [1, 50, 500]
+HEARTBEAT_COUNT = 200_000
+HEARTBEAT_PERIOD = 1  # seconds
+DISCONNECT_TIMEOUT = 5  # seconds
+# Chance a component stays silent for a while, so disconnects and reconnects happen
+SILENCE_CHANCE = 0.001
+SILENCE_PERIODS = 10
+
+
+def make_heartbeats(component_count: int) -> "list[tuple[int, int, float]]":
+    """
+    (system ID, component ID, arrival time) of each heartbeat, every component once a period
+    unless silent, in arrival order.
+    """
+    rng = random.Random(0)
+    # Vehicles with a camera and gimbal each
+    sources = [(i // 3 + 1, [1, 100, 154][i % 3]) for i in range(component_count)]
+    silent_until = [0.0] * component_count
+
+    heartbeats = []
+    period = 0
+    while len(heartbeats) < HEARTBEAT_COUNT:
+        for i, (system_id, component_id) in enumerate(sources):
+            now = period * HEARTBEAT_PERIOD + i * HEARTBEAT_PERIOD / component_count
+            if now < silent_until[i]:
+                continue
+
+            if rng.random() < SILENCE_CHANCE:
+                silent_until[i] = now + SILENCE_PERIODS * HEARTBEAT_PERIOD
+                continue
+
+            heartbeats.append((system_id, component_id, now))
+
+        period += 1
+
+    return heartbeats[:HEARTBEAT_COUNT]
+
+
+def main() -> int:
+    """
+    Record heartbeats for each number of components and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    for component_count in COMPONENT_COUNTS:
+        heartbeats = make_heartbeats(component_count)
+
+        result, registry = heartbeat_registry.HeartbeatRegistry.create(
+            component_count, DISCONNECT_TIMEOUT
+        )
+        if not result:
+            print("ERROR: Failed to create heartbeat registry")
+            return -1
+
+        # Get Pylance to stop complaining
+        assert registry is not None
+
+        # Checked on every heartbeat as HeartbeatReceiver does,
+        # so a silent component is noticed by the next heartbeat from any other
+        event_count = 0
+        start = time.perf_counter()
+        for system_id, component_id, now in heartbeats:
+            event_count += len(registry.check(now))
+
+            result, event = registry.heartbeat(system_id, component_id, 2, 3, 0, 0, now)
+            if not result:
+                print("ERROR: Failed to record heartbeat")
+                return -1
+
+            if event is not None:
+                event_count += 1
+
+        elapsed = time.perf_counter() - start
+
+        main_logger.info(
+            f"{component_count} components: "
+            f"{elapsed / len(heartbeats) * 1e6:.2f} us per heartbeat and check, "
+            f"{event_count} connect and disconnect events, "
+            f"{registry.connected_count()} connected at the end"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
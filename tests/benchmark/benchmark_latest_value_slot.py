@@ -0,0 +1,211 @@
+"""
+Benchmark how stale telemetry is when command gets it, through the queue, the queue conflated
+to its newest sample, or the latest value slot.
+
+A producer process publishes telemetry faster than the consumer makes decisions,
+and the consumer measures how long ago the sample it received was published.
+To run:
+```
+python -m tests.benchmark.benchmark_latest_value_slot
+```
+"""
+
+import multiprocessing as mp
+import queue
+import statistics
+import time
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+from utilities.workers import latest_value_slot
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+QUEUE_MAX_SIZE = 10
+PUBLISH_PERIOD = 0.002  # seconds
+DECISION_TIME = 0.01  # seconds
+DECISION_COUNT = 300
+SLOT_TIMEOUT = 1  # seconds
+SLOT_POLL_PERIOD = 0.0005  # seconds
+CONFLATE_TIMEOUT = 1  # seconds
+
+
+def make_sample() -> telemetry.TelemetryData:
+    """
+    Sample carrying its publish time (s since epoch) in x.
+    """
+    return telemetry.TelemetryData(time_since_boot=0, x=time.time())
+
+
+def queue_producer(
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Put samples into the queue, blocking when full like the telemetry worker.
+    """
+    while not controller.is_exit_requested():
+        try:
+            output_queue.queue.put(make_sample(), timeout=0.1)
+        except queue.Full:
+            continue
+
+        time.sleep(PUBLISH_PERIOD)
+
+
+def slot_producer(
+    slot: latest_value_slot.LatestValueSlot,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Publish samples to the slot.
+    """
+    while not controller.is_exit_requested():
+        slot.publish(make_sample().to_bytes())
+        time.sleep(PUBLISH_PERIOD)
+
+
+def consume_queue(input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> "list[float]":
+    """
+    Returns the staleness (s) of each sample decided on.
+    """
+    staleness = []
+    for _ in range(DECISION_COUNT):
+        sample = input_queue.queue.get()
+        staleness.append(time.time() - sample.x)
+        time.sleep(DECISION_TIME)
+
+    return staleness
+
+
+def consume_conflated_queue(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+) -> "tuple[list[float], int]":
+    """
+    Returns the staleness (s) of each sample decided on, and how many stale samples were skipped.
+    """
+    staleness = []
+    skipped_count = 0
+    while len(staleness) < DECISION_COUNT:
+        samples = input_queue.get_available(CONFLATE_TIMEOUT)
+        if len(samples) == 0:
+            continue
+
+        skipped_count += len(samples) - 1
+        staleness.append(time.time() - samples[-1].x)
+        time.sleep(DECISION_TIME)
+
+    return staleness, skipped_count
+
+
+def consume_slot(slot: latest_value_slot.LatestValueSlot) -> "list[float]":
+    """
+    Returns the staleness (s) of each sample decided on.
+    """
+    staleness = []
+    version = 0
+    while len(staleness) < DECISION_COUNT:
+        result, record, version = slot.wait_newer(version, SLOT_TIMEOUT, SLOT_POLL_PERIOD)
+        if not result:
+            continue
+
+        sample = telemetry.TelemetryData.from_bytes(record)
+        staleness.append(time.time() - sample.x)
+        time.sleep(DECISION_TIME)
+
+    return staleness
+
+
+def report(name: str, staleness: "list[float]", main_logger: logger.Logger) -> None:
+    """
+    Log staleness percentiles in milliseconds.
+    """
+    percentiles = statistics.quantiles(staleness, n=100)
+    main_logger.info(
+        f"{name}: staleness median {percentiles[49] * 1000:.1f} ms, "
+        f"p99 {percentiles[98] * 1000:.1f} ms, max {max(staleness) * 1000:.1f} ms"
+    )
+
+
+def main() -> int:
+    """
+    Run both benchmarks and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    mp_manager = mp.Manager()
+
+    # Queue
+    controller = worker_controller.WorkerController()
+    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+    producer = mp.Process(target=queue_producer, args=(telemetry_queue, controller))
+    producer.start()
+
+    report("Queue", consume_queue(telemetry_queue), main_logger)
+
+    controller.request_exit()
+    telemetry_queue.fill_and_drain_queue()
+    producer.join()
+
+    # Conflated queue
+    controller = worker_controller.WorkerController()
+    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+    producer = mp.Process(target=queue_producer, args=(telemetry_queue, controller))
+    producer.start()
+
+    staleness, skipped_count = consume_conflated_queue(telemetry_queue)
+    report("Conflated queue", staleness, main_logger)
+    main_logger.info(f"Conflated queue: skipped {skipped_count} stale samples")
+
+    controller.request_exit()
+    telemetry_queue.fill_and_drain_queue()
+    producer.join()
+
+    # Latest value slot
+    controller = worker_controller.WorkerController()
+    result, slot = latest_value_slot.LatestValueSlot.create(telemetry.TelemetryData.RECORD_SIZE)
+    if not result:
+        print("ERROR: Failed to create slot")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert slot is not None
+
+    producer = mp.Process(target=slot_producer, args=(slot, controller))
+    producer.start()
+
+    report("Latest value slot", consume_slot(slot), main_logger)
+
+    controller.request_exit()
+    producer.join()
+    slot.close()
+    slot.unlink()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
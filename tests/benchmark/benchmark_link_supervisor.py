@@ -0,0 +1,164 @@
+"""
+Benchmark the memory of the heartbeat sender and receiver workers as two processes
+against the link supervisor worker doing both in one.
+
+Memory is read from /proc, so this only runs on Linux.
+To run:
+```
+python -m tests.benchmark.benchmark_link_supervisor
+```
+"""
+
+import multiprocessing as mp
+import pathlib
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.heartbeat import heartbeat_receiver_worker
+from modules.heartbeat import heartbeat_sender_worker
+from modules.heartbeat import link_supervisor_worker
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+QUEUE_MAX_SIZE = 10
+KEEPALIVE_PERIOD = None
+PHI_THRESHOLD = None
+# Long enough for the workers to settle into their loops
+RUN_TIME = 5  # seconds
+# Heartbeats go nowhere, and none come in so the receivers keep waiting
+SEND_CONNECTION_STRING = "udpout:localhost:14550"
+RECEIVE_CONNECTION_STRING = "udpin:localhost:14560"
+
+
+def memory_kib(process_id: int) -> "tuple[int, int]":
+    """
+    Resident set size and proportional set size (KiB) of the process.
+    Proportional set size splits pages shared with other processes between them.
+    """
+    status = pathlib.Path(f"/proc/{process_id}/status").read_text(encoding="utf-8")
+    rss = next(int(line.split()[1]) for line in status.splitlines() if line.startswith("VmRSS:"))
+
+    rollup = pathlib.Path(f"/proc/{process_id}/smaps_rollup").read_text(encoding="utf-8")
+    pss = next(int(line.split()[1]) for line in rollup.splitlines() if line.startswith("Pss:"))
+
+    return rss, pss
+
+
+def run_workers(
+    targets: "list[tuple[object, tuple]]",
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> "tuple[int, int]":
+    """
+    Runs a process for each target with its arguments, returns their total RSS and PSS (KiB).
+    """
+    workers = [mp.Process(target=target, args=args) for target, args in targets]
+    for worker in workers:
+        worker.start()
+
+    # Keep the receivers from blocking on a full queue
+    start_time = time.time()
+    while time.time() - start_time < RUN_TIME:
+        output_queue.get_available(0.1)
+
+    total_rss = 0
+    total_pss = 0
+    for worker in workers:
+        rss, pss = memory_kib(worker.pid)
+        total_rss += rss
+        total_pss += pss
+
+    controller.request_exit()
+    output_queue.fill_and_drain_queue()
+    for worker in workers:
+        worker.join()
+
+    return total_rss, total_pss
+
+
+def main() -> int:
+    """
+    Run both ways and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    if not pathlib.Path("/proc/self/smaps_rollup").exists():
+        print("ERROR: Process memory is only read on Linux")
+        return -1
+
+    mp_manager = mp.Manager()
+    send_connection = mavutil.mavlink_connection(SEND_CONNECTION_STRING)
+    receive_connection = mavutil.mavlink_connection(RECEIVE_CONNECTION_STRING)
+
+    # Separate workers
+    controller = worker_controller.WorkerController()
+    output_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+    separate_memory = run_workers(
+        [
+            (heartbeat_sender_worker.heartbeat_sender_worker, (send_connection, controller)),
+            (
+                heartbeat_receiver_worker.heartbeat_receiver_worker,
+                (receive_connection, KEEPALIVE_PERIOD, PHI_THRESHOLD, output_queue, controller),
+            ),
+        ],
+        output_queue,
+        controller,
+    )
+
+    # Link supervisor
+    controller = worker_controller.WorkerController()
+    output_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+    supervisor_memory = run_workers(
+        [
+            (
+                link_supervisor_worker.link_supervisor_worker,
+                (
+                    send_connection,
+                    receive_connection,
+                    KEEPALIVE_PERIOD,
+                    PHI_THRESHOLD,
+                    output_queue,
+                    controller,
+                ),
+            ),
+        ],
+        output_queue,
+        controller,
+    )
+
+    for name, (rss, pss) in [
+        ("Heartbeat sender and receiver workers", separate_memory),
+        ("Link supervisor worker", supervisor_memory),
+    ]:
+        main_logger.info(f"{name}: RSS {rss / 1024:.1f} MiB, PSS {pss / 1024:.1f} MiB")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,230 @@
+"""
+Benchmark the message router against workers sharing the connection.
+
+Replays 1 kHz of mixed MAVLink traffic from a generated log, and compares
+how many frames are parsed and how many telemetry messages are lost when
+workers share one connection, each parse their own copy, or use the router.
+To run:
+```
+python -m tests.benchmark.benchmark_message_router
+```
+"""
+
+import multiprocessing as mp
+import os
+import pathlib
+import struct
+import tempfile
+import time
+
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common
+
+import bootcamp_main
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.router import message_router
+from modules.router import routed_connection
+from utilities.workers import queue_proxy_wrapper
+
+
+TRAFFIC_RATE = 1000  # Hz
+DURATION = 10  # s
+HEARTBEAT_PERIOD = 1000  # ms
+ATTITUDE_PERIOD = 4  # ms
+POSITION_PERIOD = 10  # ms
+TELEMETRY_TYPES = ["ATTITUDE", "LOCAL_POSITION_NED"]
+
+# Same as main, so drops are what main would see
+QUEUE_MAX_SIZE = bootcamp_main.QUEUE_MAX_SIZE
+
+
+def generate_traffic_log(path: pathlib.Path) -> "dict[str, int]":
+    """
+    Write a tlog with one message every millisecond: heartbeats, attitude, position,
+    and filler messages that no worker reads.
+
+    Returns the number of messages sent per type.
+    """
+    mav = common.MAVLink(None, srcSystem=1, srcComponent=0)
+    sent_counts = {}
+
+    with open(path, "wb") as log_file:
+        for time_boot_ms in range(TRAFFIC_RATE * DURATION):
+            if time_boot_ms % HEARTBEAT_PERIOD == 0:
+                msg = mav.heartbeat_encode(
+                    mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                    mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                    0,
+                    0,
+                    0,
+                )
+            elif time_boot_ms % ATTITUDE_PERIOD == 0:
+                msg = mav.attitude_encode(time_boot_ms, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            elif time_boot_ms % POSITION_PERIOD == 1:
+                msg = mav.local_position_ned_encode(time_boot_ms, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            else:
+                msg = mav.system_time_encode(0, time_boot_ms)
+
+            log_file.write(struct.pack(">Q", time_boot_ms * 1000))
+            log_file.write(msg.pack(mav))
+            sent_counts[msg.get_type()] = sent_counts.get(msg.get_type(), 0) + 1
+
+    return sent_counts
+
+
+def open_counted_log(path: pathlib.Path) -> "tuple[mavutil.mavfile, list[int]]":
+    """
+    Open the log, counting every frame that gets parsed.
+    """
+    # The default memory mapped reader skips frames by type without parsing them,
+    # which a socket cannot do
+    connection = mavutil.mavlogfile(str(path))
+    parse_count = [0]
+    recv_msg = connection.recv_msg
+
+    def counted_recv_msg() -> "object | None":
+        msg = recv_msg()
+        if msg is not None:
+            parse_count[0] += 1
+        return msg
+
+    connection.recv_msg = counted_recv_msg
+    return connection, parse_count
+
+
+def run_shared(path: pathlib.Path) -> "tuple[int, int, float]":
+    """
+    Heartbeat receiver and telemetry take turns reading from the same connection.
+
+    Returns the frames parsed, telemetry messages received, and time taken.
+    """
+    connection, parse_count = open_counted_log(path)
+    received = 0
+
+    start = time.perf_counter()
+    while True:
+        heartbeat = connection.recv_match(type="HEARTBEAT", blocking=False)
+        attitude = connection.recv_match(type="ATTITUDE", blocking=False)
+        position = connection.recv_match(type="LOCAL_POSITION_NED", blocking=False)
+        received += (attitude is not None) + (position is not None)
+
+        if heartbeat is None and attitude is None and position is None:
+            break
+    elapsed = time.perf_counter() - start
+
+    return parse_count[0], received, elapsed
+
+
+def run_per_worker(path: pathlib.Path) -> "tuple[int, int, float]":
+    """
+    Heartbeat receiver and telemetry each parse their own copy of the link.
+
+    Returns the frames parsed, telemetry messages received, and time taken.
+    """
+    heartbeat_connection, heartbeat_parse_count = open_counted_log(path)
+    telemetry_connection, telemetry_parse_count = open_counted_log(path)
+    received = 0
+
+    start = time.perf_counter()
+    while heartbeat_connection.recv_match(type="HEARTBEAT", blocking=False) is not None:
+        pass
+
+    while telemetry_connection.recv_match(type=TELEMETRY_TYPES, blocking=False) is not None:
+        received += 1
+    elapsed = time.perf_counter() - start
+
+    return heartbeat_parse_count[0] + telemetry_parse_count[0], received, elapsed
+
+
+def run_routed(
+    path: pathlib.Path, mp_manager: mp.managers.SyncManager, main_logger: logger.Logger
+) -> "tuple[int, int, float]":
+    """
+    The router parses each frame once and the telemetry reads its own queue.
+
+    Returns the frames parsed, telemetry messages received, and time taken.
+    """
+    connection, parse_count = open_counted_log(path)
+
+    heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+
+    result, router = message_router.MessageRouter.create(connection, main_logger)
+    assert result and router is not None
+    router.subscribe(["HEARTBEAT"], heartbeat_queue)
+    router.subscribe(TELEMETRY_TYPES, telemetry_queue)
+
+    telemetry_connection = routed_connection.RoutedConnection(connection, telemetry_queue)
+    received = 0
+
+    start = time.perf_counter()
+    while True:
+        _, message_type = router.run()
+        if message_type is None:
+            break
+
+        if message_type in TELEMETRY_TYPES:
+            msg = telemetry_connection.recv_match(type=TELEMETRY_TYPES, blocking=False)
+            received += msg is not None
+    elapsed = time.perf_counter() - start
+
+    rates, dropped = router.get_message_rates()
+    main_logger.info(f"Router message rates (Hz): {rates}, dropped: {dropped}")
+    main_logger.info(f"Telemetry pending messages dropped: {telemetry_connection.get_dropped()}")
+    for snapshot in router.get_link_quality():
+        main_logger.info(f"Router link quality {snapshot}")
+
+    return parse_count[0], received, elapsed
+
+
+def main() -> int:
+    """
+    Run both benchmarks and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    mp_manager = mp.Manager()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory, f"traffic_{os.getpid()}.tlog")
+        sent_counts = generate_traffic_log(path)
+        sent = sum(sent_counts.get(message_type, 0) for message_type in TELEMETRY_TYPES)
+
+        for name, (parsed, received, elapsed) in (
+            ("Shared", run_shared(path)),
+            ("Per worker", run_per_worker(path)),
+            ("Routed", run_routed(path, mp_manager, main_logger)),
+        ):
+            main_logger.info(
+                f"{name}: parsed {parsed} frames for {sum(sent_counts.values())} sent, "
+                f"telemetry received {received}/{sent} (lost {sent - received}), "
+                f"{elapsed:.3f} s"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,117 @@
+"""
+Benchmark one Command deciding for several vehicles, to show the cost per decision
+does not grow with the number of vehicles.
+To run:
+```
+python -m tests.benchmark.benchmark_multi_vehicle_command
+```
+"""
+
+import math
+import random
+import time
+
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+
+
+VEHICLE_COUNTS = [1, 12, 48]
+DECISION_COUNT = 20_000
+HEIGHT_TOLERANCE = 0.5  # m
+Z_SPEED = 1  # m/s
+ANGLE_TOLERANCE = 5  # deg
+TURNING_SPEED = 5  # deg/s
+
+
+def make_telemetry(vehicle_count: int) -> "list[telemetry.TelemetryData]":
+    """
+    Samples from every vehicle interleaved, as they arrive on a shared link.
+    """
+    rng = random.Random(0)
+    return [
+        telemetry.TelemetryData(
+            x=rng.uniform(-50.0, 50.0),
+            y=rng.uniform(-50.0, 50.0),
+            z=rng.uniform(25.0, 35.0),
+            yaw=rng.uniform(-math.pi, math.pi),
+            x_velocity=rng.gauss(0.0, 1.0),
+            y_velocity=rng.gauss(0.0, 1.0),
+            z_velocity=rng.gauss(0.0, 1.0),
+            system_id=i % vehicle_count + 1,
+        )
+        for i in range(DECISION_COUNT)
+    ]
+
+
+def main() -> int:
+    """
+    Decide for each number of vehicles and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    # Commands go nowhere, a local UDP port nobody listens on
+    connection = mavutil.mavlink_connection("udpout:localhost:14550")
+
+    for vehicle_count in VEHICLE_COUNTS:
+        targets = {
+            system_id: command.Position(10 * system_id, 20, 30)
+            for system_id in range(1, vehicle_count + 1)
+        }
+        result, cmd = command.Command.create(
+            connection,
+            targets,
+            HEIGHT_TOLERANCE,
+            Z_SPEED,
+            ANGLE_TOLERANCE,
+            TURNING_SPEED,
+            main_logger,
+        )
+        if not result:
+            print("ERROR: Failed to create command")
+            return -1
+
+        # Get Pylance to stop complaining
+        assert cmd is not None
+
+        samples = make_telemetry(vehicle_count)
+
+        start = time.perf_counter()
+        for telemetry_data in samples:
+            cmd.run(telemetry_data)
+        elapsed = time.perf_counter() - start
+
+        main_logger.info(
+            f"{vehicle_count} vehicles: {DECISION_COUNT / elapsed:.0f} decisions/s, "
+            f"{elapsed / DECISION_COUNT * 1e6:.1f} us per decision"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,218 @@
+"""
+Benchmark each QueueProxyWrapper backend through the documentation multiprocess example pipeline.
+
+Countup workers feed add random workers, which feed main in place of the concatenator,
+with the worker counts and queue sizes of main_multiprocess_example but without the pretend
+work, so the queues are the bottleneck. Each message carries the time countup put it,
+and main measures how long it took to arrive.
+Reports messages/s with every worker going as fast as it can,
+and latency with countup paced well below that so messages do not wait behind each other.
+To run:
+```
+python -m tests.benchmark.benchmark_queue_backends
+```
+"""
+
+import multiprocessing as mp
+import queue
+import random
+import statistics
+import time
+
+from documentation import main_multiprocess_example
+from documentation.multiprocess_example import intermediate_struct
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+MESSAGE_COUNT = 20_000
+PACED_RATE = 1000  # messages/s
+PACED_MESSAGE_COUNT = 5000
+QUEUE_TIMEOUT = 0.1  # seconds
+# Same as the example
+START_THOUSANDS = 3
+SEED = 252
+MAX_RANDOM_TERM = 10
+PREFIX = "Hello "
+SUFFIX = " world!"
+
+
+def countup_worker(
+    start_thousands: int,
+    period: float,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Counts up like the example's countup, one count every period (s), 0 for as fast as possible.
+    """
+    value = start_thousands * 1000
+    next_time = time.time()
+    while not controller.is_exit_requested():
+        if period > 0.0:
+            time.sleep(max(next_time - time.time(), 0.0))
+            next_time += period
+
+        try:
+            output_queue.queue.put((time.time(), value), timeout=QUEUE_TIMEOUT)
+        except queue.Full:
+            continue
+
+        value += 1
+
+
+def add_random_worker(
+    seed: int,
+    max_random_term: int,
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Adds a random term like the example's add random, passing on when the count was put.
+    """
+    rng = random.Random(seed)
+    while not controller.is_exit_requested():
+        try:
+            item = input_queue.queue.get(timeout=QUEUE_TIMEOUT)
+        except queue.Empty:
+            continue
+
+        # Exit on sentinel
+        if item is None:
+            break
+
+        put_time, term = item
+        value = intermediate_struct.IntermediateStruct(
+            term + rng.randint(0, max_random_term), " is a number"
+        )
+
+        while not controller.is_exit_requested():
+            try:
+                output_queue.queue.put((put_time, value), timeout=QUEUE_TIMEOUT)
+                break
+            except queue.Full:
+                continue
+
+
+def run_pipeline(
+    backend: queue_proxy_wrapper.QueueBackend,
+    mp_manager: mp.managers.SyncManager,
+    period: float,
+    message_count: int,
+) -> "tuple[float, list[float]]":
+    """
+    Returns messages/s and the latency (s) of each message main received.
+    """
+    controller = worker_controller.WorkerController()
+    countup_to_add_random_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, main_multiprocess_example.COUNTUP_TO_ADD_RANDOM_QUEUE_MAX_SIZE, backend
+    )
+    add_random_to_concatenator_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, main_multiprocess_example.ADD_RANDOM_TO_CONCATENATOR_QUEUE_MAX_SIZE, backend
+    )
+
+    processes = [
+        mp.Process(
+            target=countup_worker,
+            args=(START_THOUSANDS + i, period, countup_to_add_random_queue, controller),
+        )
+        for i in range(main_multiprocess_example.COUNTUP_WORKER_COUNT)
+    ] + [
+        mp.Process(
+            target=add_random_worker,
+            args=(
+                SEED + i,
+                MAX_RANDOM_TERM,
+                countup_to_add_random_queue,
+                add_random_to_concatenator_queue,
+                controller,
+            ),
+        )
+        for i in range(main_multiprocess_example.ADD_RANDOM_WORKER_COUNT)
+    ]
+    for process in processes:
+        process.start()
+
+    # Concatenate like the example's concatenator
+    latencies = []
+    start_time = time.time()
+    for i in range(message_count):
+        put_time, value = add_random_to_concatenator_queue.queue.get()
+        _ = f"{PREFIX}{value.number}{value.sentence}{SUFFIX}"
+
+        now = time.time()
+        latencies.append(now - put_time)
+
+        # Time from the first message, not the process start up
+        if i == 0:
+            start_time = now
+
+    rate = (message_count - 1) / (time.time() - start_time)
+
+    controller.request_exit()
+
+    # Fill and drain queues from END TO START
+    countup_to_add_random_queue.fill_and_drain_queue()
+    add_random_to_concatenator_queue.fill_and_drain_queue()
+
+    for process in processes:
+        process.join()
+
+    return rate, latencies
+
+
+def main() -> int:
+    """
+    Run each backend and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    mp_manager = mp.Manager()
+
+    for backend in queue_proxy_wrapper.QueueBackend:
+        rate, latencies = run_pipeline(backend, mp_manager, 0.0, MESSAGE_COUNT)
+        percentiles = statistics.quantiles(latencies, n=100)
+        main_logger.info(
+            f"{backend.name}: {rate:.0f} messages/s, "
+            f"latency p50 {percentiles[49] * 1000:.2f} ms, p99 {percentiles[98] * 1000:.2f} ms"
+        )
+
+        paced_period = main_multiprocess_example.COUNTUP_WORKER_COUNT / PACED_RATE
+        _, latencies = run_pipeline(backend, mp_manager, paced_period, PACED_MESSAGE_COUNT)
+        percentiles = statistics.quantiles(latencies, n=100)
+        main_logger.info(
+            f"{backend.name} at {PACED_RATE} messages/s: "
+            f"latency p50 {percentiles[49] * 1000:.3f} ms, p99 {percentiles[98] * 1000:.3f} ms"
+        )
+
+    mp_manager.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,187 @@
+"""
+Benchmark passing telemetry at 10 kHz through the manager queue against the shared memory
+ring buffer, with one producer, and with two producers sharing the rate.
+
+Producers publish on fixed deadlines and main measures how long each sample took to arrive,
+and how much of main's CPU time each sample cost.
+To run:
+```
+python -m tests.benchmark.benchmark_shared_ring_buffer
+```
+"""
+
+import multiprocessing as mp
+import statistics
+import time
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_ring_buffer
+
+
+RATE = 10_000  # samples/s, from all producers together
+DURATION = 3  # seconds
+QUEUE_MAX_SIZE = 100
+
+
+def make_sample() -> telemetry.TelemetryData:
+    """
+    Sample carrying its publish time (s since epoch) in x.
+    """
+    return telemetry.TelemetryData(time_since_boot=0, x=time.time())
+
+
+def queue_producer(
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper, sample_count: int, period: float
+) -> None:
+    """
+    Put samples every period (s) like the telemetry worker, pickled by the manager proxy.
+    """
+    next_time = time.time()
+    for _ in range(sample_count):
+        time.sleep(max(next_time - time.time(), 0.0))
+        next_time += period
+
+        output_queue.queue.put(make_sample())
+
+
+def ring_producer(
+    ring: shared_ring_buffer.SharedRingBuffer, sample_count: int, period: float
+) -> None:
+    """
+    Put sample records every period (s).
+    """
+    next_time = time.time()
+    for _ in range(sample_count):
+        time.sleep(max(next_time - time.time(), 0.0))
+        next_time += period
+
+        ring.put(make_sample().to_bytes())
+
+
+def consume_queue(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper, sample_count: int
+) -> "list[float]":
+    """
+    Returns the latency (s) of each sample.
+    """
+    latencies = []
+    for _ in range(sample_count):
+        sample = input_queue.queue.get()
+        latencies.append(time.time() - sample.x)
+
+    return latencies
+
+
+def consume_ring(ring: shared_ring_buffer.SharedRingBuffer, sample_count: int) -> "list[float]":
+    """
+    Returns the latency (s) of each sample.
+    """
+    latencies = []
+    for _ in range(sample_count):
+        sample = telemetry.TelemetryData.from_bytes(ring.get())
+        latencies.append(time.time() - sample.x)
+
+    return latencies
+
+
+def run(
+    producer_target: "(...) -> None",  # type: ignore
+    output: "queue_proxy_wrapper.QueueProxyWrapper | shared_ring_buffer.SharedRingBuffer",
+    consume: "(...) -> list[float]",  # type: ignore
+    producer_count: int,
+) -> "tuple[float, list[float], float]":
+    """
+    Returns samples/s received, the latency (s) of each sample,
+    and main's CPU time (s) per sample.
+    """
+    sample_count = RATE * DURATION // producer_count
+    period = producer_count / RATE
+
+    producers = [
+        mp.Process(target=producer_target, args=(output, sample_count, period))
+        for _ in range(producer_count)
+    ]
+
+    start_time = time.time()
+    start_cpu_time = time.process_time()
+    for producer in producers:
+        producer.start()
+
+    latencies = consume(output, sample_count * producer_count)
+
+    cpu_time = time.process_time() - start_cpu_time
+    rate = len(latencies) / (time.time() - start_time)
+
+    for producer in producers:
+        producer.join()
+
+    return rate, latencies, cpu_time / len(latencies)
+
+
+def main() -> int:
+    """
+    Run each queue and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    mp_manager = mp.Manager()
+
+    for producer_count in [1, 2]:
+        telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+
+        result, ring = shared_ring_buffer.SharedRingBuffer.create(
+            telemetry.TelemetryData.RECORD_SIZE, QUEUE_MAX_SIZE, producer_count > 1
+        )
+        if not result:
+            print("ERROR: Failed to create ring buffer")
+            return -1
+
+        # Get Pylance to stop complaining
+        assert ring is not None
+
+        for name, producer_target, output, consume in [
+            ("Manager queue", queue_producer, telemetry_queue, consume_queue),
+            ("Ring buffer", ring_producer, ring, consume_ring),
+        ]:
+            rate, latencies, cpu_time = run(producer_target, output, consume, producer_count)
+            percentiles = statistics.quantiles(latencies, n=100)
+            main_logger.info(
+                f"{name}, {producer_count} producers: {rate:.0f} samples/s, "
+                f"latency p50 {percentiles[49] * 1e6:.0f} us, p99 {percentiles[98] * 1e6:.0f} us, "
+                f"main CPU {cpu_time * 1e6:.1f} us/sample"
+            )
+
+        ring.close()
+        ring.unlink()
+
+    mp_manager.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
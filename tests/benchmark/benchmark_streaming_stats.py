@@ -0,0 +1,143 @@
+"""
+Soak benchmark of the streaming statistics against keeping every sample like Command used to.
+
+Adds velocity samples in blocks and reports the time per sample and resident memory after
+each block, which should stay flat for the streaming statistics.
+To run:
+```
+python -m tests.benchmark.benchmark_streaming_stats
+```
+"""
+
+import random
+import resource
+import time
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from utilities.stats import streaming_stats
+
+
+SAMPLE_COUNT = 1_000_000
+BLOCK_SIZE = 100_000
+# Keeping every sample is quadratic, so only a short run
+LIST_SAMPLE_COUNT = 20_000
+LIST_BLOCK_SIZE = 4_000
+WINDOW_SIZE = 100
+EWMA_ALPHA = 0.1
+
+
+class SampleList:
+    """
+    Average of every sample by keeping and resumming all of them, as Command did.
+    """
+
+    def __init__(self) -> None:
+        self.__samples = []
+
+    def add(self, sample: "tuple[float, float, float]") -> None:
+        """
+        Keep the sample.
+        """
+        self.__samples.append(sample)
+
+    def mean(self) -> "tuple[float, float, float]":
+        """
+        Resum every sample.
+        """
+        sum_x = 0
+        sum_y = 0
+        sum_z = 0
+        for velocity in self.__samples:
+            sum_x += velocity[0]
+            sum_y += velocity[1]
+            sum_z += velocity[2]
+
+        count = len(self.__samples)
+        return sum_x / count, sum_y / count, sum_z / count
+
+
+def max_rss() -> int:
+    """
+    Peak resident memory of this process in kB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def soak(
+    name: str,
+    statistics: object,
+    read: "str",
+    sample_count: int,
+    block_size: int,
+    main_logger: logger.Logger,
+) -> None:
+    """
+    Add sample_count samples and read the statistic after each, like Command does per decision.
+    """
+    rng = random.Random(0)
+    read_statistic = getattr(statistics, read)
+
+    for block in range(sample_count // block_size):
+        samples = [
+            (rng.gauss(1.0, 0.5), rng.gauss(2.0, 0.5), rng.gauss(0.0, 0.1))
+            for _ in range(block_size)
+        ]
+
+        start = time.perf_counter()
+        for sample in samples:
+            statistics.add(sample)
+            read_statistic()
+        elapsed = time.perf_counter() - start
+
+        main_logger.info(
+            f"{name}: {(block + 1) * block_size} samples, "
+            f"{elapsed / block_size * 1e6:.2f} us/sample, max RSS {max_rss()} kB"
+        )
+
+
+def main() -> int:
+    """
+    Soak each statistic and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    _, running = streaming_stats.RunningStatistics.create(3)
+    _, exponential = streaming_stats.ExponentialAverage.create(3, EWMA_ALPHA)
+    _, window = streaming_stats.WindowAverage.create(3, WINDOW_SIZE)
+
+    for name, statistics, read in (
+        ("RunningStatistics", running, "mean"),
+        ("ExponentialAverage", exponential, "value"),
+        ("WindowAverage", window, "mean"),
+    ):
+        soak(name, statistics, read, SAMPLE_COUNT, BLOCK_SIZE, main_logger)
+
+    soak("Sample list", SampleList(), "mean", LIST_SAMPLE_COUNT, LIST_BLOCK_SIZE, main_logger)
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,147 @@
+"""
+Benchmark the throughput of telemetry batches against individual TelemetryData objects.
+
+Telemetry streams fused samples from a generated log as fast as it can parse it,
+and sends them to another process through a manager queue.
+To run:
+```
+python -m tests.benchmark.benchmark_telemetry_batch
+```
+"""
+
+import multiprocessing as mp
+import pathlib
+import struct
+import tempfile
+import time
+
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+
+
+MESSAGE_COUNT = 20_000
+BATCH_SIZE = 100
+QUEUE_MAX_SIZE = 0
+
+
+def generate_telemetry_log(path: pathlib.Path) -> None:
+    """
+    Write a tlog alternating between ATTITUDE and LOCAL_POSITION_NED every millisecond.
+    """
+    mav = common.MAVLink(None, srcSystem=1, srcComponent=0)
+
+    with open(path, "wb") as log_file:
+        for time_boot_ms in range(MESSAGE_COUNT):
+            if time_boot_ms % 2 == 0:
+                msg = mav.attitude_encode(time_boot_ms, 0.0, 0.0, 0.1, 0.0, 0.0, 0.0)
+            else:
+                msg = mav.local_position_ned_encode(time_boot_ms, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0)
+
+            log_file.write(struct.pack(">Q", time_boot_ms * 1000))
+            log_file.write(msg.pack(mav))
+
+
+def run_objects(
+    path: pathlib.Path,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    main_logger: logger.Logger,
+) -> "tuple[int, float]":
+    """
+    Send every fused sample as its own TelemetryData.
+
+    Returns the number of samples sent and time taken.
+    """
+    result, telem = telemetry.Telemetry.create(mavutil.mavlogfile(str(path)), main_logger)
+    assert result and telem is not None
+
+    sample_count = 0
+
+    start = time.perf_counter()
+    while sample_count < MESSAGE_COUNT - 1:
+        _, telemetry_data = telem.run_streaming()
+        if telemetry_data is None:
+            continue
+
+        output_queue.queue.put(telemetry_data)
+        sample_count += 1
+
+    return sample_count, time.perf_counter() - start
+
+
+def run_batches(
+    path: pathlib.Path,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    main_logger: logger.Logger,
+) -> "tuple[int, float]":
+    """
+    Send fused samples in blocks of BATCH_SIZE.
+
+    Returns the number of samples sent and time taken.
+    """
+    result, telem = telemetry.Telemetry.create(mavutil.mavlogfile(str(path)), main_logger)
+    assert result and telem is not None
+
+    sample_count = 0
+
+    start = time.perf_counter()
+    while sample_count < MESSAGE_COUNT - 1:
+        batch_size = min(BATCH_SIZE, MESSAGE_COUNT - 1 - sample_count)
+        _, telemetry_batch = telem.run_batch(batch_size, telemetry.TelemetryMode.STREAMING)
+
+        output_queue.queue.put(telemetry_batch)
+        sample_count += len(telemetry_batch)
+
+    return sample_count, time.perf_counter() - start
+
+
+def main() -> int:
+    """
+    Run both benchmarks and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    mp_manager = mp.Manager()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory, "telemetry.tlog")
+        generate_telemetry_log(path)
+
+        for name, run in (("TelemetryData", run_objects), ("TelemetryBatch", run_batches)):
+            output_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+            sample_count, elapsed = run(path, output_queue, main_logger)
+            main_logger.info(
+                f"{name}: {sample_count} samples in {elapsed:.3f} s, "
+                f"{sample_count / elapsed:.0f} samples/s"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,158 @@
+"""
+Benchmark the memory and queue cost of TelemetryData representations.
+
+Compares an object with a per instance __dict__ (the previous TelemetryData layout),
+the slotted TelemetryData, and its packed binary record.
+To run:
+```
+python -m tests.benchmark.benchmark_telemetry_record
+```
+"""
+
+import multiprocessing as mp
+import pickle
+import time
+import tracemalloc
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+
+
+MEMORY_SAMPLE_COUNT = 100_000
+QUEUE_SAMPLE_COUNT = 5_000
+QUEUE_MAX_SIZE = 0
+
+
+class DictTelemetryData:  # pylint: disable=too-many-instance-attributes
+    """
+    Previous TelemetryData layout, attributes are stored in a per instance __dict__.
+    """
+
+    def __init__(self, *values: "int | float | None") -> None:
+        (
+            self.time_since_boot,
+            self.x,
+            self.y,
+            self.z,
+            self.x_velocity,
+            self.y_velocity,
+            self.z_velocity,
+            self.roll,
+            self.pitch,
+            self.yaw,
+            self.roll_speed,
+            self.pitch_speed,
+            self.yaw_speed,
+            self.attitude_time_since_boot,
+            self.position_time_since_boot,
+        ) = values
+
+
+def sample_values(i: int) -> "tuple":
+    """
+    Distinct values for every sample so nothing is shared between instances.
+    """
+    value = float(i)
+    return (i,) + (value,) * 12 + (i, i)
+
+
+def make_dict(i: int) -> DictTelemetryData:
+    """
+    Sample with a per instance __dict__.
+    """
+    return DictTelemetryData(*sample_values(i))
+
+
+def make_slots(i: int) -> telemetry.TelemetryData:
+    """
+    Slotted sample.
+    """
+    return telemetry.TelemetryData(*sample_values(i))
+
+
+def make_record(i: int) -> bytes:
+    """
+    Packed sample.
+    """
+    return telemetry.TelemetryData(*sample_values(i)).to_bytes()
+
+
+def memory_per_sample(make: "(int) -> object") -> float:  # type: ignore
+    """
+    Average bytes allocated per live sample.
+    """
+    tracemalloc.start()
+    samples = [make(i) for i in range(MEMORY_SAMPLE_COUNT)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Exclude the list holding the samples
+    return (size - len(samples) * 8) / len(samples)
+
+
+def queue_round_trip(
+    make: "(int) -> object", mp_manager: mp.managers.SyncManager  # type: ignore
+) -> float:
+    """
+    Average seconds to put a sample into a manager queue and get it back out.
+    """
+    test_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE)
+    samples = [make(i) for i in range(QUEUE_SAMPLE_COUNT)]
+
+    start = time.perf_counter()
+    for sample in samples:
+        test_queue.queue.put(sample)
+        test_queue.queue.get()
+
+    return (time.perf_counter() - start) / len(samples)
+
+
+def main() -> int:
+    """
+    Run the benchmarks and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    mp_manager = mp.Manager()
+
+    for name, make in (
+        ("__dict__ object", make_dict),
+        ("Slotted object", make_slots),
+        ("Binary record", make_record),
+    ):
+        memory = memory_per_sample(make)
+        pickled_size = len(pickle.dumps(make(0)))
+        round_trip = queue_round_trip(make, mp_manager)
+        main_logger.info(
+            f"{name}: {memory:.0f} B per sample in memory, {pickled_size} B pickled, "
+            f"{round_trip * 1e6:.1f} us queue round trip"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,138 @@
+"""
+Benchmark telemetry driven by a replayed tlog at different replay speeds.
+
+Telemetry streams fused samples from a generated log through TlogReplay, reporting throughput
+and how late each sample arrived compared to when it was recorded (scaled by the speed).
+To run:
+```
+python -m tests.benchmark.benchmark_tlog_replay
+```
+"""
+
+import pathlib
+import statistics
+import struct
+import tempfile
+import time
+
+from pymavlink.dialects.v20 import common
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.replay import tlog_replay
+from modules.telemetry import telemetry
+
+
+LOG_DURATION = 4_000  # ms
+MESSAGE_PERIOD = 5  # ms
+# <= 0 for as fast as possible
+REPLAY_SPEEDS = [1, 10, 0]
+RECEIVE_TIMEOUT = 0.1  # seconds
+
+
+def generate_telemetry_log(path: pathlib.Path) -> None:
+    """
+    Write a tlog alternating between ATTITUDE and LOCAL_POSITION_NED every MESSAGE_PERIOD.
+    """
+    mav = common.MAVLink(None, srcSystem=1, srcComponent=0)
+
+    with open(path, "wb") as log_file:
+        for i, time_boot_ms in enumerate(range(0, LOG_DURATION, MESSAGE_PERIOD)):
+            if i % 2 == 0:
+                msg = mav.attitude_encode(time_boot_ms, 0.0, 0.0, 0.1, 0.0, 0.0, 0.0)
+            else:
+                msg = mav.local_position_ned_encode(time_boot_ms, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0)
+
+            log_file.write(struct.pack(">Q", time_boot_ms * 1000))
+            log_file.write(msg.pack(mav))
+
+
+def run_replay(
+    path: pathlib.Path, speed: float, main_logger: logger.Logger
+) -> "tuple[int, float, list[float]]":
+    """
+    Stream the whole log through Telemetry.
+
+    Returns the number of samples, time taken until the last one, and lateness (s) of each sample.
+    """
+    result, replay = tlog_replay.TlogReplay.create(path, speed)
+    assert result and replay is not None
+
+    result, telem = telemetry.Telemetry.create(replay, main_logger)
+    assert result and telem is not None
+
+    sample_count = 0
+    lateness = []
+    # Receive and log times of the first sample, opening the log is not part of the replay
+    first_sample_times = None
+
+    start = time.time()
+    end = start
+    while not replay.is_finished():
+        _, telemetry_data = telem.run_streaming()
+        if telemetry_data is None:
+            continue
+
+        sample_count += 1
+        end = time.time()
+        if first_sample_times is None:
+            first_sample_times = (end, telemetry_data.time_since_boot)
+
+        if speed > 0:
+            log_time = (telemetry_data.time_since_boot - first_sample_times[1]) / 1000
+            lateness.append(end - first_sample_times[0] - log_time / speed)
+
+    return sample_count, end - start, lateness
+
+
+def main() -> int:
+    """
+    Replay at each speed and report.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory, "telemetry.tlog")
+        generate_telemetry_log(path)
+
+        for speed in REPLAY_SPEEDS:
+            sample_count, elapsed, lateness = run_replay(path, speed, main_logger)
+            message = (
+                f"Speed {speed if speed > 0 else 'max'}: {sample_count} samples "
+                f"in {elapsed:.3f} s, {sample_count / elapsed:.0f} samples/s"
+            )
+            if len(lateness) > 1:
+                percentiles = statistics.quantiles(lateness, n=100)
+                message += (
+                    f", lateness median {percentiles[49] * 1000:.2f} ms, "
+                    f"p99 {percentiles[98] * 1000:.2f} ms"
+                )
+
+            main_logger.info(message)
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,101 @@
+"""
+Record a mocked drone into a .tlog file for replaying. To run:
+```
+python -m tests.integration.record_tlog
+```
+Then set REPLAY_TLOG_PATH in bootcamp_main.py to the recorded file.
+"""
+
+import multiprocessing as mp
+import pathlib
+import subprocess
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+
+
+# Any of the mocked drones in tests.integration.mock_drones
+MOCK_DRONE_MODULE = "tests.integration.mock_drones.telemetry_drone"
+CONNECTION_STRING = "tcp:localhost:12345"
+TLOG_PATH = pathlib.Path("logs", "replay", "telemetry_drone.tlog")
+
+# Stop after the drone has been silent for this long
+SILENCE_TIMEOUT = 3  # seconds
+
+
+def start_drone() -> None:
+    """
+    Start the mocked drone.
+    """
+    subprocess.run(["python", "-m", MOCK_DRONE_MODULE], check=False)
+
+
+def main() -> int:
+    """
+    Record everything the mocked drone sends until it goes silent.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    TLOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    # Mocked GCS, connect to mocked drone which is listening at CONNECTION_STRING
+    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    connection.setup_logfile(str(TLOG_PATH))
+    connection.mav.heartbeat_send(
+        mavutil.mavlink.MAV_TYPE_GCS,
+        mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+        0,
+        0,
+        0,
+    )
+    main_logger.info("Connected!")
+
+    message_count = 0
+    last_message_time = time.time()
+    while time.time() - last_message_time < SILENCE_TIMEOUT:
+        msg = connection.recv_match(blocking=True, timeout=SILENCE_TIMEOUT)
+        if msg is None:
+            continue
+
+        message_count += 1
+        last_message_time = time.time()
+
+    connection.logfile.close()
+    connection.close()
+    main_logger.info(f"Recorded {message_count} messages to {TLOG_PATH}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    # Start drone in another process
+    drone_process = mp.Process(target=start_drone)
+    drone_process.start()
+
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
+
+    drone_process.join()
@@ -13,6 +13,7 @@ from pymavlink import mavutil
 
 from modules.command import command
 from modules.command import command_worker
+from modules.command import decision
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
@@ -36,6 +37,15 @@ TURNING_SPEED = 5  # deg/s
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 # Add your own constants here
+TELEMETRY_LATEST_SLOT = None
+LATENCY_HISTOGRAMS = None
+# Every test case must be decided on
+CONFLATE_INPUT = False
+# The mocked drone does not acknowledge commands, and expects each one exactly once
+COMMAND_ACK_TIMEOUT = 1  # seconds
+COMMAND_RETRIES = 0
+# The mocked drone is system 1
+TARGETS = {1: TARGET}
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -79,7 +89,9 @@ def read_queue(
         try:
             status = output_queue.queue.get(timeout=0.1)
             if status is not None:
-                main_logger.info(f"Worker output: {status}", True)
+                main_logger.info(
+                    f"Worker output: {decision.DecisionRecord.from_bytes(status)}", True
+                )
         except queue.Empty:
             continue
 
@@ -248,14 +260,19 @@ def main() -> int:
 
     command_worker.command_worker(
         connection,
-        TARGET,
-        input_queue,
-        output_queue,
-        controller,
+        TARGETS,
         HEIGHT_TOLERANCE,
         Z_SPEED,
         ANGLE_TOLERANCE,
         TURNING_SPEED,
+        COMMAND_ACK_TIMEOUT,
+        COMMAND_RETRIES,
+        TELEMETRY_LATEST_SLOT,
+        LATENCY_HISTOGRAMS,
+        CONFLATE_INPUT,
+        input_queue,
+        output_queue,
+        controller,
     )
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -13,6 +13,7 @@ from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.heartbeat import heartbeat_receiver_worker
+from modules.heartbeat import link_supervisor_worker
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 
@@ -31,6 +32,12 @@ ERROR_TOLERANCE = 1e-2
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 # Add your own constants here
+# Run the link supervisor, which also sends heartbeats, instead of the heartbeat receiver worker
+USE_LINK_SUPERVISOR = True
+# Longest time between connection events while the state does not change, None for only changes
+KEEPALIVE_PERIOD = None
+# Phi accrual suspicion to disconnect at, None to disconnect after DISCONNECT_THRESHOLD misses
+PHI_THRESHOLD = 5
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -139,9 +146,16 @@ def main() -> int:
     ).start()
 
     # Read the main queue (worker outputs)
-    threading.Thread(target=read_queue, args=(output_queue, main_logger)).start()
+    threading.Thread(target=read_queue, args=(output_queue, controller, main_logger)).start()
 
-    heartbeat_receiver_worker.heartbeat_receiver_worker(connection, output_queue, controller)
+    if USE_LINK_SUPERVISOR:
+        link_supervisor_worker.link_supervisor_worker(
+            connection, connection, KEEPALIVE_PERIOD, PHI_THRESHOLD, output_queue, controller
+        )
+    else:
+        heartbeat_receiver_worker.heartbeat_receiver_worker(
+            connection, KEEPALIVE_PERIOD, PHI_THRESHOLD, output_queue, controller
+        )
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
     # =============================================================================================
@@ -12,6 +12,7 @@ from pymavlink import mavutil
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
 from modules.telemetry import telemetry_worker
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
@@ -29,6 +30,12 @@ NUM_FAILS = 3
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
 # Add your own constants here
+TELEMETRY_MODE = telemetry.TelemetryMode.POLLING
+TELEMETRY_BATCH_SIZE = 1
+# The mocked drone streams at fixed rates
+TELEMETRY_ATTITUDE_RATE = None
+TELEMETRY_POSITION_RATE = None
+TELEMETRY_LATEST_SLOT = None
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -138,7 +145,16 @@ def main() -> int:
     # Read the main queue (worker outputs)
     threading.Thread(target=read_queue, args=(output_queue, main_logger)).start()
 
-    telemetry_worker.telemetry_worker(connection, output_queue, controller)
+    telemetry_worker.telemetry_worker(
+        connection,
+        TELEMETRY_MODE,
+        TELEMETRY_BATCH_SIZE,
+        TELEMETRY_ATTITUDE_RATE,
+        TELEMETRY_POSITION_RATE,
+        TELEMETRY_LATEST_SLOT,
+        output_queue,
+        controller,
+    )
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
     # =============================================================================================
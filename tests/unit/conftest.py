@@ -0,0 +1,77 @@
+"""
+Fakes shared by the unit tests.
+"""
+
+import logging
+
+from pymavlink.dialects.v20 import common
+
+
+class FakeConnection:
+    """
+    Stands in for mavutil.mavfile, receiving the given messages in order
+    and keeping the frames sent through mav.
+    """
+
+    def __init__(self, messages: "list[object]") -> None:
+        self.mav = common.MAVLink(self)
+        self.sent: "list[bytes]" = []
+        self.__messages = list(messages)
+
+    def recv_match(
+        self,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "object | None":
+        """
+        Next message of the types, None once there are none left. Never waits.
+        """
+        assert not blocking or timeout is not None
+
+        message_types = [type] if isinstance(type, str) else type
+        for i, msg in enumerate(self.__messages):
+            if message_types is None or msg.get_type() in message_types:
+                return self.__messages.pop(i)
+
+        return None
+
+    def write(self, frame: bytes) -> None:
+        """
+        Keep a frame mav sent.
+        """
+        self.sent.append(bytes(frame))
+
+
+class FakeLogger:
+    """
+    Stands in for logger.Logger, keeping what was logged.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.lines: "list[str]" = []
+
+    def debug(self, message: str, _: bool = False) -> None:
+        """
+        Keep the message.
+        """
+        self.lines.append(message)
+
+    def info(self, message: str, _: bool = False) -> None:
+        """
+        Keep the message.
+        """
+        self.lines.append(message)
+
+    def warning(self, message: str, _: bool = False) -> None:
+        """
+        Keep the message.
+        """
+        self.lines.append(message)
+
+    def error(self, message: str, _: bool = False) -> None:
+        """
+        Keep the message.
+        """
+        self.lines.append(message)
@@ -0,0 +1,213 @@
+"""
+Test suppressing commands already in flight.
+"""
+
+import pytest
+
+from modules.command import command_filter
+from modules.command import decision
+from modules.command import pending_commands
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+RESEND_TIMEOUT = 1.0  # s
+ALTITUDE_CHANGE_THRESHOLD = 0.1  # m
+HEADING_CHANGE_THRESHOLD = 1.0  # deg
+HYSTERESIS = 0.5
+HEIGHT_TOLERANCE = 0.5  # m
+ANGLE_TOLERANCE = 5.0  # deg
+ACK_TIMEOUT = 1.0  # s
+RESULT_TIMEOUT = 10.0  # s
+MAX_RETRIES = 2
+LATENCY_WINDOW_SIZE = 10
+SYSTEM_ID = 1
+COMMAND_ID = 113  # MAV_CMD_CONDITION_CHANGE_ALT
+
+
+@pytest.fixture()
+def command_filter_fixture() -> command_filter.CommandFilter:  # type: ignore
+    """
+    Filter with nothing in flight.
+    """
+    result, new_filter = command_filter.CommandFilter.create(
+        RESEND_TIMEOUT, ALTITUDE_CHANGE_THRESHOLD, HEADING_CHANGE_THRESHOLD, HYSTERESIS
+    )
+    assert result
+    assert new_filter is not None
+
+    yield new_filter  # type: ignore
+
+
+class TestCreate:
+    """
+    Valid parameters.
+    """
+
+    @pytest.mark.parametrize(
+        "resend_timeout,hysteresis", [(0.0, 0.5), (-1.0, 0.5), (1.0, 1.0), (1.0, -0.1)]
+    )
+    def test_invalid(self, resend_timeout: float, hysteresis: float) -> None:
+        """
+        Timeout must be positive and hysteresis a fraction below 1.
+        """
+        result, new_filter = command_filter.CommandFilter.create(
+            resend_timeout, ALTITUDE_CHANGE_THRESHOLD, HEADING_CHANGE_THRESHOLD, hysteresis
+        )
+
+        assert not result
+        assert new_filter is None
+
+
+class TestShouldSend:
+    """
+    Sending and suppressing.
+    """
+
+    def test_suppress_same(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Same command is only sent once while in flight.
+        """
+        sent = [
+            command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, t)
+            for t in [0.0, 0.1, 0.2, 0.3]
+        ]
+
+        assert sent == [True, False, False, False]
+        assert command_filter_fixture.sent_count == 1
+        assert command_filter_fixture.suppressed_count == 3
+
+    def test_resend_after_timeout(
+        self, command_filter_fixture: command_filter.CommandFilter
+    ) -> None:
+        """
+        Command in flight too long is sent again.
+        """
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.0)
+        assert not command_filter_fixture.should_send(
+            decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, RESEND_TIMEOUT / 2
+        )
+        assert command_filter_fixture.should_send(
+            decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, RESEND_TIMEOUT
+        )
+
+    def test_awaiting_ack_not_resent(
+        self, command_filter_fixture: command_filter.CommandFilter
+    ) -> None:
+        """
+        Command still waiting on an acknowledgement is left to the pending command table.
+        """
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.0)
+
+        assert not command_filter_fixture.should_send(
+            decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, RESEND_TIMEOUT, True
+        )
+        # Moved target is still sent at once
+        assert command_filter_fixture.should_send(
+            decision.Decision.CHANGE_ALTITUDE, 31.0, 1.0, RESEND_TIMEOUT, True
+        )
+
+    def test_one_send_per_tick(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Ticking like Command.run with no acknowledgement coming back: retries from the pending
+        table and resends from the filter never both go out in one tick, and retries run out.
+        """
+        result, pending = pending_commands.PendingCommands.create(
+            ACK_TIMEOUT, RESULT_TIMEOUT, MAX_RETRIES, LATENCY_WINDOW_SIZE
+        )
+        assert result
+        assert pending is not None
+
+        sends_per_tick = []
+        for now in [0.0, 0.5, 1.05, 1.5, 2.1, 2.6, 3.15, 3.6, 4.2, 5.3]:
+            sends = len(pending.due_retries(now))
+
+            if command_filter_fixture.should_send(
+                decision.Decision.CHANGE_ALTITUDE,
+                30.0,
+                1.0,
+                now,
+                pending.is_pending(SYSTEM_ID, COMMAND_ID),
+            ):
+                pending.add(SYSTEM_ID, COMMAND_ID, (0.0,), now)
+                sends += 1
+
+            sends_per_tick.append(sends)
+
+        # First send and MAX_RETRIES retries, then the filter resends once the table gives up
+        assert sends_per_tick == [1, 0, 1, 0, 1, 0, 1, 0, 1, 1]
+        assert pending.retried_count == 2 * MAX_RETRIES
+        assert pending.expired_count == 1
+
+    def test_send_on_change(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Different command or a moved target is sent right away.
+        """
+        assert command_filter_fixture.should_send(decision.Decision.CHANGING_YAW, 90.0, 10.0, 0.0)
+        assert not command_filter_fixture.should_send(
+            decision.Decision.CHANGING_YAW, 90.5, 10.0, 0.1
+        )
+        assert command_filter_fixture.should_send(decision.Decision.CHANGING_YAW, 95.0, 10.0, 0.2)
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.3)
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 31.0, 1.0, 0.4)
+
+    def test_send_on_overshoot(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Vehicle that passed its target needs the command again.
+        """
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.0)
+
+        assert command_filter_fixture.should_send(
+            decision.Decision.CHANGE_ALTITUDE, 30.0, -1.0, 0.1
+        )
+
+    def test_heading_wraps(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Headings either side of +-180 are close.
+        """
+        assert command_filter_fixture.should_send(decision.Decision.CHANGING_YAW, 179.8, 10.0, 0.0)
+
+        assert not command_filter_fixture.should_send(
+            decision.Decision.CHANGING_YAW, -179.8, 10.0, 0.1
+        )
+
+    def test_on_target_clears(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Reaching the target ends the command in flight, so the next correction is sent.
+        """
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.0)
+        assert not command_filter_fixture.should_send(decision.Decision.ON_TARGET, 0.0, 0.0, 0.1)
+
+        assert command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.2)
+        assert command_filter_fixture.suppressed_count == 0
+
+
+class TestTolerances:
+    """
+    Hysteresis while correcting.
+    """
+
+    def test_nothing_in_flight(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Tolerances are unchanged.
+        """
+        actual = command_filter_fixture.tolerances(HEIGHT_TOLERANCE, ANGLE_TOLERANCE)
+
+        assert actual == (HEIGHT_TOLERANCE, ANGLE_TOLERANCE)
+
+    def test_correcting(self, command_filter_fixture: command_filter.CommandFilter) -> None:
+        """
+        Only the tolerance being corrected is narrowed.
+        """
+        command_filter_fixture.should_send(decision.Decision.CHANGE_ALTITUDE, 30.0, 1.0, 0.0)
+
+        actual = command_filter_fixture.tolerances(HEIGHT_TOLERANCE, ANGLE_TOLERANCE)
+        assert actual == (HEIGHT_TOLERANCE * (1 - HYSTERESIS), ANGLE_TOLERANCE)
+
+        command_filter_fixture.should_send(decision.Decision.CHANGING_YAW, 90.0, 10.0, 0.1)
+
+        actual = command_filter_fixture.tolerances(HEIGHT_TOLERANCE, ANGLE_TOLERANCE)
+        assert actual == (HEIGHT_TOLERANCE, ANGLE_TOLERANCE * (1 - HYSTERESIS))
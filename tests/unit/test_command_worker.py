@@ -0,0 +1,150 @@
+"""
+Test how the command worker feeds telemetry to Command.
+"""
+
+import math
+
+import pytest
+
+from modules.command import command
+from modules.command import command_worker
+from modules.command import decision
+from modules.telemetry import telemetry
+from . import conftest
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TARGETS = {1: command.Position(10.0, 0.0, 5.0), 2: command.Position(0.0, 10.0, 0.0)}
+HEIGHT_TOLERANCE = 0.5  # m
+Z_SPEED = 1.0  # m/s
+ANGLE_TOLERANCE = 5.0  # deg
+TURNING_SPEED = 5.0  # deg/s
+
+
+@pytest.fixture()
+def connection() -> conftest.FakeConnection:  # type: ignore
+    """
+    Connection with nothing to receive.
+    """
+    yield conftest.FakeConnection([])  # type: ignore
+
+
+@pytest.fixture()
+def cmd(connection: conftest.FakeConnection) -> command.Command:  # type: ignore
+    """
+    Command for the vehicles in TARGETS.
+    """
+    result, new_cmd = command.Command.create(
+        connection,
+        TARGETS,
+        HEIGHT_TOLERANCE,
+        Z_SPEED,
+        ANGLE_TOLERANCE,
+        TURNING_SPEED,
+        conftest.FakeLogger(),
+    )
+    assert result
+    assert new_cmd is not None
+
+    yield new_cmd  # type: ignore
+
+
+def make_batch(samples: "list[telemetry.TelemetryData]") -> telemetry.TelemetryBatch:
+    """
+    Batch of the samples.
+    """
+    telemetry_batch = telemetry.TelemetryBatch(len(samples))
+    for i, telemetry_data in enumerate(samples):
+        telemetry_batch.append(telemetry_data, float(i))
+
+    return telemetry_batch
+
+
+def make_sample(
+    time_since_boot: int, system_id: "int | None", yaw: float = 0.0
+) -> telemetry.TelemetryData:
+    """
+    Sample of a vehicle at the origin, on the ground and still.
+    """
+    return telemetry.TelemetryData(
+        time_since_boot=time_since_boot,
+        x=0.0,
+        y=0.0,
+        z=0.0,
+        x_velocity=0.0,
+        y_velocity=0.0,
+        z_velocity=0.0,
+        yaw=yaw,
+        system_id=system_id,
+    )
+
+
+class TestDecideBatch:
+    """
+    Deciding on a whole batch.
+    """
+
+    def test_every_sample(self, cmd: command.Command, connection: conftest.FakeConnection) -> None:
+        """
+        Every sample gets a decision, and only the newest of each vehicle sends a command.
+        """
+        telemetry_batch = make_batch(
+            [
+                make_sample(100, None),
+                make_sample(110, 2, math.pi / 2),
+                make_sample(200, 1),
+                make_sample(210, 2),
+            ]
+        )
+
+        result, records = command_worker.decide_batch(cmd, telemetry_batch)
+
+        assert result
+        assert records is not None
+        assert [record.kind for record in records] == [
+            decision.Decision.CHANGE_ALTITUDE,
+            decision.Decision.ON_TARGET,
+            decision.Decision.CHANGE_ALTITUDE,
+            decision.Decision.CHANGING_YAW,
+        ]
+        assert [record.system_id for record in records] == [1, 2, 1, 2]
+        assert [record.time_since_boot for record in records] == [100, 110, 200, 210]
+        assert [record.is_sent for record in records] == [False, False, True, True]
+        assert records[0].altitude_delta == pytest.approx(5.0)
+        assert records[3].angle_delta_deg == pytest.approx(90.0)
+        assert len(connection.sent) == 2
+
+    def test_no_target(self, cmd: command.Command, connection: conftest.FakeConnection) -> None:
+        """
+        A vehicle without a target fails the batch without sending anything.
+        """
+        result, records = command_worker.decide_batch(cmd, make_batch([make_sample(100, 3)]))
+
+        assert not result
+        assert records is None
+        assert len(connection.sent) == 0
+
+
+def test_newest_per_vehicle() -> None:
+    """
+    Conflated input keeps only the newest sample of each vehicle, including from batches.
+    """
+    older = telemetry.TelemetryData(time_since_boot=100, system_id=1)
+    other = telemetry.TelemetryData(time_since_boot=150, system_id=2)
+    telemetry_batch = make_batch(
+        [
+            telemetry.TelemetryData(time_since_boot=200, system_id=1),
+            telemetry.TelemetryData(time_since_boot=300, system_id=1),
+        ]
+    )
+
+    samples = command_worker.newest_per_vehicle([older, other, None, telemetry_batch])
+
+    assert [(sample.system_id, sample.time_since_boot) for sample in samples] == [
+        (2, 150),
+        (1, 300),
+    ]
@@ -0,0 +1,157 @@
+"""
+Test reporting connection state changes from heartbeats.
+"""
+
+import pickle
+
+import pytest
+
+from modules.heartbeat import connection_state
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+DISCONNECT_THRESHOLD = 5
+KEEPALIVE_PERIOD = 10  # seconds
+START_TIME = 1000.0  # seconds since epoch
+
+
+@pytest.fixture()
+def tracker() -> connection_state.ConnectionStateTracker:  # type: ignore
+    """
+    Tracker with only state changes.
+    """
+    result, instance = connection_state.ConnectionStateTracker.create(DISCONNECT_THRESHOLD, None)
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+def feed(
+    tracker: connection_state.ConnectionStateTracker, received: "list[bool]", start: float
+) -> "list[tuple[float, connection_state.ConnectionEvent]]":
+    """
+    One heartbeat period (1 s) per entry, returns the time of each event and the event.
+    """
+    events = []
+    for i, is_received in enumerate(received):
+        now = start + i
+        event = tracker.update(is_received, now)
+        if event is not None:
+            events.append((now, event))
+
+    return events
+
+
+class TestCreate:
+    """
+    Creating the tracker.
+    """
+
+    def test_invalid(self) -> None:
+        """
+        Threshold and keepalive period must be positive.
+        """
+        result, _ = connection_state.ConnectionStateTracker.create(0, None)
+        assert not result
+
+        result, _ = connection_state.ConnectionStateTracker.create(DISCONNECT_THRESHOLD, 0.0)
+        assert not result
+
+
+class TestUpdate:
+    """
+    Events from heartbeats.
+    """
+
+    def test_transitions_only(self, tracker: connection_state.ConnectionStateTracker) -> None:
+        """
+        The heartbeat receiver drone: connect, disconnect, reconnect, a single drop is ignored.
+        """
+        received = [True] * 5 + [False] * 8 + [True] * 5 + [False] + [True]
+
+        events = feed(tracker, received, START_TIME)
+
+        assert [(now, event.kind) for now, event in events] == [
+            (START_TIME, connection_state.ConnectionEventKind.CONNECTED),
+            (START_TIME + 9, connection_state.ConnectionEventKind.DISCONNECTED),
+            (START_TIME + 13, connection_state.ConnectionEventKind.CONNECTED),
+        ]
+        assert tracker.is_connected()
+
+    def test_event_contents(self, tracker: connection_state.ConnectionStateTracker) -> None:
+        """
+        Events carry their time, the missed count and the heartbeats since the last event.
+        """
+        events = feed(tracker, [True] * 3 + [False] * DISCONNECT_THRESHOLD, START_TIME)
+
+        _, disconnected = events[1]
+        assert not disconnected.is_connected
+        assert disconnected.timestamp == START_TIME + 3 + DISCONNECT_THRESHOLD - 1
+        assert disconnected.missed_heartbeats == DISCONNECT_THRESHOLD
+        assert disconnected.received_heartbeats == 2
+
+    def test_never_connected(self, tracker: connection_state.ConnectionStateTracker) -> None:
+        """
+        No heartbeat at all is reported once, as a disconnect.
+        """
+        events = feed(tracker, [False] * DISCONNECT_THRESHOLD * 3, START_TIME)
+
+        assert [event.kind for _, event in events] == [
+            connection_state.ConnectionEventKind.DISCONNECTED
+        ]
+
+    def test_keepalive(self) -> None:
+        """
+        A summary while the state does not change, keeping the state.
+        """
+        result, tracker = connection_state.ConnectionStateTracker.create(
+            DISCONNECT_THRESHOLD, KEEPALIVE_PERIOD
+        )
+        assert result
+        assert tracker is not None
+
+        events = feed(tracker, [True] * 25, START_TIME)
+
+        assert [(now - START_TIME, event.kind) for now, event in events] == [
+            (0, connection_state.ConnectionEventKind.CONNECTED),
+            (10, connection_state.ConnectionEventKind.KEEPALIVE),
+            (20, connection_state.ConnectionEventKind.KEEPALIVE),
+        ]
+        assert events[1][1].is_connected
+        assert events[1][1].received_heartbeats == KEEPALIVE_PERIOD
+
+    def test_keepalive_before_state(self) -> None:
+        """
+        A keepalive before the state is known does not stop the disconnect being reported.
+        """
+        result, tracker = connection_state.ConnectionStateTracker.create(
+            DISCONNECT_THRESHOLD, DISCONNECT_THRESHOLD / 2
+        )
+        assert result
+        assert tracker is not None
+
+        events = feed(tracker, [False] * DISCONNECT_THRESHOLD, START_TIME)
+
+        assert [event.kind for _, event in events] == [
+            connection_state.ConnectionEventKind.KEEPALIVE,
+            connection_state.ConnectionEventKind.DISCONNECTED,
+        ]
+
+
+def test_event_pickles() -> None:
+    """
+    Events cross process boundaries through queues.
+    """
+    event = connection_state.ConnectionEvent(
+        connection_state.ConnectionEventKind.DISCONNECTED, False, START_TIME, 5, 0
+    )
+
+    copy = pickle.loads(pickle.dumps(event))
+
+    assert copy.kind == event.kind
+    assert str(copy) == str(event)
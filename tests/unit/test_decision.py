@@ -0,0 +1,148 @@
+"""
+Test that the batch decision matches the single sample decision, and the decision records.
+"""
+
+import math
+import pickle
+
+import numpy as np
+
+from modules.command import decision
+
+
+TARGET = (10.0, 20.0, 30.0)
+HEIGHT_TOLERANCE = 0.5  # m
+ANGLE_TOLERANCE = 5  # deg
+SAMPLE_COUNT = 10_000
+ANGLE_ATOL = 1e-9  # deg
+
+
+def decide_each(
+    x: np.ndarray, y: np.ndarray, z: np.ndarray, yaw: np.ndarray
+) -> "tuple[list[int], list[float], list[float]]":
+    """
+    Decide for every sample one at a time.
+    """
+    decisions = []
+    altitude_deltas = []
+    angle_deltas = []
+    for sample_x, sample_y, sample_z, sample_yaw in zip(
+        x.tolist(), y.tolist(), z.tolist(), yaw.tolist()
+    ):
+        current_decision, altitude_delta, angle_delta = decision.decide(
+            TARGET,
+            (sample_x, sample_y, sample_z),
+            sample_yaw,
+            HEIGHT_TOLERANCE,
+            ANGLE_TOLERANCE,
+        )
+        decisions.append(current_decision)
+        altitude_deltas.append(altitude_delta)
+        angle_deltas.append(angle_delta)
+
+    return decisions, altitude_deltas, angle_deltas
+
+
+def assert_batch_matches(x: np.ndarray, y: np.ndarray, z: np.ndarray, yaw: np.ndarray) -> None:
+    """
+    Batch results match the single sample results, within rounding of the vectorized atan2.
+    """
+    expected_decisions, expected_altitude, expected_angle = decide_each(x, y, z, yaw)
+
+    actual_decisions, actual_altitude, actual_angle = decision.decide_batch(
+        TARGET, x, y, z, yaw, HEIGHT_TOLERANCE, ANGLE_TOLERANCE
+    )
+
+    assert actual_decisions.tolist() == expected_decisions
+    assert actual_altitude.tolist() == expected_altitude
+    np.testing.assert_allclose(actual_angle, expected_angle, rtol=0.0, atol=ANGLE_ATOL)
+
+
+class TestDecideBatch:
+    """
+    Vectorized decisions.
+    """
+
+    def test_random(self) -> None:
+        """
+        Samples around the target with any yaw.
+        """
+        rng = np.random.default_rng(0)
+        x = rng.uniform(-50.0, 50.0, SAMPLE_COUNT)
+        y = rng.uniform(-50.0, 50.0, SAMPLE_COUNT)
+        # Mostly near the target height, so every decision happens
+        z = TARGET[2] + rng.normal(0.0, 0.5, SAMPLE_COUNT)
+        yaw = rng.uniform(-math.pi, math.pi, SAMPLE_COUNT)
+
+        assert_batch_matches(x, y, z, yaw)
+
+    def test_angle_wrap_edges(self) -> None:
+        """
+        Yaw deltas at and beyond +-pi wrap the same way.
+        """
+        # Target is straight ahead along x, angle to target is 0
+        yaw = np.array([math.pi, -math.pi, 0.0, math.pi / 2, 3 * math.pi, -3 * math.pi])
+        x = np.zeros(len(yaw))
+        y = np.full(len(yaw), TARGET[1])
+        z = np.full(len(yaw), TARGET[2])
+
+        assert_batch_matches(x, y, z, yaw)
+
+    def test_decisions(self) -> None:
+        """
+        Altitude first, then yaw, then on target.
+        """
+        x = np.array([0.0, 0.0, 0.0])
+        y = np.array([TARGET[1], 0.0, TARGET[1]])
+        z = np.array([0.0, TARGET[2], TARGET[2]])
+        yaw = np.zeros(3)
+
+        actual, _, _ = decision.decide_batch(
+            TARGET, x, y, z, yaw, HEIGHT_TOLERANCE, ANGLE_TOLERANCE
+        )
+
+        assert actual.tolist() == [
+            decision.Decision.CHANGE_ALTITUDE,
+            decision.Decision.CHANGING_YAW,
+            decision.Decision.ON_TARGET,
+        ]
+
+
+class TestDecisionRecord:
+    """
+    Binary decision records.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Record survives packing and pickling, as it does through a queue.
+        """
+        record = decision.DecisionRecord(
+            decision.Decision.CHANGING_YAW, 7, True, -0.25, 63.43494882292201, 123456, 1.5e9
+        )
+
+        for actual in [
+            decision.DecisionRecord.from_bytes(record.to_bytes()),
+            pickle.loads(pickle.dumps(record)),
+        ]:
+            assert actual.kind is decision.Decision.CHANGING_YAW
+            assert [getattr(actual, name) for name in decision.DecisionRecord.__slots__] == [
+                getattr(record, name) for name in decision.DecisionRecord.__slots__
+            ]
+
+        assert len(record.to_bytes()) == decision.DecisionRecord.RECORD_SIZE
+
+    def test_str(self) -> None:
+        """
+        Logged as the status strings main has always logged.
+        """
+        expected = {
+            decision.Decision.CHANGE_ALTITUDE: "CHANGE_ALTITUDE: 1.0",
+            decision.Decision.CHANGING_YAW: "CHANGING_YAW: -45.0",
+            decision.Decision.ON_TARGET: "ON_TARGET",
+        }
+
+        for kind, text in expected.items():
+            record = decision.DecisionRecord(kind, 1, False, 1.0, -45.0, 0, 0.0)
+
+            assert str(record) == text
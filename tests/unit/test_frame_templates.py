@@ -0,0 +1,144 @@
+"""
+Test pre-packed MAVLink frames against pymavlink.
+"""
+
+import random
+
+import pytest
+from pymavlink.dialects.v10 import common as mavlink_v1
+from pymavlink.dialects.v20 import common as mavlink_v2
+from pymavlink.generator import mavcrc
+
+from utilities.mavlink import frame_templates
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SEND_COUNT = 600
+SYSTEM_ID = 1
+COMMAND_ID = 113  # MAV_CMD_CONDITION_CHANGE_ALT
+
+
+class RecordingFile:
+    """
+    Keeps every frame written by a mav.
+    """
+
+    def __init__(self) -> None:
+        self.frames = []
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Same interface as `mavfile.write()`.
+        """
+        self.frames.append(bytes(buffer))
+
+
+def make_mav(dialect: object) -> "object":
+    """
+    Ground station mav of the dialect, writing to a RecordingFile.
+    """
+    return dialect.MAVLink(RecordingFile(), srcSystem=255, srcComponent=0)
+
+
+class TestFrameCrc:
+    """
+    Checksum.
+    """
+
+    def test_matches_pymavlink(self) -> None:
+        """
+        Same checksum as pymavlink for any bytes.
+        """
+        rng = random.Random(0)
+        for _ in range(500):
+            frame = bytearray(rng.randbytes(rng.randint(2, 60)))
+            crc_extra = rng.randint(0, 255)
+
+            expected = mavcrc.x25crc(frame[1:])
+            expected.accumulate(bytes([crc_extra]))
+
+            assert frame_templates.frame_crc(frame, len(frame), crc_extra) == expected.crc
+
+
+class TestFrameTemplate:
+    """
+    Sending pre-packed frames.
+    """
+
+    @pytest.mark.parametrize("dialect", [mavlink_v1, mavlink_v2])
+    def test_same_frames(self, dialect: object) -> None:
+        """
+        Frames are exactly what pymavlink sends, mixed with pymavlink sends on the same mav.
+        """
+        expected_mav = make_mav(dialect)
+        actual_mav = make_mav(dialect)
+
+        result, command_long = frame_templates.FrameTemplate.create(
+            actual_mav,
+            actual_mav.command_long_encode(SYSTEM_ID, 0, COMMAND_ID, 0, 0, 0, 0, 0, 0, 0, 0),
+            frame_templates.COMMAND_LONG_PARAMS_FORMAT,
+        )
+        assert result
+        assert command_long is not None
+
+        result, heartbeat = frame_templates.FrameTemplate.create(
+            actual_mav, actual_mav.heartbeat_encode(6, 8, 0, 0, 0), ""
+        )
+        assert result
+        assert heartbeat is not None
+
+        rng = random.Random(0)
+        for i in range(SEND_COUNT):
+            # Zero params change the length of MAVLink 2 frames
+            params = [rng.choice([0.0, rng.uniform(-100.0, 100.0)]) for _ in range(7)]
+            if i % 3 == 0:
+                expected_mav.heartbeat_send(6, 8, 0, 0, 0)
+                heartbeat.send()
+            elif i % 3 == 1:
+                expected_mav.command_long_send(SYSTEM_ID, 0, COMMAND_ID, 0, *params)
+                command_long.send(*params)
+            else:
+                expected_mav.command_long_send(SYSTEM_ID, 0, COMMAND_ID, 0, *params)
+                actual_mav.command_long_send(SYSTEM_ID, 0, COMMAND_ID, 0, *params)
+
+        assert actual_mav.file.frames == expected_mav.file.frames
+        assert actual_mav.seq == expected_mav.seq
+        assert actual_mav.total_bytes_sent == expected_mav.total_bytes_sent
+
+    def test_decodes(self) -> None:
+        """
+        Receiver decodes the patched params.
+        """
+        mav = make_mav(mavlink_v2)
+        _, command_long = frame_templates.FrameTemplate.create(
+            mav,
+            mav.command_long_encode(SYSTEM_ID, 0, COMMAND_ID, 0, 0, 0, 0, 0, 0, 0, 0),
+            frame_templates.COMMAND_LONG_PARAMS_FORMAT,
+        )
+        assert command_long is not None
+
+        command_long.send(1.0, 0, 0, 0, 0, 0, 30.0)
+
+        receiver = mavlink_v2.MAVLink(None)
+        msg = receiver.decode(bytearray(mav.file.frames[0]))
+        assert msg.command == COMMAND_ID
+        assert msg.target_system == SYSTEM_ID
+        assert (msg.param1, msg.param7) == (1.0, 30.0)
+
+    def test_signed(self) -> None:
+        """
+        Signed links are not supported.
+        """
+        mav = make_mav(mavlink_v2)
+        mav.signing.sign_outgoing = True
+
+        result, template = frame_templates.FrameTemplate.create(
+            mav, mav.heartbeat_encode(6, 8, 0, 0, 0), ""
+        )
+
+        assert not result
+        assert template is None
@@ -0,0 +1,192 @@
+"""
+Test tracking each vehicle and component from its heartbeats.
+"""
+
+import pytest
+
+from modules.heartbeat import connection_state
+from modules.heartbeat import heartbeat_registry
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+CAPACITY = 4
+DISCONNECT_TIMEOUT = 5.0  # seconds
+START_TIME = 1000.0  # seconds since epoch
+
+# MAV_TYPE_QUADROTOR, MAV_AUTOPILOT_ARDUPILOTMEGA
+QUADROTOR = (2, 3)
+# MAV_TYPE_CAMERA, MAV_AUTOPILOT_INVALID
+CAMERA = (30, 8)
+
+
+@pytest.fixture()
+def registry() -> heartbeat_registry.HeartbeatRegistry:  # type: ignore
+    """
+    Empty registry.
+    """
+    result, instance = heartbeat_registry.HeartbeatRegistry.create(CAPACITY, DISCONNECT_TIMEOUT)
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+def heartbeat(
+    registry: heartbeat_registry.HeartbeatRegistry,
+    system_id: int,
+    component_id: int,
+    now: float,
+    kind: "tuple[int, int]" = QUADROTOR,
+    custom_mode: int = 0,
+) -> "heartbeat_registry.VehicleEvent | None":
+    """
+    Heartbeat that must be recorded, returns its event.
+    """
+    mav_type, autopilot = kind
+    result, event = registry.heartbeat(
+        system_id, component_id, mav_type, autopilot, 0, custom_mode, now
+    )
+    assert result
+
+    return event
+
+
+class TestCreate:
+    """
+    Usable parameters.
+    """
+
+    def test_capacity(self) -> None:
+        """
+        At least one component, at most every (system ID, component ID).
+        """
+        result, _ = heartbeat_registry.HeartbeatRegistry.create(0, DISCONNECT_TIMEOUT)
+        assert not result
+
+        result, _ = heartbeat_registry.HeartbeatRegistry.create(256 * 256 + 1, DISCONNECT_TIMEOUT)
+        assert not result
+
+    def test_timeout(self) -> None:
+        """
+        Timeout must be positive.
+        """
+        result, _ = heartbeat_registry.HeartbeatRegistry.create(CAPACITY, 0.0)
+        assert not result
+
+
+class TestHeartbeat:
+    """
+    Recording heartbeats.
+    """
+
+    def test_connect_once(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        First heartbeat connects, later ones only update the row.
+        """
+        event = heartbeat(registry, 1, 1, START_TIME)
+
+        assert event is not None
+        assert event.kind == connection_state.ConnectionEventKind.CONNECTED
+        assert (event.system_id, event.component_id) == (1, 1)
+        assert (event.mav_type, event.autopilot) == QUADROTOR
+
+        assert heartbeat(registry, 1, 1, START_TIME + 1, custom_mode=4) is None
+
+        row = registry.row(1, 1)
+        assert row == 0
+        assert registry.custom_modes[row] == 4
+        assert registry.last_heartbeat_times[row] == START_TIME + 1
+        assert len(registry) == 1
+
+    def test_components(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        Each (system ID, component ID) is its own row.
+        """
+        heartbeat(registry, 1, 1, START_TIME)
+        heartbeat(registry, 1, 100, START_TIME, CAMERA)
+        heartbeat(registry, 2, 1, START_TIME)
+
+        assert [registry.row(1, 1), registry.row(1, 100), registry.row(2, 1)] == [0, 1, 2]
+        assert registry.row(2, 100) is None
+        assert registry.mav_types[registry.row(1, 100)] == CAMERA[0]
+        assert registry.connected_count() == 3
+
+    def test_invalid(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        IDs are 1 byte.
+        """
+        result, event = registry.heartbeat(256, 1, *QUADROTOR, 0, 0, START_TIME)
+
+        assert not result
+        assert event is None
+        assert registry.row(256, 1) is None
+
+    def test_full(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        New components are not added once full, known ones still update.
+        """
+        for component_id in range(CAPACITY):
+            heartbeat(registry, 1, component_id, START_TIME)
+
+        result, _ = registry.heartbeat(1, CAPACITY, *QUADROTOR, 0, 0, START_TIME)
+        assert not result
+
+        assert heartbeat(registry, 1, 0, START_TIME + 1) is None
+        assert len(registry) == CAPACITY
+
+
+class TestCheck:
+    """
+    Disconnecting silent components.
+    """
+
+    def test_disconnect_and_reconnect(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        Only the silent component disconnects, once, and connects again on its next heartbeat.
+        """
+        heartbeat(registry, 1, 1, START_TIME)
+        heartbeat(registry, 1, 100, START_TIME, CAMERA)
+
+        for i in range(1, 8):
+            heartbeat(registry, 1, 1, START_TIME + i)
+            events = registry.check(START_TIME + i)
+
+            if i < DISCONNECT_TIMEOUT:
+                assert events == []
+            elif i == DISCONNECT_TIMEOUT:
+                (event,) = events
+                assert event.kind == connection_state.ConnectionEventKind.DISCONNECTED
+                assert (event.system_id, event.component_id) == (1, 100)
+                assert (event.mav_type, event.autopilot) == CAMERA
+                assert str(event).startswith("DISCONNECTED 1/100: type 30")
+            else:
+                assert events == []
+
+        assert registry.connected_count() == 1
+
+        event = heartbeat(registry, 1, 100, START_TIME + 8, CAMERA)
+        assert event is not None
+        assert event.kind == connection_state.ConnectionEventKind.CONNECTED
+        assert registry.connected_count() == 2
+
+    def test_all_lost(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        Every component silent at once gives an event each.
+        """
+        for component_id in range(CAPACITY):
+            heartbeat(registry, 3, component_id, START_TIME)
+
+        events = registry.check(START_TIME + DISCONNECT_TIMEOUT)
+
+        assert [event.component_id for event in events] == list(range(CAPACITY))
+        assert registry.connected_count() == 0
+
+    def test_empty(self, registry: heartbeat_registry.HeartbeatRegistry) -> None:
+        """
+        Nothing to disconnect.
+        """
+        assert registry.check(START_TIME) == []
@@ -0,0 +1,121 @@
+"""
+Test the shared memory latency histograms.
+"""
+
+import multiprocessing as mp
+
+import pytest
+
+from utilities.workers import latency_histogram
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+NAMES = ["decode", "total"]
+WRITER_RECORD_COUNT = 1000
+
+
+@pytest.fixture()
+def histograms() -> latency_histogram.LatencyHistograms:  # type: ignore
+    """
+    Histograms for NAMES.
+    """
+    result, new_histograms = latency_histogram.LatencyHistograms.create(NAMES)
+    assert result
+    assert new_histograms is not None
+
+    yield new_histograms  # type: ignore
+
+    new_histograms.close()
+    new_histograms.unlink()
+
+
+def record_milliseconds(histograms: latency_histogram.LatencyHistograms) -> None:
+    """
+    Record 1 to WRITER_RECORD_COUNT milliseconds.
+    """
+    for i in range(1, WRITER_RECORD_COUNT + 1):
+        histograms.record("total", i / 1000)
+
+
+class TestBuckets:
+    """
+    Log-linear bucket layout.
+    """
+
+    def test_contiguous(self) -> None:
+        """
+        Every value maps to a bucket containing it, with no gaps between buckets.
+        """
+        previous_index = 0
+        for value in range(1, 200_000):
+            index = latency_histogram.LatencyHistograms.bucket_index(value)
+
+            assert index in (previous_index, previous_index + 1)
+            assert latency_histogram.LatencyHistograms.bucket_highest_value(index) >= value
+            previous_index = index
+
+    def test_precision(self) -> None:
+        """
+        Large values are within a few percent of their bucket.
+        """
+        for value in [1_000, 123_456, 10_000_000, 3_000_000_000]:
+            index = latency_histogram.LatencyHistograms.bucket_index(value)
+            highest = latency_histogram.LatencyHistograms.bucket_highest_value(index)
+
+            assert value <= highest <= value * 1.04
+
+
+class TestHistograms:
+    """
+    Recording and reading.
+    """
+
+    def test_create_duplicate_names(self) -> None:
+        """
+        Names must be unique.
+        """
+        result, new_histograms = latency_histogram.LatencyHistograms.create(["a", "a"])
+
+        assert not result
+        assert new_histograms is None
+
+    def test_empty(self, histograms: latency_histogram.LatencyHistograms) -> None:
+        """
+        No percentiles without samples.
+        """
+        assert histograms.count("decode") == 0
+        assert histograms.percentile("decode", 50) is None
+        assert histograms.report()[0] == "decode: no samples"
+
+    def test_unknown_name(self, histograms: latency_histogram.LatencyHistograms) -> None:
+        """
+        Only the created histograms can be recorded to.
+        """
+        assert not histograms.record("unknown", 0.001)
+
+    def test_percentiles(self, histograms: latency_histogram.LatencyHistograms) -> None:
+        """
+        Percentiles are within bucket precision.
+        """
+        record_milliseconds(histograms)
+
+        assert histograms.count("total") == WRITER_RECORD_COUNT
+        assert histograms.count("decode") == 0
+        assert histograms.percentile("total", 50) == pytest.approx(0.5, rel=0.04)
+        assert histograms.percentile("total", 99) == pytest.approx(0.99, rel=0.04)
+        assert histograms.percentile("total", 100) == pytest.approx(1.0, rel=0.04)
+
+    def test_other_process(self, histograms: latency_histogram.LatencyHistograms) -> None:
+        """
+        Recorded in a worker, read in main.
+        """
+        writer = mp.Process(target=record_milliseconds, args=(histograms,))
+        writer.start()
+        writer.join()
+
+        assert histograms.count("total") == WRITER_RECORD_COUNT
+        assert histograms.report()[1].startswith(f"total: n {WRITER_RECORD_COUNT}, mean 500.500")
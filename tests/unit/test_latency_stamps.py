@@ -0,0 +1,63 @@
+"""
+Test pipeline stage stamps.
+"""
+
+import math
+
+from utilities.workers import latency_stamps
+
+
+class TestStamps:
+    """
+    Stamping and durations.
+    """
+
+    def test_durations(self) -> None:
+        """
+        Durations between consecutive reached stages and in total.
+        """
+        stamps = latency_stamps.LatencyStamps()
+        stamps.stamp(latency_stamps.Stage.RECEIVE, 10.0)
+        stamps.stamp(latency_stamps.Stage.DECODE, 10.5)
+        stamps.stamp(latency_stamps.Stage.ENQUEUE, 10.75)
+
+        actual = stamps.durations()
+
+        assert actual == [("decode", 0.5), ("enqueue", 0.25), ("total", 0.75)]
+
+    def test_skipped_stage(self) -> None:
+        """
+        Duration of a stage reached after a skipped one starts from the last reached one.
+        """
+        stamps = latency_stamps.LatencyStamps()
+        stamps.stamp(latency_stamps.Stage.RECEIVE, 1.0)
+        stamps.stamp(latency_stamps.Stage.DECISION, 3.0)
+
+        actual = stamps.durations()
+
+        assert stamps.get(latency_stamps.Stage.SEND) is None
+        assert actual == [("decision", 2.0), ("total", 2.0)]
+
+    def test_names(self) -> None:
+        """
+        Every duration has a histogram.
+        """
+        stamps = latency_stamps.LatencyStamps()
+        for stage in latency_stamps.Stage:
+            stamps.stamp(stage)
+
+        actual = [name for name, _ in stamps.durations()]
+
+        assert actual == latency_stamps.HISTOGRAM_NAMES
+
+    def test_bytes_round_trip(self) -> None:
+        """
+        Unset stages stay unset.
+        """
+        stamps = latency_stamps.LatencyStamps()
+        stamps.stamp(latency_stamps.Stage.RECEIVE, 1.5)
+
+        actual = latency_stamps.LatencyStamps.from_bytes(stamps.to_bytes())
+
+        assert math.isclose(actual.get(latency_stamps.Stage.RECEIVE), 1.5)
+        assert actual.get(latency_stamps.Stage.DECODE) is None
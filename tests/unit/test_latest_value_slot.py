@@ -0,0 +1,163 @@
+"""
+Test the shared memory latest value slot.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import latest_value_slot
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+RECORD_SIZE = 64
+WRITER_RECORD_COUNT = 20_000
+
+
+@pytest.fixture()
+def slot() -> latest_value_slot.LatestValueSlot:  # type: ignore
+    """
+    Slot for RECORD_SIZE byte records.
+    """
+    result, new_slot = latest_value_slot.LatestValueSlot.create(RECORD_SIZE)
+    assert result
+    assert new_slot is not None
+
+    yield new_slot  # type: ignore
+
+    new_slot.close()
+    new_slot.unlink()
+
+
+def write_uniform_records(slot: latest_value_slot.LatestValueSlot) -> None:
+    """
+    Publish records where every byte is the same, so a torn read would show mixed bytes.
+    """
+    for i in range(WRITER_RECORD_COUNT):
+        slot.publish(bytes([i % 256]) * RECORD_SIZE)
+
+
+class TestSlot:
+    """
+    Publishing and reading in one process.
+    """
+
+    def test_create_invalid_size(self) -> None:
+        """
+        Records must have a size.
+        """
+        result, new_slot = latest_value_slot.LatestValueSlot.create(0)
+
+        assert not result
+        assert new_slot is None
+
+    def test_read_empty(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Nothing published yet.
+        """
+        result, record, version = slot.read()
+
+        assert not result
+        assert record is None
+        assert version == 0
+
+    def test_publish_read(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Reads the latest record.
+        """
+        expected = bytes(range(RECORD_SIZE))
+
+        slot.publish(bytes(RECORD_SIZE))
+        assert slot.publish(expected)
+        result, actual, version = slot.read()
+
+        assert result
+        assert actual == expected
+        assert version == 2
+
+    def test_publish_wrong_size(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Record size is fixed.
+        """
+        assert not slot.publish(bytes(RECORD_SIZE + 1))
+
+    def test_overwritten_count(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Only records replaced before they were read are counted, once.
+        """
+        slot.publish(bytes(RECORD_SIZE))
+        slot.read()
+        slot.publish(bytes(RECORD_SIZE))
+        assert slot.take_overwritten_count() == 0
+
+        slot.publish(bytes(RECORD_SIZE))
+        slot.publish(bytes(RECORD_SIZE))
+        assert slot.take_overwritten_count() == 2
+        assert slot.take_overwritten_count() == 0
+
+        slot.read()
+        slot.publish(bytes(RECORD_SIZE))
+        assert slot.take_overwritten_count() == 0
+
+    def test_wait_newer_timeout(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Already read the latest version.
+        """
+        slot.publish(bytes(RECORD_SIZE))
+
+        result, record, version = slot.wait_newer(1, 0.01, 0.001)
+
+        assert not result
+        assert record is None
+        assert version == 1
+
+    def test_read_mid_publish(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Gives up without a record if the writer never finishes publishing.
+        """
+        slot.publish(bytes(RECORD_SIZE))
+        # Odd sequence number as if the writer stopped partway through the next publish
+        slot._LatestValueSlot__SEQUENCE_FORMAT.pack_into(
+            slot._LatestValueSlot__shared_memory.buf, 0, 3
+        )
+
+        start = time.monotonic()
+        result, record, version = slot.read()
+
+        assert not result
+        assert record is None
+        assert version == 0
+        assert time.monotonic() - start < 0.1
+
+
+class TestProcesses:
+    """
+    Publishing and reading in different processes.
+    """
+
+    def test_no_torn_reads(self, slot: latest_value_slot.LatestValueSlot) -> None:
+        """
+        Every record read is one that was published whole.
+        """
+        writer = mp.Process(target=write_uniform_records, args=(slot,))
+        writer.start()
+
+        last_version = 0
+        while writer.is_alive():
+            result, record, version = slot.read()
+            if not result:
+                continue
+
+            assert record == bytes([record[0]]) * RECORD_SIZE
+            assert version >= last_version
+            last_version = version
+
+        writer.join()
+
+        _, _, version = slot.read()
+        assert version == WRITER_RECORD_COUNT
@@ -0,0 +1,161 @@
+"""
+Test link quality from sequence numbers and arrival times.
+"""
+
+import pytest
+
+from modules.router import link_quality
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+MESSAGE_WINDOW_SIZE = 100
+HEARTBEAT_WINDOW_SIZE = 5
+MESSAGE_PERIOD = 0.01  # seconds
+MESSAGE_SIZE = 40  # bytes
+
+
+@pytest.fixture()
+def monitor() -> link_quality.LinkQualityMonitor:  # type: ignore
+    """
+    Monitor with no sources.
+    """
+    result, instance = link_quality.LinkQualityMonitor.create(
+        MESSAGE_WINDOW_SIZE, HEARTBEAT_WINDOW_SIZE
+    )
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+def send(monitor: link_quality.LinkQualityMonitor, seqs: "list[int]", start: float = 0.0) -> float:
+    """
+    One message from 1/0 every MESSAGE_PERIOD with the given sequence numbers,
+    returns the time of the last one.
+    """
+    now = start
+    for i, seq in enumerate(seqs):
+        now = start + i * MESSAGE_PERIOD
+        monitor.add(1, 0, seq, MESSAGE_SIZE, False, now)
+
+    return now
+
+
+def test_create() -> None:
+    """
+    Windows must hold enough to measure.
+    """
+    result, _ = link_quality.LinkQualityMonitor.create(1, HEARTBEAT_WINDOW_SIZE)
+    assert not result
+
+    result, _ = link_quality.LinkQualityMonitor.create(MESSAGE_WINDOW_SIZE, 2)
+    assert not result
+
+
+class TestSnapshots:
+    """
+    Link quality of each source.
+    """
+
+    def test_rates(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        Clean link at 100 Hz.
+        """
+        now = send(monitor, [i % 256 for i in range(MESSAGE_WINDOW_SIZE)])
+
+        (snapshot,) = monitor.snapshots(now + MESSAGE_PERIOD)
+
+        assert (snapshot.system_id, snapshot.component_id) == (1, 0)
+        assert snapshot.message_rate == pytest.approx(1 / MESSAGE_PERIOD)
+        assert snapshot.byte_rate == pytest.approx(MESSAGE_SIZE / MESSAGE_PERIOD)
+        assert snapshot.loss == 0.0
+        assert snapshot.heartbeat_jitter is None
+
+    def test_loss_across_wrap(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        Gaps count as lost messages, including when the sequence number wraps.
+        """
+        now = send(monitor, [250, 251, 253, 254, 1, 2])
+
+        (snapshot,) = monitor.snapshots(now)
+
+        # 252, 255 and 0 lost out of 9
+        assert snapshot.loss == pytest.approx(3 / 9)
+
+    def test_reordered(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        A message arriving late is not counted as most of a wrap lost.
+        """
+        now = send(monitor, [10, 12, 11])
+
+        (snapshot,) = monitor.snapshots(now)
+
+        # Only 11, missing when 12 arrived
+        assert snapshot.loss == pytest.approx(1 / 4)
+
+    def test_window(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        Loss and rates only cover the latest messages.
+        """
+        now = send(monitor, [0, 5])
+        now = send(monitor, [(6 + i) % 256 for i in range(MESSAGE_WINDOW_SIZE)], now + 1)
+
+        (snapshot,) = monitor.snapshots(now)
+
+        assert snapshot.loss == 0.0
+        assert snapshot.byte_rate == pytest.approx(
+            MESSAGE_WINDOW_SIZE * MESSAGE_SIZE / ((MESSAGE_WINDOW_SIZE - 1) * MESSAGE_PERIOD)
+        )
+
+    def test_silence(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        Rates fall while a source sends nothing.
+        """
+        now = send(monitor, [i % 256 for i in range(MESSAGE_WINDOW_SIZE)])
+
+        (snapshot,) = monitor.snapshots(now + 9)
+
+        assert snapshot.silence == pytest.approx(9)
+        assert snapshot.message_rate == pytest.approx(MESSAGE_WINDOW_SIZE / (now + 9))
+
+    def test_heartbeat_jitter(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        Spread of the time between heartbeats.
+        """
+        for i, arrival in enumerate([0.0, 1.0, 2.0, 3.0]):
+            monitor.add(1, 0, i, MESSAGE_SIZE, True, arrival)
+
+        (snapshot,) = monitor.snapshots(3.0)
+        assert snapshot.heartbeat_jitter == pytest.approx(0.0)
+
+        monitor.add(1, 0, 4, MESSAGE_SIZE, True, 4.5)
+        monitor.add(1, 0, 5, MESSAGE_SIZE, True, 5.0)
+
+        # Intervals in the window of 5: 1.0, 1.0, 1.5, 0.5
+        (snapshot,) = monitor.snapshots(5.0)
+        assert snapshot.heartbeat_jitter == pytest.approx((1 / 6) ** 0.5)
+
+    def test_sources(self, monitor: link_quality.LinkQualityMonitor) -> None:
+        """
+        Each (system ID, component ID) has its own sequence numbers.
+        """
+        monitor.add(1, 0, 0, MESSAGE_SIZE, False, 0.0)
+        monitor.add(1, 100, 7, MESSAGE_SIZE, False, 0.0)
+        monitor.add(2, 0, 50, MESSAGE_SIZE, False, 0.0)
+        monitor.add(1, 0, 1, MESSAGE_SIZE, False, 1.0)
+        monitor.add(1, 100, 8, MESSAGE_SIZE, False, 1.0)
+        monitor.add(2, 0, 51, MESSAGE_SIZE, False, 1.0)
+
+        snapshots = monitor.snapshots(1.0)
+
+        assert [(snapshot.system_id, snapshot.component_id) for snapshot in snapshots] == [
+            (1, 0),
+            (1, 100),
+            (2, 0),
+        ]
+        assert all(snapshot.loss == 0.0 for snapshot in snapshots)
+        assert str(snapshots[0]).startswith("1/0: 2.0 msg/s")
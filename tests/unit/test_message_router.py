@@ -0,0 +1,200 @@
+"""
+Test routing messages to subscribed queues, and reading them back through a routed connection.
+"""
+
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common
+
+from modules.router import message_router
+from modules.router import routed_connection
+from utilities.workers import queue_proxy_wrapper
+from . import conftest
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 4
+TIMEOUT = 0.1  # seconds
+
+
+def make_messages(types: "list[str]") -> "list[object]":
+    """
+    Packed messages of the given types from system 1, with increasing sequence numbers.
+    """
+    mav = common.MAVLink(None, srcSystem=1, srcComponent=0)
+    messages = []
+    for i, message_type in enumerate(types):
+        if message_type == "HEARTBEAT":
+            msg = mav.heartbeat_encode(
+                mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                0,
+                0,
+                0,
+            )
+        elif message_type == "ATTITUDE":
+            msg = mav.attitude_encode(i, 0.0, 0.0, float(i), 0.0, 0.0, 0.0)
+        else:
+            msg = mav.local_position_ned_encode(i, float(i), 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        msg.pack(mav)
+        messages.append(msg)
+
+    return messages
+
+
+def frame(msg: "object | None") -> "bytes | None":
+    """
+    Packed bytes of the message, which survive the copy through a queue.
+    """
+    return None if msg is None else bytes(msg.get_msgbuf())
+
+
+def receive(
+    connection: routed_connection.RoutedConnection, message_types: "str | list[str] | None" = None
+) -> "bytes | None":
+    """
+    Packed bytes of the next message of the types, None if none came.
+    """
+    return frame(connection.recv_match(type=message_types, blocking=True, timeout=TIMEOUT))
+
+
+def make_queue(maxsize: int = QUEUE_MAX_SIZE) -> queue_proxy_wrapper.QueueProxyWrapper:
+    """
+    Queue that needs no manager.
+    """
+    return queue_proxy_wrapper.QueueProxyWrapper(
+        None, maxsize, queue_proxy_wrapper.QueueBackend.QUEUE
+    )
+
+
+def make_router(messages: "list[object]") -> message_router.MessageRouter:
+    """
+    Router reading the messages.
+    """
+    result, router = message_router.MessageRouter.create(
+        conftest.FakeConnection(messages), conftest.FakeLogger()
+    )
+    assert result
+    assert router is not None
+
+    return router
+
+
+class TestMessageRouter:
+    """
+    Subscribing and routing.
+    """
+
+    def test_subscribe_empty(self) -> None:
+        """
+        Subscribing needs message types.
+        """
+        router = make_router([])
+
+        assert not router.subscribe([], make_queue())
+
+    def test_route_by_type(self) -> None:
+        """
+        Each message goes to every queue subscribed to its type, and only those.
+        """
+        router = make_router(make_messages(["HEARTBEAT", "ATTITUDE", "LOCAL_POSITION_NED"]))
+        heartbeat_queue = make_queue()
+        telemetry_queue = make_queue()
+        all_queue = make_queue()
+        assert router.subscribe(["HEARTBEAT"], heartbeat_queue)
+        assert router.subscribe(["ATTITUDE", "LOCAL_POSITION_NED"], telemetry_queue)
+        assert router.subscribe(["HEARTBEAT", "ATTITUDE", "LOCAL_POSITION_NED"], all_queue)
+
+        routed = [router.run() for _ in range(4)]
+
+        assert routed == [
+            (True, "HEARTBEAT"),
+            (True, "ATTITUDE"),
+            (True, "LOCAL_POSITION_NED"),
+            (True, None),
+        ]
+        assert heartbeat_queue.queue.qsize() == 1
+        assert telemetry_queue.queue.qsize() == 2
+        assert all_queue.queue.qsize() == 3
+
+    def test_dropped(self) -> None:
+        """
+        A full queue drops the message instead of blocking the other subscribers.
+        """
+        router = make_router(make_messages(["ATTITUDE"] * (QUEUE_MAX_SIZE + 2)))
+        full_queue = make_queue()
+        unbounded_queue = make_queue(0)
+        router.subscribe(["ATTITUDE"], full_queue)
+        router.subscribe(["ATTITUDE"], unbounded_queue)
+
+        for _ in range(QUEUE_MAX_SIZE + 2):
+            router.run()
+
+        rates, dropped = router.get_message_rates()
+        assert rates["ATTITUDE"] > 0.0
+        assert dropped == {"ATTITUDE": 2}
+        assert unbounded_queue.queue.qsize() == QUEUE_MAX_SIZE + 2
+
+        # Counts start again after each call
+        assert router.get_message_rates() == ({}, {})
+
+
+class TestRoutedConnection:
+    """
+    Reading the routed messages.
+    """
+
+    def test_recv_order(self) -> None:
+        """
+        Messages of each type come out in the order they were routed, including those kept
+        pending while another type was asked for.
+        """
+        messages = make_messages(["ATTITUDE", "LOCAL_POSITION_NED", "ATTITUDE", "ATTITUDE"])
+        input_queue = make_queue(0)
+        for msg in messages:
+            input_queue.queue.put(msg)
+
+        connection = routed_connection.RoutedConnection(conftest.FakeConnection([]), input_queue)
+
+        assert receive(connection, "LOCAL_POSITION_NED") == frame(messages[1])
+        assert receive(connection, "ATTITUDE") == frame(messages[0])
+        assert receive(connection) == frame(messages[2])
+        assert receive(connection, ["ATTITUDE"]) == frame(messages[3])
+        assert receive(connection) is None
+        assert len(connection.get_dropped()) == 0
+
+    def test_sentinel_skipped(self) -> None:
+        """
+        Sentinels from filling and draining the queue are not messages.
+        """
+        msg = make_messages(["HEARTBEAT"])[0]
+        input_queue = make_queue()
+        input_queue.queue.put(None)
+        input_queue.queue.put(msg)
+
+        connection = routed_connection.RoutedConnection(conftest.FakeConnection([]), input_queue)
+
+        assert receive(connection, "HEARTBEAT") == frame(msg)
+
+    def test_pending_dropped(self) -> None:
+        """
+        Only the newest pending messages are kept, the rest are counted as dropped.
+        """
+        pending_max_size = routed_connection.RoutedConnection._RoutedConnection__PENDING_MAX_SIZE
+        messages = make_messages(["ATTITUDE"] * (pending_max_size + 3) + ["HEARTBEAT"])
+        input_queue = make_queue(0)
+        for msg in messages:
+            input_queue.queue.put(msg)
+
+        connection = routed_connection.RoutedConnection(conftest.FakeConnection([]), input_queue)
+
+        assert receive(connection, "HEARTBEAT") == frame(messages[-1])
+        assert connection.get_dropped() == {"ATTITUDE": 3}
+        assert len(connection.get_dropped()) == 0
+
+        # Oldest kept is the first not dropped
+        assert frame(connection.recv_match(type="ATTITUDE", blocking=False)) == frame(messages[3])
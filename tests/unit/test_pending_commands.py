@@ -0,0 +1,211 @@
+"""
+Test tracking commands until they are acknowledged.
+"""
+
+import pytest
+
+from modules.command import pending_commands
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+ACK_TIMEOUT = 1.0  # s
+RESULT_TIMEOUT = 10.0  # s
+MAX_RETRIES = 2
+LATENCY_WINDOW_SIZE = 4
+SYSTEM_ID = 1
+COMMAND_ID = 113  # MAV_CMD_CONDITION_CHANGE_ALT
+OTHER_COMMAND_ID = 115  # MAV_CMD_CONDITION_YAW
+PARAMS = (1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 30.0)
+RESULT_ACCEPTED = 0
+RESULT_DENIED = 2
+RESULT_IN_PROGRESS = 5
+
+
+@pytest.fixture()
+def pending() -> pending_commands.PendingCommands:  # type: ignore
+    """
+    Empty table.
+    """
+    result, table = pending_commands.PendingCommands.create(
+        ACK_TIMEOUT, RESULT_TIMEOUT, MAX_RETRIES, LATENCY_WINDOW_SIZE
+    )
+    assert result
+    assert table is not None
+
+    yield table  # type: ignore
+
+
+class TestCreate:
+    """
+    Valid parameters.
+    """
+
+    @pytest.mark.parametrize(
+        "ack_timeout,result_timeout,max_retries,latency_window_size",
+        [(0.0, 1.0, 1, 1), (1.0, 0.0, 1, 1), (1.0, 1.0, -1, 1), (1.0, 1.0, 1, 0)],
+    )
+    def test_invalid(
+        self, ack_timeout: float, result_timeout: float, max_retries: int, latency_window_size: int
+    ) -> None:
+        """
+        Timeouts and window must be positive, retries not negative.
+        """
+        result, table = pending_commands.PendingCommands.create(
+            ack_timeout, result_timeout, max_retries, latency_window_size
+        )
+
+        assert not result
+        assert table is None
+
+
+class TestAcknowledge:
+    """
+    Matching acknowledgements.
+    """
+
+    def test_accepted(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Acknowledged command is no longer in flight.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 10.0)
+
+        latency = pending.acknowledge(SYSTEM_ID, COMMAND_ID, RESULT_ACCEPTED, 10.25)
+
+        assert latency == pytest.approx(0.25)
+        assert len(pending) == 0
+        assert pending.accepted_count == 1
+        assert pending.due_retries(100.0) == []
+
+    def test_rejected(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Rejected command is final, not retried.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 10.0)
+
+        pending.acknowledge(SYSTEM_ID, COMMAND_ID, RESULT_DENIED, 10.1)
+
+        assert len(pending) == 0
+        assert pending.rejected_count == 1
+
+    def test_unmatched(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Acknowledgements of other vehicles or commands match nothing.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 10.0)
+
+        assert pending.acknowledge(SYSTEM_ID + 1, COMMAND_ID, RESULT_ACCEPTED, 10.1) is None
+        assert pending.acknowledge(SYSTEM_ID, OTHER_COMMAND_ID, RESULT_ACCEPTED, 10.1) is None
+        assert len(pending) == 1
+
+    def test_in_progress(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Command in progress is not retried, and only its first acknowledgement is timed.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 10.0)
+
+        pending.acknowledge(SYSTEM_ID, COMMAND_ID, RESULT_IN_PROGRESS, 10.1)
+        assert pending.due_retries(20.0) == []
+
+        pending.acknowledge(SYSTEM_ID, COMMAND_ID, RESULT_ACCEPTED, 10.1 + RESULT_TIMEOUT / 2)
+        assert len(pending) == 0
+        assert pending.latency_percentile(100) == pytest.approx(0.1)
+
+    def test_in_progress_expires(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Command in progress is given up on when its final result does not come in time.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 10.0)
+        pending.acknowledge(SYSTEM_ID, COMMAND_ID, RESULT_IN_PROGRESS, 10.1)
+
+        assert pending.due_retries(10.0 + RESULT_TIMEOUT) == []
+        assert pending.is_pending(SYSTEM_ID, COMMAND_ID)
+
+        assert pending.due_retries(10.1 + RESULT_TIMEOUT) == []
+        assert not pending.is_pending(SYSTEM_ID, COMMAND_ID)
+        assert pending.expired_count == 1
+
+
+class TestRetries:
+    """
+    Sending unacknowledged commands again.
+    """
+
+    def test_retry_then_expire(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Each retry counts up the confirmation, until out of retries.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 0.0)
+
+        assert pending.due_retries(ACK_TIMEOUT / 2) == []
+
+        confirmations = []
+        for i in range(1, MAX_RETRIES + 2):
+            retries = pending.due_retries(i * ACK_TIMEOUT)
+            confirmations.extend(retry.confirmation for _, _, retry in retries)
+
+        assert confirmations == [1, 2]
+        assert len(pending) == 0
+        assert pending.retried_count == MAX_RETRIES
+        assert pending.expired_count == 1
+
+    def test_retry_params(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Retry is the same command to the same vehicle.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 0.0)
+
+        [(system_id, command_id, retry)] = pending.due_retries(ACK_TIMEOUT)
+
+        assert (system_id, command_id, retry.params) == (SYSTEM_ID, COMMAND_ID, PARAMS)
+
+    def test_not_retryable(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Command that is not retryable is dropped at the timeout instead of sent again.
+        """
+        pending.add(SYSTEM_ID, OTHER_COMMAND_ID, PARAMS, 0.0, False)
+
+        assert pending.due_retries(ACK_TIMEOUT) == []
+        assert len(pending) == 0
+        assert pending.retried_count == 0
+        assert pending.expired_count == 1
+
+    def test_discard(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Discarded commands are not retried.
+        """
+        pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 0.0)
+        pending.add(SYSTEM_ID, OTHER_COMMAND_ID, PARAMS, 0.0)
+        pending.add(SYSTEM_ID + 1, COMMAND_ID, PARAMS, 0.0)
+
+        pending.discard(SYSTEM_ID)
+
+        assert [system_id for system_id, _, _ in pending.due_retries(ACK_TIMEOUT)] == [
+            SYSTEM_ID + 1
+        ]
+
+
+class TestLatency:
+    """
+    Acknowledgement latency percentiles.
+    """
+
+    def test_empty(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        No latency before anything is acknowledged.
+        """
+        assert pending.latency_percentile(50) is None
+
+    def test_window(self, pending: pending_commands.PendingCommands) -> None:
+        """
+        Only the latest latencies count.
+        """
+        for latency in [9.0, 9.0, 0.1, 0.2, 0.3, 0.4]:
+            pending.add(SYSTEM_ID, COMMAND_ID, PARAMS, 0.0)
+            pending.acknowledge(SYSTEM_ID, COMMAND_ID, RESULT_ACCEPTED, latency)
+
+        assert pending.latency_percentile(0) == pytest.approx(0.1)
+        assert pending.latency_percentile(100) == pytest.approx(0.4)
@@ -0,0 +1,287 @@
+"""
+Test running tasks on exact periods.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utilities.workers import periodic_scheduler
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+PERIOD = 0.05  # seconds
+RUN_COUNT = 10
+# Allowed difference from the exact deadline, generous for a loaded machine
+TOLERANCE = 0.02  # seconds
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+@pytest.fixture()
+def scheduler(
+    controller: worker_controller.WorkerController,
+) -> periodic_scheduler.PeriodicScheduler:  # type: ignore
+    """
+    Scheduler with no tasks.
+    """
+    result, instance = periodic_scheduler.PeriodicScheduler.create(controller)
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+def exit_after(
+    controller: worker_controller.WorkerController, times: "list[float]", count: int
+) -> None:
+    """
+    Requests an exit from the task once it has run count times.
+    """
+    if len(times) == count:
+        controller.request_exit()
+
+
+class TestAdd:
+    """
+    Registering tasks.
+    """
+
+    def test_period(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Periods must be positive.
+        """
+        assert not scheduler.add("task", 0.0, lambda: None)
+        assert not scheduler.add("task", -PERIOD, lambda: None)
+        assert not scheduler.add("task", PERIOD, lambda: None, -PERIOD)
+
+    def test_duplicate(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Names identify tasks.
+        """
+        assert scheduler.add("task", PERIOD, lambda: None)
+        assert not scheduler.add("task", PERIOD, lambda: None)
+
+
+class TestRun:
+    """
+    Running the tasks.
+    """
+
+    def test_exact_periods(
+        self,
+        controller: worker_controller.WorkerController,
+        scheduler: periodic_scheduler.PeriodicScheduler,
+    ) -> None:
+        """
+        Time spent in the task does not delay the next run.
+        """
+        times = []
+
+        def task() -> None:
+            times.append(time.monotonic())
+            time.sleep(PERIOD / 2)
+            exit_after(controller, times, RUN_COUNT)
+
+        assert scheduler.add("task", PERIOD, task)
+        scheduler.run()
+
+        assert len(times) == RUN_COUNT
+        for i, run_time in enumerate(times):
+            assert run_time - times[0] == pytest.approx(i * PERIOD, abs=TOLERANCE)
+
+        lateness = scheduler.lateness("task")
+        assert lateness is not None
+        mean, _, maximum = lateness
+        assert 0.0 <= mean <= maximum < TOLERANCE
+        assert scheduler.report()[0].startswith(f"task: runs {RUN_COUNT},")
+
+    def test_missed_deadlines(
+        self,
+        controller: worker_controller.WorkerController,
+        scheduler: periodic_scheduler.PeriodicScheduler,
+    ) -> None:
+        """
+        A slow run skips the deadlines it overran instead of bursting to catch up.
+        """
+        times = []
+
+        def task() -> None:
+            times.append(time.monotonic())
+            if len(times) == 1:
+                time.sleep(PERIOD * 2.5)
+
+            exit_after(controller, times, 2)
+
+        assert scheduler.add("task", PERIOD, task)
+        scheduler.run()
+
+        # Back on the grid at the first deadline after the slow run
+        assert times[1] - times[0] == pytest.approx(3 * PERIOD, abs=TOLERANCE)
+
+    def test_order(
+        self,
+        controller: worker_controller.WorkerController,
+        scheduler: periodic_scheduler.PeriodicScheduler,
+    ) -> None:
+        """
+        Each task runs at its own period.
+        """
+        fast = []
+        slow = []
+
+        def slow_task() -> None:
+            slow.append(time.monotonic())
+            exit_after(controller, slow, 2)
+
+        assert scheduler.add("fast", PERIOD, lambda: fast.append(time.monotonic()))
+        assert scheduler.add("slow", PERIOD * 4, slow_task)
+        scheduler.run()
+
+        # Both run first, then the fast one runs 3 times before the slow one is due again
+        assert len(fast) == 5
+        assert slow[1] - slow[0] == pytest.approx(4 * PERIOD, abs=TOLERANCE)
+
+    def test_exit_wakes(
+        self,
+        controller: worker_controller.WorkerController,
+        scheduler: periodic_scheduler.PeriodicScheduler,
+    ) -> None:
+        """
+        An exit request ends a long wait for the next deadline.
+        """
+        assert scheduler.add("task", 60, lambda: None)
+
+        requester = threading.Timer(PERIOD, controller.request_exit)
+        start = time.monotonic()
+        requester.start()
+        scheduler.run()
+        requester.join()
+
+        # request_exit() itself waits before setting the request
+        assert time.monotonic() - start < 1
+
+    def test_report(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Only tasks that have run are reported.
+        """
+        assert scheduler.add("task", PERIOD, lambda: None)
+
+        assert scheduler.report() == []
+        assert scheduler.lateness("task") is None
+        assert scheduler.lateness("unknown") is None
+
+
+class TestRunDue:
+    """
+    Running the due tasks from a worker's own loop.
+    """
+
+    def test_start_delay(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Nothing is due before the start delay, then each due task runs once per call.
+        """
+        runs = []
+        assert scheduler.add("first", PERIOD, lambda: runs.append("first"), PERIOD)
+        assert scheduler.add("second", PERIOD, lambda: runs.append("second"), PERIOD)
+
+        delay = scheduler.run_due()
+        assert len(runs) == 0
+        assert 0.0 < delay <= PERIOD
+
+        time.sleep(PERIOD * 1.5)
+        delay = scheduler.run_due()
+
+        assert runs == ["first", "second"]
+        assert 0.0 < delay <= PERIOD / 2
+
+    def test_empty(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        No tasks, nothing due.
+        """
+        assert scheduler.run_due() > 0.0
+
+
+class TestRunAsync:
+    """
+    Running the tasks on an event loop.
+    """
+
+    def test_exact_periods(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Runs on the grid alongside other tasks on the loop, until stopped.
+        """
+        times = []
+        other_task_runs = []
+
+        async def run() -> None:
+            stop = asyncio.Event()
+            resumed = asyncio.Event()
+            resumed.set()
+
+            def task() -> None:
+                times.append(time.monotonic())
+                if len(times) == RUN_COUNT:
+                    stop.set()
+
+            async def other_task() -> None:
+                while not stop.is_set():
+                    other_task_runs.append(time.monotonic())
+                    await asyncio.sleep(PERIOD / 4)
+
+            assert scheduler.add("task", PERIOD, task)
+            await asyncio.gather(scheduler.run_async(stop, resumed), other_task())
+
+        asyncio.run(run())
+
+        assert len(times) == RUN_COUNT
+        for i, run_time in enumerate(times):
+            assert run_time - times[0] == pytest.approx(i * PERIOD, abs=TOLERANCE)
+
+        # The scheduler waits without blocking the loop
+        assert len(other_task_runs) > RUN_COUNT
+
+    def test_paused(self, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        Nothing runs while resumed is clear, then the missed deadlines are skipped.
+        """
+        start = []
+        times = []
+
+        async def run() -> None:
+            stop = asyncio.Event()
+            resumed = asyncio.Event()
+
+            def task() -> None:
+                times.append(time.monotonic())
+                if len(times) == 2:
+                    stop.set()
+
+            assert scheduler.add("task", PERIOD, task)
+            start.append(time.monotonic())
+            runner = asyncio.create_task(scheduler.run_async(stop, resumed))
+
+            await asyncio.sleep(PERIOD * 3.5)
+            assert len(times) == 0
+
+            resumed.set()
+            await runner
+
+        asyncio.run(run())
+
+        # Back on the grid at the first deadline after resuming
+        assert times[1] - start[0] == pytest.approx(4 * PERIOD, abs=TOLERANCE)
+        assert scheduler._PeriodicScheduler__tasks["task"].missed_count == 3
@@ -0,0 +1,207 @@
+"""
+Test phi accrual suspicion from heartbeat arrival times.
+"""
+
+import pytest
+
+from modules.heartbeat import connection_state
+from modules.heartbeat import phi_accrual
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+WINDOW_SIZE = 10
+PERIOD = 1.0  # seconds
+MIN_STANDARD_DEVIATION = 0.1  # seconds
+ACCEPTABLE_PAUSE = 1.0  # seconds
+PHI_THRESHOLD = 5
+POLL_PERIOD = 0.1  # seconds
+
+
+@pytest.fixture()
+def detector() -> phi_accrual.PhiAccrualDetector:  # type: ignore
+    """
+    Detector that has seen WINDOW_SIZE heartbeats exactly PERIOD apart, the last at 0.
+    """
+    result, instance = phi_accrual.PhiAccrualDetector.create(
+        WINDOW_SIZE, PERIOD, MIN_STANDARD_DEVIATION, ACCEPTABLE_PAUSE
+    )
+    assert result
+    assert instance is not None
+
+    instance.start(-WINDOW_SIZE * PERIOD)
+    for i in range(WINDOW_SIZE - 1, -1, -1):
+        instance.heartbeat(-i * PERIOD)
+
+    yield instance  # type: ignore
+
+
+def test_create() -> None:
+    """
+    Parameters must be usable.
+    """
+    for args in [
+        (1, PERIOD, MIN_STANDARD_DEVIATION, ACCEPTABLE_PAUSE),
+        (WINDOW_SIZE, 0.0, MIN_STANDARD_DEVIATION, ACCEPTABLE_PAUSE),
+        (WINDOW_SIZE, PERIOD, 0.0, ACCEPTABLE_PAUSE),
+        (WINDOW_SIZE, PERIOD, MIN_STANDARD_DEVIATION, -1.0),
+    ]:
+        result, _ = phi_accrual.PhiAccrualDetector.create(*args)
+        assert not result
+
+
+class TestPhi:
+    """
+    Suspicion over time since the last heartbeat.
+    """
+
+    def test_before_heartbeats(self) -> None:
+        """
+        Nothing to suspect yet.
+        """
+        result, detector = phi_accrual.PhiAccrualDetector.create(
+            WINDOW_SIZE, PERIOD, MIN_STANDARD_DEVIATION, ACCEPTABLE_PAUSE
+        )
+        assert result
+        assert detector is not None
+
+        assert detector.phi(100.0) == 0.0
+        assert detector.missed_heartbeats(100.0) == 0
+
+    def test_steady(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        Learned the intervals, and suspicion only grows.
+        """
+        assert detector.mean() == pytest.approx(PERIOD)
+        assert detector.standard_deviation() == MIN_STANDARD_DEVIATION
+        assert detector.loss() == 0.0
+
+        # Half way through the acceptable pause a P(later) of 1/2 is phi log10(2)
+        assert detector.phi(PERIOD + ACCEPTABLE_PAUSE) == pytest.approx(0.30103, abs=1e-4)
+
+        times = [i * POLL_PERIOD for i in range(100)]
+        phis = [detector.phi(now) for now in times]
+        assert phis == sorted(phis)
+        assert phis[-1] > 100
+
+    def test_tolerates_one_missed(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        A single missing heartbeat on a steady link is well under the threshold.
+        """
+        assert detector.phi(2 * PERIOD) < 1.0
+        assert detector.phi(3 * PERIOD) > PHI_THRESHOLD
+
+    def test_jittery(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        More spread intervals make the same delay less suspicious.
+        """
+        steady_phi = detector.phi(2.4 * PERIOD)
+
+        now = 0.0
+        for interval in [0.6, 1.4] * WINDOW_SIZE:
+            now += interval
+            detector.heartbeat(now)
+
+        assert detector.standard_deviation() == pytest.approx(0.4)
+        assert detector.phi(now + 2.4 * PERIOD) < steady_phi
+
+    def test_lossy(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        Lost heartbeats make waiting several periods less suspicious.
+        """
+        steady_phi = detector.phi(4.0 * PERIOD)
+
+        # Every other heartbeat lost
+        now = 0.0
+        for _ in range(WINDOW_SIZE):
+            now += 2 * PERIOD
+            detector.heartbeat(now)
+
+        assert detector.loss() == pytest.approx(0.5)
+        assert detector.missed_heartbeats(now + 4.0 * PERIOD) == 4
+        # No worse than 4 lost in a row at 50% loss
+        assert detector.phi(now + 4.0 * PERIOD) == pytest.approx(4 * 0.30103, abs=1e-4)
+        assert detector.phi(now + 4.0 * PERIOD) < steady_phi
+
+    def test_window(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        Only the latest intervals are learned from.
+        """
+        now = 0.0
+        for _ in range(WINDOW_SIZE):
+            now += 2 * PERIOD
+            detector.heartbeat(now)
+
+        for _ in range(WINDOW_SIZE):
+            now += PERIOD
+            detector.heartbeat(now)
+
+        assert detector.mean() == pytest.approx(PERIOD)
+        assert detector.loss() == 0.0
+
+
+class TestTracker:
+    """
+    Connection state decided by the detector.
+    """
+
+    def test_disconnect_and_reconnect(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        The heartbeat receiver drone polled every POLL_PERIOD:
+        disconnects sooner than 5 missed heartbeats, and the outage is not learned.
+        """
+        result, tracker = connection_state.ConnectionStateTracker.create(
+            5, None, detector, PHI_THRESHOLD
+        )
+        assert result
+        assert tracker is not None
+
+        heartbeats = [float(i) for i in range(5)] + [13.0 + i for i in range(5)] + [19.0]
+        events = []
+        now = 0.0
+        while now < 20.0:
+            is_received = len(heartbeats) > 0 and heartbeats[0] <= now + 1e-9
+            if is_received:
+                heartbeats.pop(0)
+
+            event = tracker.update(is_received, now)
+            if event is not None:
+                events.append((round(now, 1), event.kind, event.missed_heartbeats))
+
+            now += POLL_PERIOD
+
+        assert events == [
+            (0.0, connection_state.ConnectionEventKind.CONNECTED, 0),
+            (6.5, connection_state.ConnectionEventKind.DISCONNECTED, 2),
+            (13.0, connection_state.ConnectionEventKind.CONNECTED, 0),
+        ]
+        # Only the dropped heartbeat before 19 is learned, not the outage
+        assert detector.mean() == pytest.approx(1.1 * PERIOD)
+
+    def test_never_connected(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        Disconnected without any heartbeat, measured from the first update.
+        """
+        result, tracker = connection_state.ConnectionStateTracker.create(
+            5, None, detector, PHI_THRESHOLD
+        )
+        assert result
+        assert tracker is not None
+
+        kinds = []
+        for i in range(50):
+            event = tracker.update(False, 100.0 + i * POLL_PERIOD)
+            if event is not None:
+                kinds.append(event.kind)
+
+        assert kinds == [connection_state.ConnectionEventKind.DISCONNECTED]
+
+    def test_threshold(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        A detector needs a threshold.
+        """
+        result, _ = connection_state.ConnectionStateTracker.create(5, None, detector, 0.0)
+        assert not result
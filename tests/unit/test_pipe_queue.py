@@ -0,0 +1,126 @@
+"""
+Test the queue over a pipe.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+
+import pytest
+
+from utilities.workers import pipe_queue
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 4
+TIMEOUT = 0.05  # seconds
+PRODUCER_COUNT = 3
+ITEM_COUNT = 200
+
+
+@pytest.fixture()
+def bounded_queue() -> pipe_queue.PipeQueue:  # type: ignore
+    """
+    Empty queue of QUEUE_MAX_SIZE.
+    """
+    yield pipe_queue.PipeQueue(QUEUE_MAX_SIZE)  # type: ignore
+
+
+def produce(output_queue: pipe_queue.PipeQueue, producer: int) -> None:
+    """
+    Put ITEM_COUNT items from this producer, in order.
+    """
+    for i in range(ITEM_COUNT):
+        output_queue.put((producer, i))
+
+
+class TestSameProcess:
+    """
+    Queue semantics.
+    """
+
+    def test_in_order(self, bounded_queue: pipe_queue.PipeQueue) -> None:
+        """
+        Oldest first, any picklable item.
+        """
+        items = [1, "two", None, {"x": [3.0]}]
+        for item in items:
+            bounded_queue.put(item)
+
+        assert bounded_queue.qsize() == len(items)
+        assert bounded_queue.full()
+        assert [bounded_queue.get() for _ in items] == items
+        assert bounded_queue.empty()
+
+    def test_full(self, bounded_queue: pipe_queue.PipeQueue) -> None:
+        """
+        Putting into a full queue gives up after the timeout, or at once.
+        """
+        for i in range(QUEUE_MAX_SIZE):
+            bounded_queue.put_nowait(i)
+
+        start = time.monotonic()
+        with pytest.raises(queue.Full):
+            bounded_queue.put(QUEUE_MAX_SIZE, timeout=TIMEOUT)
+
+        assert time.monotonic() - start >= TIMEOUT
+
+        with pytest.raises(queue.Full):
+            bounded_queue.put_nowait(QUEUE_MAX_SIZE)
+
+        # Getting frees a place
+        assert bounded_queue.get() == 0
+        bounded_queue.put_nowait(QUEUE_MAX_SIZE)
+
+    def test_empty(self, bounded_queue: pipe_queue.PipeQueue) -> None:
+        """
+        Getting from an empty queue gives up after the timeout, or at once.
+        """
+        start = time.monotonic()
+        with pytest.raises(queue.Empty):
+            bounded_queue.get(timeout=TIMEOUT)
+
+        assert time.monotonic() - start >= TIMEOUT
+
+        with pytest.raises(queue.Empty):
+            bounded_queue.get_nowait()
+
+        assert bounded_queue.qsize() == 0
+
+    def test_infinite(self) -> None:
+        """
+        No limit besides the pipe's buffer.
+        """
+        unbounded_queue = pipe_queue.PipeQueue()
+        for i in range(100):
+            unbounded_queue.put_nowait(i)
+
+        assert not unbounded_queue.full()
+        assert [unbounded_queue.get_nowait() for _ in range(100)] == list(range(100))
+
+
+def test_several_producers(bounded_queue: pipe_queue.PipeQueue) -> None:
+    """
+    Whole items arrive from every producer process, each producer's in order.
+    """
+    producers = [
+        mp.Process(target=produce, args=(bounded_queue, producer))
+        for producer in range(PRODUCER_COUNT)
+    ]
+    for process in producers:
+        process.start()
+
+    received: "dict[int, list[int]]" = {producer: [] for producer in range(PRODUCER_COUNT)}
+    for _ in range(PRODUCER_COUNT * ITEM_COUNT):
+        producer, i = bounded_queue.get(timeout=5)
+        received[producer].append(i)
+
+    for process in producers:
+        process.join()
+
+    assert all(items == list(range(ITEM_COUNT)) for items in received.values())
+    assert bounded_queue.empty()
@@ -0,0 +1,108 @@
+"""
+Test taking everything available from the queue.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 10
+TIMEOUT = 0.05  # seconds
+
+
+@pytest.fixture(scope="module")
+def mp_manager() -> mp.managers.SyncManager:  # type: ignore
+    """
+    Manager shared by the tests, starting one is slow.
+    """
+    manager = mp.Manager()
+
+    yield manager  # type: ignore
+
+    manager.shutdown()
+
+
+@pytest.fixture(params=list(queue_proxy_wrapper.QueueBackend))
+def input_queue(
+    mp_manager: mp.managers.SyncManager, request: pytest.FixtureRequest
+) -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Empty queue of each backend.
+    """
+    yield queue_proxy_wrapper.QueueProxyWrapper(  # type: ignore
+        mp_manager, QUEUE_MAX_SIZE, request.param
+    )
+
+
+class TestGetAvailable:
+    """
+    Draining the queue.
+    """
+
+    def test_empty(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Nothing arrived before the timeout.
+        """
+        assert input_queue.get_available(TIMEOUT) == []
+
+    def test_all_in_order(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Everything queued, oldest first, and the queue is left empty.
+        """
+        for i in range(QUEUE_MAX_SIZE):
+            input_queue.queue.put(i)
+
+        # mp.Queue hands items to the pipe on a background thread
+        time.sleep(TIMEOUT)
+
+        assert input_queue.get_available(TIMEOUT) == list(range(QUEUE_MAX_SIZE))
+        assert input_queue.queue.empty()
+
+    def test_sentinel(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Sentinels are items like any other.
+        """
+        input_queue.queue.put(1)
+        input_queue.queue.put(None)
+        time.sleep(TIMEOUT)
+
+        assert input_queue.get_available(TIMEOUT) == [1, None]
+
+
+class TestFillAndDrain:
+    """
+    Clearing the queue at exit.
+    """
+
+    def test_full_queue(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A queue left full by a worker ends empty.
+        """
+        for i in range(QUEUE_MAX_SIZE):
+            input_queue.queue.put(i)
+
+        input_queue.fill_and_drain_queue()
+
+        assert input_queue.queue.empty()
+
+
+def test_manager_needed() -> None:
+    """
+    Only the manager backend needs a manager.
+    """
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+        None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.PIPE
+    )
+    assert wrapper.backend == queue_proxy_wrapper.QueueBackend.PIPE
+
+    with pytest.raises(AssertionError):
+        queue_proxy_wrapper.QueueProxyWrapper(None, QUEUE_MAX_SIZE)
@@ -0,0 +1,215 @@
+"""
+Test the shared memory ring buffer.
+"""
+
+import multiprocessing as mp
+import queue
+import struct
+import time
+
+import pytest
+
+from utilities.workers import shared_ring_buffer
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+# Producer and index within the producer, then padding checked for torn copies
+RECORD_FORMAT = struct.Struct("<II56s")
+CAPACITY = 8
+TIMEOUT = 0.05  # seconds
+PRODUCER_COUNT = 3
+PRODUCER_RECORD_COUNT = 5000
+
+
+@pytest.fixture()
+def ring() -> shared_ring_buffer.SharedRingBuffer:  # type: ignore
+    """
+    Single producer, single consumer ring of CAPACITY records.
+    """
+    result, new_ring = shared_ring_buffer.SharedRingBuffer.create(RECORD_FORMAT.size, CAPACITY)
+    assert result
+    assert new_ring is not None
+
+    yield new_ring  # type: ignore
+
+    new_ring.close()
+    new_ring.unlink()
+
+
+@pytest.fixture()
+def multiple_producer_ring() -> shared_ring_buffer.SharedRingBuffer:  # type: ignore
+    """
+    Ring of CAPACITY records for several producers.
+    """
+    result, new_ring = shared_ring_buffer.SharedRingBuffer.create(
+        RECORD_FORMAT.size, CAPACITY, multiple_producers=True
+    )
+    assert result
+    assert new_ring is not None
+
+    yield new_ring  # type: ignore
+
+    new_ring.close()
+    new_ring.unlink()
+
+
+def make_record(producer: int, i: int) -> bytes:
+    """
+    Record where the padding is all one byte, so a torn copy would show mixed bytes.
+    """
+    return RECORD_FORMAT.pack(producer, i, bytes([(producer + i) % 256]) * 56)
+
+
+def produce(ring: shared_ring_buffer.SharedRingBuffer, producer: int) -> None:
+    """
+    Put PRODUCER_RECORD_COUNT records from this producer, in order.
+    """
+    for i in range(PRODUCER_RECORD_COUNT):
+        ring.put(make_record(producer, i))
+
+
+def consume(
+    ring: shared_ring_buffer.SharedRingBuffer, producer_count: int
+) -> "dict[int, list[int]]":
+    """
+    Get every record, checking each is whole. Returns the indices received from each producer.
+    """
+    received: "dict[int, list[int]]" = {producer: [] for producer in range(producer_count)}
+    for _ in range(producer_count * PRODUCER_RECORD_COUNT):
+        record = ring.get(timeout=5)
+        assert record is not None
+
+        producer, i, padding = RECORD_FORMAT.unpack(record)
+        assert padding == bytes([(producer + i) % 256]) * 56
+        received[producer].append(i)
+
+    return received
+
+
+def test_create() -> None:
+    """
+    Records and capacity must be non-empty.
+    """
+    result, _ = shared_ring_buffer.SharedRingBuffer.create(0, CAPACITY)
+    assert not result
+
+    result, _ = shared_ring_buffer.SharedRingBuffer.create(RECORD_FORMAT.size, 0)
+    assert not result
+
+
+class TestSameProcess:
+    """
+    Queue semantics.
+    """
+
+    def test_in_order_around_the_ring(self, ring: shared_ring_buffer.SharedRingBuffer) -> None:
+        """
+        Oldest first, including after the head wraps around.
+        """
+        for i in range(CAPACITY * 3):
+            ring.put(make_record(0, i))
+            assert ring.qsize() == 1
+            assert ring.get() == make_record(0, i)
+
+        assert ring.empty()
+
+    def test_full(self, ring: shared_ring_buffer.SharedRingBuffer) -> None:
+        """
+        Putting into a full ring gives up after the timeout, or at once.
+        """
+        for i in range(CAPACITY):
+            ring.put_nowait(make_record(0, i))
+
+        assert ring.qsize() == CAPACITY
+
+        start = time.monotonic()
+        with pytest.raises(queue.Full):
+            ring.put(make_record(0, CAPACITY), timeout=TIMEOUT)
+
+        assert time.monotonic() - start >= TIMEOUT
+
+        with pytest.raises(queue.Full):
+            ring.put_nowait(make_record(0, CAPACITY))
+
+        # Getting frees a slot
+        assert ring.get() == make_record(0, 0)
+        ring.put_nowait(make_record(0, CAPACITY))
+
+    def test_empty(self, ring: shared_ring_buffer.SharedRingBuffer) -> None:
+        """
+        Getting from an empty ring gives up after the timeout, or at once.
+        """
+        start = time.monotonic()
+        with pytest.raises(queue.Empty):
+            ring.get(timeout=TIMEOUT)
+
+        assert time.monotonic() - start >= TIMEOUT
+
+        with pytest.raises(queue.Empty):
+            ring.get_nowait()
+
+    def test_sentinel(self, ring: shared_ring_buffer.SharedRingBuffer) -> None:
+        """
+        None is an item like any other, and does not leave a stale record behind.
+        """
+        ring.put(make_record(0, 0))
+        ring.put(None)
+
+        assert ring.get() == make_record(0, 0)
+        assert ring.get() is None
+
+    def test_wrong_size(self, ring: shared_ring_buffer.SharedRingBuffer) -> None:
+        """
+        Records are fixed size.
+        """
+        with pytest.raises(ValueError):
+            ring.put(bytes(RECORD_FORMAT.size - 1))
+
+        assert ring.empty()
+
+    def test_fill_and_drain(self, ring: shared_ring_buffer.SharedRingBuffer) -> None:
+        """
+        Ends empty whether it started full or not.
+        """
+        ring.put(make_record(0, 0))
+        ring.fill_and_drain_queue()
+
+        assert ring.empty()
+        with pytest.raises(queue.Empty):
+            ring.get_nowait()
+
+
+def test_single_producer(ring: shared_ring_buffer.SharedRingBuffer) -> None:
+    """
+    Every record arrives whole and in order from another process through a small ring.
+    """
+    producer = mp.Process(target=produce, args=(ring, 0))
+    producer.start()
+
+    received = consume(ring, 1)
+    producer.join()
+
+    assert received[0] == list(range(PRODUCER_RECORD_COUNT))
+
+
+def test_multiple_producers(multiple_producer_ring: shared_ring_buffer.SharedRingBuffer) -> None:
+    """
+    Whole records arrive from every producer process, each producer's in order.
+    """
+    producers = [
+        mp.Process(target=produce, args=(multiple_producer_ring, producer))
+        for producer in range(PRODUCER_COUNT)
+    ]
+    for process in producers:
+        process.start()
+
+    received = consume(multiple_producer_ring, PRODUCER_COUNT)
+    for process in producers:
+        process.join()
+
+    assert all(indices == list(range(PRODUCER_RECORD_COUNT)) for indices in received.values())
+    assert multiple_producer_ring.empty()
@@ -0,0 +1,178 @@
+"""
+Test aligning telemetry streams to a common timestamp.
+"""
+
+import math
+
+import pytest
+
+from modules.telemetry import stream_alignment
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+HISTORY_SIZE = 4
+MAX_EXTRAPOLATION = 1000  # ms
+
+
+@pytest.fixture()
+def position_history() -> stream_alignment.StreamHistory:  # type: ignore
+    """
+    Position history with a sample every 100 ms, moving at 1 m/s in x.
+    """
+    result, history = stream_alignment.StreamHistory.create(HISTORY_SIZE, False, MAX_EXTRAPOLATION)
+    assert result
+    assert history is not None
+
+    for time_ms in range(0, 400, 100):
+        history.add(time_ms, (time_ms / 1000, 0.0, 5.0), (1.0, 0.0, 0.0))
+
+    yield history  # type: ignore
+
+
+@pytest.fixture()
+def yaw_history() -> stream_alignment.StreamHistory:  # type: ignore
+    """
+    Attitude history crossing from pi to -pi.
+    """
+    result, history = stream_alignment.StreamHistory.create(HISTORY_SIZE, True, MAX_EXTRAPOLATION)
+    assert result
+    assert history is not None
+
+    history.add(0, (0.0, 0.0, math.pi - 0.1), (0.0, 0.0, 2.0))
+    history.add(100, (0.0, 0.0, -math.pi + 0.1), (0.0, 0.0, 2.0))
+
+    yield history  # type: ignore
+
+
+class TestCreate:
+    """
+    Invalid settings.
+    """
+
+    def test_history_too_short(self) -> None:
+        """
+        Interpolation needs at least 2 samples.
+        """
+        result, history = stream_alignment.StreamHistory.create(1, False, MAX_EXTRAPOLATION)
+
+        assert not result
+        assert history is None
+
+    def test_negative_extrapolation(self) -> None:
+        """
+        Extrapolation limit must not be negative.
+        """
+        result, history = stream_alignment.StreamHistory.create(HISTORY_SIZE, False, -1)
+
+        assert not result
+        assert history is None
+
+
+class TestAt:
+    """
+    Values at a time.
+    """
+
+    def test_empty(self) -> None:
+        """
+        Nothing to align without samples.
+        """
+        result, history = stream_alignment.StreamHistory.create(
+            HISTORY_SIZE, False, MAX_EXTRAPOLATION
+        )
+        assert result
+        assert history is not None
+
+        result, values, rates = history.at(0)
+
+        assert not result
+        assert values is None
+        assert rates is None
+
+    def test_sample_time(self, position_history: stream_alignment.StreamHistory) -> None:
+        """
+        Exactly at a sample.
+        """
+        result, values, _ = position_history.at(200)
+
+        assert result
+        assert math.isclose(values[0], 0.2)
+        assert math.isclose(values[2], 5.0)
+
+    def test_interpolate(self, position_history: stream_alignment.StreamHistory) -> None:
+        """
+        Between samples.
+        """
+        result, values, rates = position_history.at(150)
+
+        assert result
+        assert math.isclose(values[0], 0.15)
+        assert math.isclose(rates[0], 1.0)
+
+    def test_extrapolate(self, position_history: stream_alignment.StreamHistory) -> None:
+        """
+        After the newest sample, using its velocity.
+        """
+        result, values, _ = position_history.at(550)
+
+        assert result
+        assert math.isclose(values[0], 0.55)
+
+    def test_extrapolate_limit(self, position_history: stream_alignment.StreamHistory) -> None:
+        """
+        Values are held past the extrapolation limit.
+        """
+        result, values, _ = position_history.at(300 + 5 * MAX_EXTRAPOLATION)
+
+        assert result
+        assert math.isclose(values[0], 0.3 + MAX_EXTRAPOLATION / 1000)
+
+    def test_interpolate_angle_wrap(self, yaw_history: stream_alignment.StreamHistory) -> None:
+        """
+        Takes the short way around instead of through 0.
+        """
+        result, values, _ = yaw_history.at(50)
+
+        assert result
+        assert math.isclose(abs(values[2]), math.pi)
+
+    def test_extrapolate_angle_wrap(self, yaw_history: stream_alignment.StreamHistory) -> None:
+        """
+        Extrapolated angles stay in [-pi, pi].
+        """
+        result, values, _ = yaw_history.at(200)
+
+        assert result
+        assert math.isclose(values[2], -math.pi + 0.3)
+
+
+class TestAdd:
+    """
+    Adding samples.
+    """
+
+    def test_history_bounded(self, position_history: stream_alignment.StreamHistory) -> None:
+        """
+        Oldest sample is dropped when full.
+        """
+        position_history.add(400, (0.4, 0.0, 5.0), (1.0, 0.0, 0.0))
+
+        actual = len(position_history._StreamHistory__samples)  # type: ignore
+
+        assert actual == HISTORY_SIZE
+
+    def test_time_reset(self, position_history: stream_alignment.StreamHistory) -> None:
+        """
+        Time going backwards starts a new history.
+        """
+        position_history.add(10, (7.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+
+        result, values, _ = position_history.at(200)
+
+        assert result
+        assert position_history.newest_time() == 10
+        assert math.isclose(values[0], 7.0)
@@ -0,0 +1,158 @@
+"""
+Test the stream rate controller.
+"""
+
+import pytest
+
+from modules.telemetry import stream_rate
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+DESIRED_RATE = 10  # Hz
+MIN_RATE = 1  # Hz
+QUEUE_MAX_SIZE = 10
+
+
+@pytest.fixture()
+def controller() -> stream_rate.StreamRateController:  # type: ignore
+    """
+    Controller which has started measuring at time 0.
+    """
+    result, new_controller = stream_rate.StreamRateController.create(DESIRED_RATE, MIN_RATE)
+    assert result
+    assert new_controller is not None
+
+    assert not new_controller.update(0.0, 0)
+
+    yield new_controller  # type: ignore
+
+
+def receive(controller: stream_rate.StreamRateController, rate: float) -> None:
+    """
+    Receive one second of messages at rate.
+    """
+    for _ in range(int(rate)):
+        controller.add_message()
+
+
+class TestCreate:
+    """
+    Rate limits.
+    """
+
+    def test_invalid_min_rate(self) -> None:
+        """
+        Rate cannot be lowered to 0.
+        """
+        result, controller = stream_rate.StreamRateController.create(DESIRED_RATE, 0)
+
+        assert not result
+        assert controller is None
+
+    def test_desired_below_min(self) -> None:
+        """
+        Desired rate must be allowed.
+        """
+        result, controller = stream_rate.StreamRateController.create(MIN_RATE, DESIRED_RATE)
+
+        assert not result
+        assert controller is None
+
+
+class TestVerify:
+    """
+    Checking the achieved rate.
+    """
+
+    def test_achieved(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        No need to request again.
+        """
+        receive(controller, DESIRED_RATE)
+
+        assert not controller.update(1.0, 0)
+        assert controller.achieved_rate() == DESIRED_RATE
+        assert controller.is_verified()
+
+    def test_not_achieved_retries(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        Request again a limited number of times.
+        """
+        actual = []
+        for i in range(1, 6):
+            receive(controller, DESIRED_RATE / 2)
+            actual.append(controller.update(float(i), 0))
+
+        assert actual == [True, True, False, False, False]
+        assert not controller.is_verified()
+        assert controller.requested_rate() == DESIRED_RATE
+
+
+class TestFlowControl:
+    """
+    Adjusting to the consumer.
+    """
+
+    def test_lag_lowers_rate(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        Growing backlog halves the rate.
+        """
+        receive(controller, DESIRED_RATE)
+        assert not controller.update(1.0, 2)
+        receive(controller, DESIRED_RATE)
+
+        assert controller.update(2.0, 4)
+        assert controller.requested_rate() == DESIRED_RATE / 2
+
+    def test_full_queue_lowers_rate(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        Queue that stays full cannot grow, but the consumer is still lagging.
+        """
+        receive(controller, DESIRED_RATE)
+        assert not controller.update(1.0, QUEUE_MAX_SIZE, QUEUE_MAX_SIZE)
+        receive(controller, DESIRED_RATE)
+
+        assert controller.update(2.0, QUEUE_MAX_SIZE, QUEUE_MAX_SIZE)
+        assert controller.requested_rate() == DESIRED_RATE / 2
+
+    def test_steady_backlog_keeps_rate(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        Consumer keeps up with a constant backlog.
+        """
+        for i in range(1, 6):
+            receive(controller, DESIRED_RATE)
+            assert not controller.update(float(i), 3, QUEUE_MAX_SIZE)
+
+        assert controller.requested_rate() == DESIRED_RATE
+
+    def test_min_rate(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        Rate is not lowered past the minimum.
+        """
+        backlog = 0
+        for i in range(1, 20):
+            backlog += 5
+            receive(controller, controller.requested_rate())
+            controller.update(float(i), backlog)
+
+        assert controller.requested_rate() == MIN_RATE
+
+    def test_recovery(self, controller: stream_rate.StreamRateController) -> None:
+        """
+        Rate is raised back to the desired rate after the backlog clears.
+        """
+        for i, backlog in enumerate([2, 4], 1):
+            receive(controller, DESIRED_RATE)
+            controller.update(float(i), backlog)
+
+        assert controller.requested_rate() < DESIRED_RATE
+
+        for i in range(3, 40):
+            receive(controller, controller.requested_rate())
+            controller.update(float(i), 0)
+
+        assert controller.requested_rate() == DESIRED_RATE
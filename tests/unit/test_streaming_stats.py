@@ -0,0 +1,159 @@
+"""
+Test the streaming statistics.
+"""
+
+import random
+import statistics
+import typing
+
+import pytest
+
+from utilities.stats import streaming_stats
+
+
+SAMPLE_COUNT = 1000
+
+
+@pytest.fixture()
+def samples() -> "list[tuple[float, float]]":
+    """
+    Two component samples with a large offset, where naive variance loses precision.
+    """
+    rng = random.Random(0)
+    return [(1e6 + rng.gauss(0.0, 1.0), rng.uniform(-5.0, 5.0)) for _ in range(SAMPLE_COUNT)]
+
+
+class TestRunningStatistics:
+    """
+    Welford mean and variance.
+    """
+
+    def test_invalid_dimension(self) -> None:
+        """
+        Samples must have a component.
+        """
+        result, running = streaming_stats.RunningStatistics.create(0)
+
+        assert not result
+        assert running is None
+
+    def test_empty(self) -> None:
+        """
+        No statistics without samples.
+        """
+        _, running = streaming_stats.RunningStatistics.create(2)
+
+        assert running.mean() is None
+        assert running.variance() is None
+
+    def test_matches_batch(
+        self, samples: "list[tuple[float, float]]"  # pylint: disable=redefined-outer-name
+    ) -> None:
+        """
+        Same as computing over every sample at once.
+        """
+        _, running = streaming_stats.RunningStatistics.create(2)
+        for sample in samples:
+            running.add(sample)
+
+        assert running.count() == SAMPLE_COUNT
+        for i, values in enumerate(zip(*samples)):
+            assert running.mean()[i] == pytest.approx(statistics.fmean(values), rel=1e-12)
+            assert running.variance()[i] == pytest.approx(statistics.variance(values), rel=1e-9)
+            assert running.standard_deviation()[i] == pytest.approx(
+                statistics.stdev(values), rel=1e-9
+            )
+
+
+class TestExponentialAverage:
+    """
+    Exponentially weighted moving average.
+    """
+
+    def test_invalid_alpha(self) -> None:
+        """
+        Weight must be in (0, 1].
+        """
+        result, average = streaming_stats.ExponentialAverage.create(1, 0.0)
+
+        assert not result
+        assert average is None
+
+    def test_average(self) -> None:
+        """
+        Starts at the first sample and moves towards new ones.
+        """
+        _, average = streaming_stats.ExponentialAverage.create(1, 0.5)
+        assert average.value() is None
+
+        average.add((4.0,))
+        average.add((8.0,))
+        average.add((0.0,))
+
+        assert average.value() == (3.0,)
+
+
+class TestWindowAverage:
+    """
+    Ring buffer average of the most recent samples.
+    """
+
+    def test_invalid_window(self) -> None:
+        """
+        Window must hold a sample.
+        """
+        result, window = streaming_stats.WindowAverage.create(1, 0)
+
+        assert not result
+        assert window is None
+
+    def test_partial_window(self) -> None:
+        """
+        Averages the samples so far until full.
+        """
+        _, window = streaming_stats.WindowAverage.create(1, 3)
+        window.add((1.0,))
+        window.add((2.0,))
+
+        assert not window.is_full()
+        assert window.mean() == (1.5,)
+
+    def test_matches_last_samples(
+        self, samples: "list[tuple[float, float]]"  # pylint: disable=redefined-outer-name
+    ) -> None:
+        """
+        Same as averaging the last window_size samples.
+        """
+        window_size = 7
+        _, window = streaming_stats.WindowAverage.create(2, window_size)
+
+        for i, sample in enumerate(samples):
+            window.add(sample)
+
+            recent = samples[max(i + 1 - window_size, 0) : i + 1]
+            for j, values in enumerate(zip(*recent)):
+                assert window.mean()[j] == pytest.approx(statistics.fmean(values), abs=1e-6)
+
+        assert window.is_full()
+
+
+@pytest.mark.parametrize(
+    "create",
+    [
+        lambda: streaming_stats.RunningStatistics.create(2),
+        lambda: streaming_stats.ExponentialAverage.create(2, 0.5),
+        lambda: streaming_stats.WindowAverage.create(2, 3),
+    ],
+)
+def test_wrong_dimension(create: "typing.Callable[[], tuple]") -> None:
+    """
+    Samples with a different number of components are rejected, before and after the first.
+    """
+    result, statistic = create()
+    assert result
+
+    assert not statistic.add((1.0,))
+    assert statistic.add((1.0, 2.0))
+    assert not statistic.add((1.0, 2.0, 3.0))
+    assert not statistic.add((1.0,))
+    assert statistic.add((3.0, 4.0))
@@ -0,0 +1,287 @@
+"""
+Test the telemetry data record, batches and fusing the streams.
+"""
+
+import io
+import pickle
+import struct
+
+import numpy as np
+import pytest
+from pymavlink.dialects.v20 import common
+
+from modules.telemetry import telemetry
+from utilities.workers import latency_stamps
+from . import conftest
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+BATCH_CAPACITY = 4
+SYSTEM_ID = 1
+
+
+def fields(telemetry_data: telemetry.TelemetryData) -> "list":
+    """
+    Field values in FIELDS order.
+    """
+    return [getattr(telemetry_data, name) for name in telemetry.TelemetryData.FIELDS]
+
+
+class TestPickle:
+    """
+    Sending between processes.
+    """
+
+    def test_record(self) -> None:
+        """
+        In range values are pickled as the binary record, with missing fields and stamps kept.
+        """
+        stamps = latency_stamps.LatencyStamps()
+        stamps.stamp(latency_stamps.Stage.RECEIVE, 10.0)
+        expected = telemetry.TelemetryData(
+            time_since_boot=2**32 - 1, x=1.5, yaw=-0.25, system_id=255, stamps=stamps
+        )
+
+        actual = pickle.loads(pickle.dumps(expected))
+
+        assert fields(actual) == fields(expected)
+        assert actual.y is None
+        assert actual.stamps is not None
+        assert actual.stamps.get(latency_stamps.Stage.RECEIVE) == 10.0
+        assert expected.__reduce__()[0].__name__ == "from_bytes"
+
+    @pytest.mark.parametrize(
+        "telemetry_data",
+        [
+            telemetry.TelemetryData(time_since_boot=5.5),
+            telemetry.TelemetryData(time_since_boot=-1),
+            telemetry.TelemetryData(time_since_boot=2**32),
+            telemetry.TelemetryData(attitude_time_since_boot=-1),
+            telemetry.TelemetryData(system_id=300),
+            telemetry.TelemetryData(system_id=-1),
+        ],
+    )
+    def test_out_of_range(self, telemetry_data: telemetry.TelemetryData) -> None:
+        """
+        Values the record cannot hold are pickled as they are instead of failing.
+        """
+        actual = pickle.loads(pickle.dumps(telemetry_data))
+
+        assert telemetry_data.__reduce__()[0] is telemetry.TelemetryData
+        assert fields(actual) == fields(telemetry_data)
+        assert actual.stamps is None
+
+    def test_to_bytes_out_of_range(self) -> None:
+        """
+        Packing the record directly is strict.
+        """
+        with pytest.raises(struct.error):
+            telemetry.TelemetryData(system_id=300).to_bytes()
+
+
+def make_sample(i: int) -> telemetry.TelemetryData:
+    """
+    Sample with some fields missing, numbered by i.
+    """
+    return telemetry.TelemetryData(
+        time_since_boot=100 * i,
+        x=float(i),
+        z=-2.5 * i,
+        yaw=0.1 * i,
+        attitude_time_since_boot=100 * i - 5,
+        system_id=1 + i % 2,
+    )
+
+
+@pytest.fixture()
+def batch() -> telemetry.TelemetryBatch:  # type: ignore
+    """
+    Batch of BATCH_CAPACITY samples.
+    """
+    new_batch = telemetry.TelemetryBatch(BATCH_CAPACITY)
+    for i in range(BATCH_CAPACITY):
+        new_batch.append(make_sample(i), 1000.0 + i)
+
+    yield new_batch  # type: ignore
+
+
+class TestTelemetryBatch:
+    """
+    Columns of samples.
+    """
+
+    def test_append_get(self, batch: telemetry.TelemetryBatch) -> None:
+        """
+        Samples come back as they went in, with missing fields as None and integers as int.
+        """
+        assert len(batch) == BATCH_CAPACITY
+        assert batch.is_full()
+
+        for i in range(BATCH_CAPACITY):
+            actual, receive_time = batch.get(i)
+
+            assert fields(actual) == fields(make_sample(i))
+            assert isinstance(actual.time_since_boot, int)
+            assert receive_time == 1000.0 + i
+
+        actual, _ = batch.get(-1)
+        assert fields(actual) == fields(make_sample(BATCH_CAPACITY - 1))
+
+        np.testing.assert_array_equal(batch.column("x"), np.arange(BATCH_CAPACITY))
+        assert np.isnan(batch.column("y")).all()
+
+    def test_get_out_of_range(self, batch: telemetry.TelemetryBatch) -> None:
+        """
+        Only samples that were appended.
+        """
+        with pytest.raises(AssertionError):
+            batch.get(BATCH_CAPACITY)
+
+    def test_growth(self, batch: telemetry.TelemetryBatch) -> None:
+        """
+        Appending past the capacity keeps every sample.
+        """
+        count = 3 * BATCH_CAPACITY + 1
+        for i in range(BATCH_CAPACITY, count):
+            batch.append(make_sample(i), 1000.0 + i)
+
+        assert len(batch) == count
+        assert batch.data.shape[1] >= count
+        np.testing.assert_array_equal(batch.column("x"), np.arange(count))
+        assert fields(batch.get(-1)[0]) == fields(make_sample(count - 1))
+
+    def test_growth_from_empty(self) -> None:
+        """
+        A batch with no room still takes samples.
+        """
+        empty_batch = telemetry.TelemetryBatch(0)
+        assert empty_batch.is_full()
+
+        empty_batch.append(make_sample(1), 1.0)
+
+        assert len(empty_batch) == 1
+        assert fields(empty_batch.get(0)[0]) == fields(make_sample(1))
+
+    def test_save_load(self, batch: telemetry.TelemetryBatch) -> None:
+        """
+        Batches saved one after another load back in order, only their samples.
+        """
+        partial_batch = telemetry.TelemetryBatch(BATCH_CAPACITY)
+        partial_batch.append(make_sample(7), 7.0)
+
+        file = io.BytesIO()
+        batch.save(file)
+        partial_batch.save(file)
+        file.seek(0)
+
+        first = telemetry.TelemetryBatch.load(file)
+        second = telemetry.TelemetryBatch.load(file)
+
+        assert len(first) == BATCH_CAPACITY
+        np.testing.assert_array_equal(first.data, batch.data)
+        assert len(second) == 1
+        assert fields(second.get(0)[0]) == fields(make_sample(7))
+        assert second.get(0)[1] == 7.0
+
+
+def make_attitude(time_boot_ms: int, yaw: float, yaw_speed: float) -> object:
+    """
+    ATTITUDE message from SYSTEM_ID, as mavutil parses it.
+    """
+    msg = common.MAVLink_attitude_message(time_boot_ms, 0.0, 0.0, yaw, 0.0, 0.0, yaw_speed)
+    msg._header.srcSystem = SYSTEM_ID
+    msg._timestamp = 1000.0 + time_boot_ms / 1000
+    return msg
+
+
+def make_position(time_boot_ms: int, x: float, x_velocity: float) -> object:
+    """
+    LOCAL_POSITION_NED message from SYSTEM_ID, as mavutil parses it.
+    """
+    msg = common.MAVLink_local_position_ned_message(time_boot_ms, x, 0.0, 0.0, x_velocity, 0.0, 0.0)
+    msg._header.srcSystem = SYSTEM_ID
+    msg._timestamp = 1000.0 + time_boot_ms / 1000
+    return msg
+
+
+def make_telemetry(messages: "list[object]") -> telemetry.Telemetry:
+    """
+    Telemetry receiving the messages.
+    """
+    result, telem = telemetry.Telemetry.create(
+        conftest.FakeConnection(messages), conftest.FakeLogger()
+    )
+    assert result
+    assert telem is not None
+
+    return telem
+
+
+class TestFuse:
+    """
+    Combining the attitude and position streams.
+    """
+
+    def test_extrapolate(self) -> None:
+        """
+        Fused at the newest message, with the other stream extrapolated to it.
+        """
+        telem = make_telemetry([make_position(100, 0.0, 10.0), make_attitude(150, 0.5, 1.0)])
+        assert telem.run_streaming() == (True, None)
+
+        result, telemetry_data = telem.run_streaming()
+
+        assert result
+        assert telemetry_data is not None
+        assert telemetry_data.time_since_boot == 150
+        assert telemetry_data.x == pytest.approx(0.5)
+        assert telemetry_data.yaw == pytest.approx(0.5)
+        assert telemetry_data.attitude_time_since_boot == 150
+        assert telemetry_data.position_time_since_boot == 100
+        assert telemetry_data.system_id == SYSTEM_ID
+
+    def test_streamed_times_increase(self) -> None:
+        """
+        Each streamed sample is newer than the last, with no repeats when both streams
+        send at the same time or a message arrives late.
+        """
+        messages = [make_attitude(time_ms, 0.0, 0.0) for time_ms in range(0, 200, 4)]
+        messages += [make_position(time_ms, 0.0, 0.0) for time_ms in range(0, 200, 10)]
+        messages.sort(key=lambda msg: msg.time_boot_ms)
+        # Newer than the last position, but arrives after a newer attitude
+        late_index = [msg.time_boot_ms for msg in messages].index(192) + 1
+        messages.insert(late_index, make_position(191, 0.0, 0.0))
+        telem = make_telemetry(messages)
+
+        times = []
+        for _ in messages:
+            result, telemetry_data = telem.run_streaming()
+            assert result
+            if telemetry_data is not None:
+                times.append(telemetry_data.time_since_boot)
+
+        assert all(earlier < later for earlier, later in zip(times, times[1:]))
+        assert times == sorted({msg.time_boot_ms for msg in messages if msg.time_boot_ms != 191})
+
+    def test_reboot(self) -> None:
+        """
+        Streaming resumes from the new times when the vehicle restarts its clock.
+        """
+        telem = make_telemetry(
+            [
+                make_position(100, 0.0, 0.0),
+                make_attitude(150, 0.0, 0.0),
+                make_attitude(10, 0.0, 0.0),
+                make_position(20, 0.0, 0.0),
+                make_attitude(30, 0.0, 0.0),
+            ]
+        )
+        telem.run_streaming()
+
+        times = [telem.run_streaming()[1].time_since_boot for _ in range(4)]
+
+        assert times == [150, 100, 20, 30]
@@ -0,0 +1,148 @@
+"""
+Test replaying a recorded .tlog file.
+"""
+
+import pathlib
+import struct
+import time
+
+import pytest
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common
+
+from modules.replay import tlog_replay
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+MESSAGE_PERIOD = 0.1  # seconds
+MESSAGE_COUNT = 6
+
+
+@pytest.fixture()
+def tlog_path(tmp_path: pathlib.Path) -> pathlib.Path:  # type: ignore
+    """
+    Log of a heartbeat followed by alternating attitude and position, one every MESSAGE_PERIOD.
+    """
+    mav = common.MAVLink(None, srcSystem=1, srcComponent=0)
+    path = tmp_path / "test.tlog"
+
+    with open(path, "wb") as log_file:
+        for i in range(MESSAGE_COUNT):
+            if i == 0:
+                msg = mav.heartbeat_encode(
+                    mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                    mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                    0,
+                    0,
+                    0,
+                )
+            elif i % 2 == 1:
+                msg = mav.attitude_encode(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            else:
+                msg = mav.local_position_ned_encode(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+            log_file.write(struct.pack(">Q", int(i * MESSAGE_PERIOD * 1e6)))
+            log_file.write(msg.pack(mav))
+
+    yield path  # type: ignore
+
+
+def create_replay(path: pathlib.Path, speed: float) -> tlog_replay.TlogReplay:
+    """
+    Create replay and check it succeeded.
+    """
+    result, replay = tlog_replay.TlogReplay.create(path, speed)
+    assert result
+    assert replay is not None
+
+    return replay
+
+
+class TestReplay:
+    """
+    Receiving from the log.
+    """
+
+    def test_missing_file(self, tmp_path: pathlib.Path) -> None:
+        """
+        Log must exist.
+        """
+        result, replay = tlog_replay.TlogReplay.create(tmp_path / "missing.tlog", 1)
+
+        assert not result
+        assert replay is None
+
+    def test_as_fast_as_possible(self, tlog_path: pathlib.Path) -> None:
+        """
+        All messages in order without waiting.
+        """
+        replay = create_replay(tlog_path, 0)
+
+        start_time = time.time()
+        actual = []
+        while not replay.is_finished():
+            msg = replay.recv_match(blocking=False)
+            if msg is not None:
+                actual.append(msg.get_type())
+
+        assert actual[0] == "HEARTBEAT"
+        assert len(actual) == MESSAGE_COUNT
+        assert time.time() - start_time < (MESSAGE_COUNT - 1) * MESSAGE_PERIOD
+
+    def test_paced(self, tlog_path: pathlib.Path) -> None:
+        """
+        Messages are received at the recorded times, sped up.
+        """
+        speed = 2
+        replay = create_replay(tlog_path, speed)
+
+        start_time = time.time()
+        while not replay.is_finished():
+            replay.recv_match(blocking=True, timeout=MESSAGE_PERIOD)
+
+        expected = (MESSAGE_COUNT - 1) * MESSAGE_PERIOD / speed
+        actual = time.time() - start_time
+
+        assert actual >= expected
+        assert actual < expected + 2 * MESSAGE_PERIOD
+
+    def test_not_due(self, tlog_path: pathlib.Path) -> None:
+        """
+        Non-blocking receive does not wait for the next message.
+        """
+        replay = create_replay(tlog_path, 1)
+
+        assert replay.wait_heartbeat(blocking=False) is not None
+        assert replay.recv_match(blocking=False) is None
+
+    def test_type_filter(self, tlog_path: pathlib.Path) -> None:
+        """
+        Other messages are discarded.
+        """
+        replay = create_replay(tlog_path, 0)
+
+        msg = replay.recv_match(type="LOCAL_POSITION_NED", blocking=True, timeout=1)
+
+        assert msg is not None
+        assert msg.time_boot_ms == 2
+        assert replay.recv_match(type="ATTITUDE", blocking=False).time_boot_ms == 3
+
+    def test_send_discarded(self, tlog_path: pathlib.Path) -> None:
+        """
+        Sending works without a drone.
+        """
+        replay = create_replay(tlog_path, 0)
+
+        replay.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS,
+            mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+            0,
+            0,
+            0,
+        )
+
+        assert replay.sent_bytes > 0
@@ -0,0 +1,106 @@
+"""
+Test the per-vehicle table.
+"""
+
+import numpy as np
+import pytest
+
+from modules.command import vehicle_table
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TARGETS = {
+    1: (10.0, 20.0, 30.0),
+    7: (-5.0, 0.0, 15.0),
+    255: (0.0, 0.0, 50.0),
+}
+
+
+@pytest.fixture()
+def table() -> vehicle_table.VehicleTable:  # type: ignore
+    """
+    Table of TARGETS.
+    """
+    result, new_table = vehicle_table.VehicleTable.create(TARGETS)
+    assert result
+    assert new_table is not None
+
+    yield new_table  # type: ignore
+
+
+class TestCreate:
+    """
+    Valid vehicles.
+    """
+
+    def test_empty(self) -> None:
+        """
+        Table needs a vehicle.
+        """
+        result, new_table = vehicle_table.VehicleTable.create({})
+
+        assert not result
+        assert new_table is None
+
+    def test_invalid_system_id(self) -> None:
+        """
+        System IDs are 1 to 255.
+        """
+        result, new_table = vehicle_table.VehicleTable.create({256: (0.0, 0.0, 0.0)})
+
+        assert not result
+        assert new_table is None
+
+
+class TestLookup:
+    """
+    Finding vehicles by system ID.
+    """
+
+    def test_row(self, table: vehicle_table.VehicleTable) -> None:
+        """
+        Each vehicle has its own target and statistics.
+        """
+        for system_id, expected in TARGETS.items():
+            row = table.row(system_id)
+
+            assert row is not None
+            assert table.target(row) == expected
+
+        assert len(table) == len(TARGETS)
+        assert len(set(id(statistics) for statistics in table.velocity_statistics)) == len(TARGETS)
+
+    def test_row_missing(self, table: vehicle_table.VehicleTable) -> None:
+        """
+        Vehicles not in the table, including invalid IDs.
+        """
+        assert table.row(2) is None
+        assert table.row(-1) is None
+        assert table.row(1000) is None
+
+    def test_rows(self, table: vehicle_table.VehicleTable) -> None:
+        """
+        Vectorized lookup matches single lookups.
+        """
+        system_ids = np.array([255, 1, 2, 7, 1, 300])
+
+        actual = table.rows(system_ids)
+
+        expected = [table.row(system_id) for system_id in system_ids.tolist()]
+        assert actual.tolist() == [-1 if row is None else row for row in expected]
+        np.testing.assert_array_equal(table.targets[actual[:2]], [TARGETS[255], TARGETS[1]])
+
+    def test_rows_missing_system_id(self, table: vehicle_table.VehicleTable) -> None:
+        """
+        NaN system IDs are the default vehicle if given, otherwise not in the table.
+        """
+        system_ids = np.array([np.nan, 7.0, np.nan])
+
+        np.testing.assert_array_equal(
+            table.rows(system_ids, 1), [table.row(1), table.row(7), table.row(1)]
+        )
+        np.testing.assert_array_equal(table.rows(system_ids), [-1, table.row(7), -1])
@@ -0,0 +1,165 @@
+"""
+Pre-packed MAVLink frames for messages sent over and over.
+"""
+
+import binascii
+import struct
+
+from pymavlink import mavutil
+
+
+# COMMAND_LONG payload starts with its 7 float params
+COMMAND_LONG_PARAMS_FORMAT = "<7f"
+
+# Bits of each byte value in reverse order
+_BIT_REVERSE = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+
+def frame_crc(frame: bytearray, end: int, crc_extra: int) -> int:
+    """
+    MAVLink checksum (CRC-16/MCRF4XX) of a frame up to end, its first byte (the start marker)
+    excluded.
+
+    MCRF4XX is CRC-16/CCITT with the bits of every byte reversed, so the CCITT CRC in binascii
+    computes it on bit reversed bytes, much faster than a loop in Python.
+    """
+    crc = binascii.crc_hqx(frame[1:end].translate(_BIT_REVERSE), 0xFFFF)
+    crc = binascii.crc_hqx(_BIT_REVERSE[crc_extra : crc_extra + 1], crc)
+
+    return (_BIT_REVERSE[crc & 0xFF] << 8) | _BIT_REVERSE[crc >> 8]
+
+
+class FrameTemplate:  # pylint: disable=too-many-instance-attributes
+    """
+    Frame of one message packed once, then sent again with only the leading payload fields,
+    sequence number and checksum patched in place, in a single write.
+
+    Sends share the sequence number of the mav they were created from, so they can be mixed
+    with the usual `mav.<message>_send()` calls. Signed links and send callbacks are not
+    supported.
+    """
+
+    __create_key = object()
+
+    # Start marker to header length and offset of the sequence number
+    __HEADER_LAYOUTS = {
+        mavutil.mavlink.PROTOCOL_MARKER_V1: (6, 2),
+        mavutil.mavlink.PROTOCOL_MARKER_V2: (10, 4),
+    }
+    __SEQUENCE_COUNT = 256
+    __CRC_SIZE = 2
+
+    @classmethod
+    def create(
+        cls, mav: mavutil.mavlink.MAVLink, msg: mavutil.mavlink.MAVLink_message, patch_format: str
+    ) -> "tuple[bool, FrameTemplate | None]":
+        """
+        mav is what to send with, such as `connection.mav`.
+        msg is the message to send, from `mav.<message>_encode()`.
+        patch_format is the struct format of the payload fields to change on every send,
+        which must lead the payload in wire order. Empty to always send msg as is.
+        """
+        if mav.signing.sign_outgoing or mav.send_callback is not None:
+            return False, None
+
+        frame = bytearray(msg.pack(mav))
+        if frame[0] not in cls.__HEADER_LAYOUTS:
+            return False, None
+
+        header_size, sequence_offset = cls.__HEADER_LAYOUTS[frame[0]]
+
+        # MAVLink 2 frames drop trailing zero bytes of the payload, put them back to patch
+        payload_size = msg.unpacker.size
+        patch = struct.Struct(patch_format)
+        if patch.size > payload_size:
+            return False, None
+
+        buffer = bytearray(header_size + payload_size + cls.__CRC_SIZE)
+        buffer[: len(frame) - cls.__CRC_SIZE] = frame[: -cls.__CRC_SIZE]
+
+        return True, FrameTemplate(
+            cls.__create_key,
+            mav,
+            buffer,
+            header_size,
+            sequence_offset,
+            payload_size,
+            msg.crc_extra,
+            patch,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        mav: mavutil.mavlink.MAVLink,
+        buffer: bytearray,
+        header_size: int,
+        sequence_offset: int,
+        payload_size: int,
+        crc_extra: int,
+        patch: struct.Struct,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is FrameTemplate.__create_key, "Use create() method"
+
+        self.__mav = mav
+        self.__buffer = buffer
+        self.__header_size = header_size
+        self.__sequence_offset = sequence_offset
+        self.__payload_size = payload_size
+        self.__crc_extra = crc_extra
+        self.__patch = patch
+        self.__is_version_2 = buffer[0] == mavutil.mavlink.PROTOCOL_MARKER_V2
+
+        # Payload after the patched fields, where a shorter frame's checksum may have been put
+        self.__tail_start = header_size + patch.size
+        self.__tail = bytes(buffer[self.__tail_start : header_size + payload_size])
+
+        # Nothing to patch, so every frame there will ever be can be packed now
+        self.__frames = None
+        if patch.size == 0:
+            self.__frames = []
+            for sequence in range(self.__SEQUENCE_COUNT):
+                self.__buffer[sequence_offset] = sequence
+                self.__frames.append(bytes(self.__frame()))
+
+    def __frame(self) -> memoryview:
+        """
+        Frame in the buffer, with the length and checksum of the current payload.
+        """
+        buffer = self.__buffer
+        header_size = self.__header_size
+
+        length = self.__payload_size
+        if self.__is_version_2:
+            buffer[self.__tail_start : header_size + length] = self.__tail
+            while length > 1 and buffer[header_size + length - 1] == 0:
+                length -= 1
+
+        buffer[1] = length
+        end = header_size + length
+        crc = frame_crc(buffer, end, self.__crc_extra)
+        buffer[end] = crc & 0xFF
+        buffer[end + 1] = crc >> 8
+
+        return memoryview(buffer)[: end + self.__CRC_SIZE]
+
+    def send(self, *values: "float | int") -> None:
+        """
+        Send the message with the leading payload fields set to values, in patch_format.
+        """
+        mav = self.__mav
+
+        if self.__frames is not None:
+            frame = self.__frames[mav.seq]
+        else:
+            self.__patch.pack_into(self.__buffer, self.__header_size, *values)
+            self.__buffer[self.__sequence_offset] = mav.seq
+            frame = self.__frame()
+
+        mav.file.write(frame)
+        mav.seq = (mav.seq + 1) % self.__SEQUENCE_COUNT
+        mav.total_packets_sent += 1
+        mav.total_bytes_sent += len(frame)
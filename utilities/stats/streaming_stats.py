@@ -0,0 +1,213 @@
+"""
+Statistics of a stream of samples in constant time and memory per sample.
+"""
+
+import math
+
+
+class RunningStatistics:
+    """
+    Mean and variance of every sample so far, per component, using Welford's algorithm
+    which stays accurate over long streams unlike keeping sums of squares.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, dimension: int) -> "tuple[bool, RunningStatistics | None]":
+        """
+        dimension is the number of components in each sample.
+        """
+        if dimension <= 0:
+            return False, None
+
+        return True, RunningStatistics(cls.__create_key, dimension)
+
+    def __init__(self, class_private_create_key: object, dimension: int) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is RunningStatistics.__create_key, "Use create() method"
+
+        self.__count = 0
+        self.__mean = [0.0] * dimension
+        # Sum of squared differences from the mean
+        self.__squared_deviations = [0.0] * dimension
+
+    def add(self, sample: "tuple[float, ...] | list[float]") -> bool:
+        """
+        Include a sample with a value for each component, fails if it has a different number.
+        """
+        if len(sample) != len(self.__mean):
+            return False
+
+        self.__count += 1
+        for i, value in enumerate(sample):
+            delta = value - self.__mean[i]
+            self.__mean[i] += delta / self.__count
+            self.__squared_deviations[i] += delta * (value - self.__mean[i])
+
+        return True
+
+    def count(self) -> int:
+        """
+        Number of samples so far.
+        """
+        return self.__count
+
+    def mean(self) -> "tuple[float, ...] | None":
+        """
+        Mean of each component, None before any samples.
+        """
+        if self.__count == 0:
+            return None
+
+        return tuple(self.__mean)
+
+    def variance(self) -> "tuple[float, ...] | None":
+        """
+        Sample variance of each component, None before two samples.
+        """
+        if self.__count < 2:
+            return None
+
+        return tuple(value / (self.__count - 1) for value in self.__squared_deviations)
+
+    def standard_deviation(self) -> "tuple[float, ...] | None":
+        """
+        Sample standard deviation of each component, None before two samples.
+        """
+        variance = self.variance()
+        if variance is None:
+            return None
+
+        return tuple(math.sqrt(value) for value in variance)
+
+
+class ExponentialAverage:
+    """
+    Exponentially weighted moving average per component, recent samples weigh the most.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, dimension: int, alpha: float) -> "tuple[bool, ExponentialAverage | None]":
+        """
+        dimension is the number of components in each sample.
+        alpha is the weight of each new sample, in (0, 1].
+        """
+        if dimension <= 0 or not 0.0 < alpha <= 1.0:
+            return False, None
+
+        return True, ExponentialAverage(cls.__create_key, dimension, alpha)
+
+    def __init__(self, class_private_create_key: object, dimension: int, alpha: float) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is ExponentialAverage.__create_key, "Use create() method"
+
+        self.__alpha = alpha
+        self.__dimension = dimension
+        self.__average = None
+
+    def add(self, sample: "tuple[float, ...] | list[float]") -> bool:
+        """
+        Include a sample with a value for each component, fails if it has a different number.
+        The first sample is the initial average.
+        """
+        if len(sample) != self.__dimension:
+            return False
+
+        if self.__average is None:
+            self.__average = list(sample)
+            return True
+
+        for i, value in enumerate(sample):
+            self.__average[i] += self.__alpha * (value - self.__average[i])
+
+        return True
+
+    def value(self) -> "tuple[float, ...] | None":
+        """
+        Average of each component, None before any samples.
+        """
+        if self.__average is None:
+            return None
+
+        return tuple(self.__average)
+
+
+class WindowAverage:
+    """
+    Mean of the most recent samples per component, kept in a ring buffer with running sums.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, dimension: int, window_size: int) -> "tuple[bool, WindowAverage | None]":
+        """
+        dimension is the number of components in each sample.
+        window_size is the number of most recent samples to average.
+        """
+        if dimension <= 0 or window_size <= 0:
+            return False, None
+
+        return True, WindowAverage(cls.__create_key, dimension, window_size)
+
+    def __init__(self, class_private_create_key: object, dimension: int, window_size: int) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WindowAverage.__create_key, "Use create() method"
+
+        self.__window = [(0.0,) * dimension] * window_size
+        self.__next_index = 0
+        self.__count = 0
+        self.__sums = [0.0] * dimension
+
+    def add(self, sample: "tuple[float, ...] | list[float]") -> bool:
+        """
+        Include a sample with a value for each component, fails if it has a different number.
+        Replaces the oldest sample if the window is full.
+        """
+        if len(sample) != len(self.__sums):
+            return False
+
+        sample = tuple(sample)
+        oldest = self.__window[self.__next_index]
+        self.__window[self.__next_index] = sample
+        self.__next_index = (self.__next_index + 1) % len(self.__window)
+
+        if self.__count < len(self.__window):
+            self.__count += 1
+            oldest = None
+
+        # Subtracting leaves rounding error behind, so resum once per lap of the window
+        if self.__next_index == 0:
+            self.__sums = [math.fsum(values) for values in zip(*self.__window)]
+            return True
+
+        for i, value in enumerate(sample):
+            self.__sums[i] += value
+            if oldest is not None:
+                self.__sums[i] -= oldest[i]
+
+        return True
+
+    def is_full(self) -> bool:
+        """
+        Whether window_size samples have been added.
+        """
+        return self.__count == len(self.__window)
+
+    def mean(self) -> "tuple[float, ...] | None":
+        """
+        Mean of each component over the window, None before any samples.
+        """
+        if self.__count == 0:
+            return None
+
+        return tuple(value / self.__count for value in self.__sums)
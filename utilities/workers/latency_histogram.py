@@ -0,0 +1,189 @@
+"""
+Latency histograms shared between processes.
+"""
+
+import multiprocessing.shared_memory
+
+import numpy as np
+
+
+class LatencyHistograms:
+    """
+    Named latency histograms in shared memory, each recorded by one process
+    and readable from any process.
+
+    Buckets are log-linear like an HDR histogram: every power of two range of microseconds
+    is split into the same number of linear buckets, so any value is within about 3%
+    of its bucket while covering 1 us to over an hour in under a thousand buckets.
+    """
+
+    __create_key = object()
+
+    # Values below 2 ** (__SUB_BUCKET_BITS + 1) us have their own bucket
+    __SUB_BUCKET_BITS = 5
+    __SUB_BUCKET_HALF_COUNT = 1 << __SUB_BUCKET_BITS
+    __SUB_BUCKET_COUNT = 2 * __SUB_BUCKET_HALF_COUNT
+    # Larger values are counted in the last bucket
+    __MAX_VALUE_BITS = 32
+    __BUCKET_COUNT = __SUB_BUCKET_COUNT + (__MAX_VALUE_BITS - __SUB_BUCKET_BITS) * (
+        __SUB_BUCKET_HALF_COUNT
+    )
+
+    # Columns after the buckets
+    __SUM_COLUMN = __BUCKET_COUNT
+    __MAX_COLUMN = __BUCKET_COUNT + 1
+    __COLUMN_COUNT = __BUCKET_COUNT + 2
+
+    REPORT_PERCENTILES = [50, 90, 99, 99.9]
+
+    @classmethod
+    def create(cls, names: "list[str]") -> "tuple[bool, LatencyHistograms | None]":
+        """
+        Creates the shared memory for a histogram per name.
+        """
+        if len(names) == 0 or len(set(names)) != len(names):
+            return False, None
+
+        try:
+            shared_memory = multiprocessing.shared_memory.SharedMemory(
+                create=True,
+                size=len(names) * cls.__COLUMN_COUNT * np.dtype(np.int64).itemsize,
+            )
+        # Catching all exceptions for library call
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            return False, None
+
+        histograms = LatencyHistograms(cls.__create_key, shared_memory, names)
+        histograms.__counts()[:] = 0
+
+        return True, histograms
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        shared_memory: multiprocessing.shared_memory.SharedMemory,
+        names: "list[str]",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is LatencyHistograms.__create_key, "Use create() method"
+
+        self.__shared_memory = shared_memory
+        self.__rows = {name: i for i, name in enumerate(names)}
+
+    def __counts(self) -> np.ndarray:
+        """
+        View of the shared memory, not kept so this object can be pickled to other processes.
+        """
+        return np.ndarray(
+            (len(self.__rows), self.__COLUMN_COUNT), dtype=np.int64, buffer=self.__shared_memory.buf
+        )
+
+    @classmethod
+    def bucket_index(cls, value: int) -> int:
+        """
+        Bucket of a value in microseconds.
+        """
+        if value < cls.__SUB_BUCKET_COUNT:
+            return max(value, 0)
+
+        shift = value.bit_length() - cls.__SUB_BUCKET_BITS - 1
+        index = (
+            cls.__SUB_BUCKET_COUNT
+            + (shift - 1) * cls.__SUB_BUCKET_HALF_COUNT
+            + (value >> shift)
+            - cls.__SUB_BUCKET_HALF_COUNT
+        )
+
+        return min(index, cls.__BUCKET_COUNT - 1)
+
+    @classmethod
+    def bucket_highest_value(cls, index: int) -> int:
+        """
+        Largest value in microseconds counted in the bucket.
+        """
+        if index < cls.__SUB_BUCKET_COUNT:
+            return index
+
+        shift = (index - cls.__SUB_BUCKET_COUNT) // cls.__SUB_BUCKET_HALF_COUNT + 1
+        sub_bucket = (
+            index - cls.__SUB_BUCKET_COUNT
+        ) % cls.__SUB_BUCKET_HALF_COUNT + cls.__SUB_BUCKET_HALF_COUNT
+
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, name: str, duration: float) -> bool:
+        """
+        Count a duration (s), only one process may record to each name.
+        """
+        row = self.__rows.get(name)
+        if row is None:
+            return False
+
+        value = max(int(duration * 1e6), 0)
+        counts = self.__counts()[row]
+        counts[self.bucket_index(value)] += 1
+        counts[self.__SUM_COLUMN] += value
+        if value > counts[self.__MAX_COLUMN]:
+            counts[self.__MAX_COLUMN] = value
+
+        return True
+
+    def count(self, name: str) -> int:
+        """
+        Number of durations recorded.
+        """
+        return int(self.__counts()[self.__rows[name], : self.__BUCKET_COUNT].sum())
+
+    def percentile(self, name: str, percent: float) -> "float | None":
+        """
+        Duration (s) that percent of the recorded durations are at or below, None if empty.
+        """
+        buckets = self.__counts()[self.__rows[name], : self.__BUCKET_COUNT]
+        cumulative = np.cumsum(buckets)
+        total = int(cumulative[-1])
+        if total == 0:
+            return None
+
+        rank = max(int(np.ceil(total * percent / 100)), 1)
+        index = int(np.searchsorted(cumulative, rank))
+
+        return self.bucket_highest_value(index) / 1e6
+
+    def report(self) -> "list[str]":
+        """
+        One line per histogram with its count, mean, percentiles and max in milliseconds.
+        """
+        counts = self.__counts()
+        lines = []
+        for name, row in self.__rows.items():
+            count = self.count(name)
+            if count == 0:
+                lines.append(f"{name}: no samples")
+                continue
+
+            mean = counts[row, self.__SUM_COLUMN] / count / 1000
+            percentiles = ", ".join(
+                f"p{percent:g} {self.percentile(name, percent) * 1000:.3f}"
+                for percent in self.REPORT_PERCENTILES
+            )
+            lines.append(
+                f"{name}: n {count}, mean {mean:.3f}, {percentiles}, "
+                f"max {counts[row, self.__MAX_COLUMN] / 1000:.3f} ms"
+            )
+
+        return lines
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory.
+        """
+        self.__shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, call once from the creating process after all workers exit.
+        """
+        self.__shared_memory.unlink()
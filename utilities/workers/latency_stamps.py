@@ -0,0 +1,100 @@
+"""
+Times a sample passes each stage of the pipeline.
+"""
+
+import enum
+import math
+import struct
+import time
+
+
+class Stage(enum.IntEnum):
+    """
+    Pipeline stages in the order a sample passes them.
+    """
+
+    # Frame parsed from the link
+    RECEIVE = 0
+    # Fused into TelemetryData
+    DECODE = 1
+    # Handed to the next worker (queue or latest value slot)
+    ENQUEUE = 2
+    # Taken by the next worker
+    DEQUEUE = 3
+    # Decision made
+    DECISION = 4
+    # Command sent
+    SEND = 5
+
+
+# One histogram per stage after the first, named after the stage a duration ends at,
+# and one for the whole pipeline
+HISTOGRAM_NAMES = [stage.name.lower() for stage in Stage if stage != Stage.RECEIVE] + ["total"]
+
+
+class LatencyStamps:
+    """
+    Time (s since epoch) each stage was reached, or None for stages not reached.
+    """
+
+    __slots__ = ("__times",)
+
+    # Times in Stage order, NaN for stages not reached
+    RECORD_FORMAT = struct.Struct(f"<{len(Stage)}d")
+
+    def __init__(self, times: "list[float] | None" = None) -> None:
+        """
+        times are in Stage order with NaN for stages not reached, None for no stages reached.
+        """
+        self.__times = [math.nan] * len(Stage) if times is None else times
+
+    def stamp(self, stage: Stage, stamp_time: "float | None" = None) -> None:
+        """
+        Mark the stage as reached at stamp_time, now if None.
+        """
+        self.__times[stage] = time.time() if stamp_time is None else stamp_time
+
+    def get(self, stage: Stage) -> "float | None":
+        """
+        Time the stage was reached.
+        """
+        value = self.__times[stage]
+        return None if math.isnan(value) else value
+
+    def durations(self) -> "list[tuple[str, float]]":
+        """
+        Time (s) spent reaching each stage from the previous reached one, named as in HISTOGRAM_NAMES,
+        and the total from the first to the last reached stage.
+        """
+        durations = []
+        first_time = None
+        previous_time = None
+        for stage in Stage:
+            value = self.__times[stage]
+            if math.isnan(value):
+                continue
+
+            if previous_time is None:
+                first_time = value
+            else:
+                durations.append((stage.name.lower(), value - previous_time))
+
+            previous_time = value
+
+        if len(durations) > 0:
+            durations.append(("total", previous_time - first_time))
+
+        return durations
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs into a fixed size record.
+        """
+        return self.RECORD_FORMAT.pack(*self.__times)
+
+    @classmethod
+    def from_bytes(cls, record: "bytes | bytearray | memoryview") -> "LatencyStamps":
+        """
+        Unpacks a record created by to_bytes().
+        """
+        return cls(list(cls.RECORD_FORMAT.unpack(record)))
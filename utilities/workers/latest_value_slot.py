@@ -0,0 +1,168 @@
+"""
+Latest value shared between processes.
+"""
+
+import multiprocessing.shared_memory
+import struct
+import time
+
+
+class LatestValueSlot:
+    """
+    Holds the most recent fixed size record in shared memory, for a single writer process
+    and any number of reader processes.
+
+    Uses a sequence lock: the writer makes the sequence number odd while writing and even after,
+    and a reader retries if the number was odd or changed while it was copying.
+    Writing never waits for readers, and reading never returns a partially written record.
+
+    Readers also mark the version they read, so the writer can count the records it overwrote
+    before any reader read them, which is how far the readers lag behind.
+    """
+
+    __create_key = object()
+
+    __SEQUENCE_FORMAT = struct.Struct("<Q")
+    # Latest version read by any reader, after the sequence number
+    __READ_VERSION_OFFSET = __SEQUENCE_FORMAT.size
+    __RECORD_OFFSET = 2 * __SEQUENCE_FORMAT.size
+    # Retries while the writer is mid-publish: yield first, then back off exponentially
+    __READ_ATTEMPTS = 20
+    __YIELD_ATTEMPTS = 4
+    __INITIAL_BACKOFF = 0.00001  # seconds
+    __MAX_BACKOFF = 0.001  # seconds
+
+    @classmethod
+    def create(cls, record_size: int) -> "tuple[bool, LatestValueSlot | None]":
+        """
+        Creates the shared memory for records of record_size bytes.
+        """
+        if record_size <= 0:
+            return False, None
+
+        try:
+            shared_memory = multiprocessing.shared_memory.SharedMemory(
+                create=True, size=cls.__RECORD_OFFSET + record_size
+            )
+        # Catching all exceptions for library call
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            return False, None
+
+        return True, LatestValueSlot(cls.__create_key, shared_memory, record_size)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        shared_memory: multiprocessing.shared_memory.SharedMemory,
+        record_size: int,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is LatestValueSlot.__create_key, "Use create() method"
+
+        self.__shared_memory = shared_memory
+        self.__record_location = slice(self.__RECORD_OFFSET, self.__RECORD_OFFSET + record_size)
+        self.record_size = record_size
+
+        # Only counted by the writer
+        self.__overwritten_count = 0
+
+    def publish(self, record: bytes) -> bool:
+        """
+        Replaces the value with the record, only one process may publish.
+        """
+        if len(record) != self.record_size:
+            return False
+
+        buffer = self.__shared_memory.buf
+        sequence = self.__SEQUENCE_FORMAT.unpack_from(buffer)[0]
+
+        read_version = self.__SEQUENCE_FORMAT.unpack_from(buffer, self.__READ_VERSION_OFFSET)[0]
+        if read_version < sequence // 2:
+            self.__overwritten_count += 1
+
+        self.__SEQUENCE_FORMAT.pack_into(buffer, 0, sequence + 1)
+        buffer[self.__record_location] = record
+        self.__SEQUENCE_FORMAT.pack_into(buffer, 0, sequence + 2)
+
+        return True
+
+    def read(self) -> "tuple[bool, bytes | None, int]":
+        """
+        Copies the latest record.
+
+        Returns whether a record was read, the record, and its version which increases
+        with every publish (0 if nothing has been published yet).
+        Fails if nothing has been published yet, or if every attempt overlapped a publish.
+        """
+        buffer = self.__shared_memory.buf
+
+        backoff = self.__INITIAL_BACKOFF
+        for attempt in range(self.__READ_ATTEMPTS):
+            if attempt >= self.__YIELD_ATTEMPTS:
+                time.sleep(backoff)
+                backoff = min(2 * backoff, self.__MAX_BACKOFF)
+            elif attempt > 0:
+                # Let the writer finish if it shares this core
+                time.sleep(0)
+
+            sequence_before = self.__SEQUENCE_FORMAT.unpack_from(buffer)[0]
+            if sequence_before % 2 == 1:
+                continue
+
+            record = bytes(buffer[self.__record_location])
+
+            sequence_after = self.__SEQUENCE_FORMAT.unpack_from(buffer)[0]
+            if sequence_before == sequence_after:
+                if sequence_before == 0:
+                    return False, None, 0
+
+                version = sequence_before // 2
+                self.__SEQUENCE_FORMAT.pack_into(buffer, self.__READ_VERSION_OFFSET, version)
+
+                return True, record, version
+
+        return False, None, 0
+
+    def take_overwritten_count(self) -> int:
+        """
+        Number of records this writer replaced before any reader read them,
+        since the last call. Only meaningful in the publishing process.
+        """
+        overwritten_count = self.__overwritten_count
+        self.__overwritten_count = 0
+
+        return overwritten_count
+
+    def wait_newer(
+        self, version: int, timeout: float, poll_period: float
+    ) -> "tuple[bool, bytes | None, int]":
+        """
+        Reads the latest record once its version is greater than the given version.
+
+        Returns False if there is no newer record before the timeout (seconds).
+        """
+        start_time = time.time()
+        while True:
+            result, record, new_version = self.read()
+            if result and new_version > version:
+                return True, record, new_version
+
+            if time.time() - start_time >= timeout:
+                return False, None, version
+
+            time.sleep(poll_period)
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory.
+        """
+        self.__shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, call once from the creating process after all workers exit.
+        """
+        self.__shared_memory.unlink()
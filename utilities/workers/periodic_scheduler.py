@@ -0,0 +1,215 @@
+"""
+Running periodic tasks on exact periods.
+"""
+
+import asyncio
+import heapq
+import time
+import typing
+
+from utilities.stats import streaming_stats
+from . import worker_controller
+
+
+class PeriodicTask:
+    """
+    Task registered with the scheduler, and how punctually it has run.
+    """
+
+    __slots__ = ("name", "period", "callback", "lateness", "max_lateness", "missed_count")
+
+    def __init__(
+        self,
+        name: str,
+        period: float,
+        callback: "typing.Callable[[], None]",
+        lateness: streaming_stats.RunningStatistics,
+    ) -> None:
+        self.name = name
+        self.period = period
+        self.callback = callback
+
+        # How long after its deadline each run started (s)
+        self.lateness = lateness
+        self.max_lateness = 0.0
+
+        # Deadlines skipped because the previous run ended after them
+        self.missed_count = 0
+
+
+class PeriodicScheduler:
+    """
+    Runs each task at fixed deadlines on the monotonic clock, so time spent in the tasks
+    does not add up to drift. Sleeps until the next deadline or until main requests an exit,
+    whichever is first.
+
+    A run that ends after the next deadlines skips them instead of running the task
+    back to back to catch up.
+
+    Runs either in its own loop with run(), as a task on an asyncio event loop
+    with run_async(), or from a worker's own loop that waits on something else with run_due().
+    """
+
+    __create_key = object()
+
+    # Wait with no tasks
+    __IDLE_DELAY = 1  # seconds
+
+    @classmethod
+    def create(
+        cls, controller: worker_controller.WorkerController
+    ) -> "tuple[bool, PeriodicScheduler | None]":
+        """
+        controller is how the main process communicates to the worker running the scheduler.
+        """
+        if controller is None:
+            return False, None
+
+        return True, PeriodicScheduler(cls.__create_key, controller)
+
+    def __init__(
+        self, class_private_create_key: object, controller: worker_controller.WorkerController
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is PeriodicScheduler.__create_key, "Use create() method"
+
+        self.__controller = controller
+        self.__tasks: "dict[str, PeriodicTask]" = {}
+
+        # (deadline, order added, task), order breaks ties between equal deadlines
+        self.__deadlines: "list[tuple[float, int, PeriodicTask]]" = []
+
+    def add(
+        self,
+        name: str,
+        period: float,
+        callback: "typing.Callable[[], None]",
+        start_delay: float = 0.0,
+    ) -> bool:
+        """
+        Run callback every period (s), starting after start_delay (s).
+        name identifies the task in reports.
+        """
+        if period <= 0.0 or start_delay < 0.0 or name in self.__tasks:
+            return False
+
+        result, lateness = streaming_stats.RunningStatistics.create(1)
+        if not result:
+            return False
+
+        task = PeriodicTask(name, period, callback, lateness)
+        self.__tasks[name] = task
+        heapq.heappush(self.__deadlines, (time.monotonic() + start_delay, len(self.__tasks), task))
+
+        return True
+
+    def run(self) -> None:
+        """
+        Run the tasks until main requests an exit.
+        """
+        while not self.__controller.is_exit_requested():
+            self.__controller.check_pause()
+
+            delay = self.__run_next()
+            if delay > 0.0:
+                # Check for a pause again before running anything
+                self.__controller.wait_for_exit(delay)
+
+    async def run_async(self, stop: asyncio.Event, resumed: asyncio.Event) -> None:
+        """
+        Run the tasks on the event loop until stop is set, holding them while resumed is clear.
+        The tasks run on the event loop, so they must not block.
+        """
+        while not stop.is_set():
+            await resumed.wait()
+
+            delay = self.__run_next()
+            if delay <= 0.0:
+                # Let the other tasks on the event loop run between back to back deadlines
+                await asyncio.sleep(0)
+                continue
+
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def run_due(self) -> float:
+        """
+        Run the tasks that are due now without waiting, each at most once.
+
+        Returns how long (s) until the next deadline, 0 if one is already due again.
+        """
+        delay = self.__IDLE_DELAY
+        for _ in range(max(len(self.__tasks), 1)):
+            delay = self.__run_next()
+            if delay > 0.0:
+                break
+
+        return delay
+
+    def __run_next(self) -> float:
+        """
+        Runs the task with the earliest deadline if it is due.
+
+        Returns how long (s) until the next deadline, 0 if it is already due.
+        """
+        if len(self.__deadlines) == 0:
+            return self.__IDLE_DELAY
+
+        deadline, order, task = self.__deadlines[0]
+        delay = deadline - time.monotonic()
+        if delay > 0.0:
+            return delay
+
+        lateness = -delay
+        task.lateness.add((lateness,))
+        task.max_lateness = max(task.max_lateness, lateness)
+
+        task.callback()
+
+        # Next deadline after now, on the same grid as the first
+        missed_count = int((time.monotonic() - deadline) // task.period)
+        task.missed_count += missed_count
+        next_deadline = deadline + (missed_count + 1) * task.period
+        heapq.heapreplace(self.__deadlines, (next_deadline, order, task))
+
+        return max(self.__deadlines[0][0] - time.monotonic(), 0.0)
+
+    def lateness(self, name: str) -> "tuple[float, float, float] | None":
+        """
+        Mean, standard deviation and maximum (s) of how late the task started,
+        None if it has not run.
+        """
+        task = self.__tasks.get(name)
+        if task is None or task.lateness.count() == 0:
+            return None
+
+        (mean,) = task.lateness.mean()  # type: ignore
+        standard_deviation = task.lateness.standard_deviation()
+        # Lateness of a single run does not vary
+        if standard_deviation is None:
+            standard_deviation = (0.0,)
+
+        return mean, standard_deviation[0], task.max_lateness
+
+    def report(self) -> "list[str]":
+        """
+        One line per task that has run, with its run count, missed deadlines and lateness.
+        """
+        lines = []
+        for name, task in self.__tasks.items():
+            lateness = self.lateness(name)
+            if lateness is None:
+                continue
+
+            mean, standard_deviation, maximum = lateness
+            lines.append(
+                f"{name}: runs {task.lateness.count()}, missed {task.missed_count}, "
+                f"lateness mean {mean * 1000:.3f} ms, sd {standard_deviation * 1000:.3f} ms, "
+                f"max {maximum * 1000:.3f} ms"
+            )
+
+        return lines
@@ -0,0 +1,109 @@
+"""
+Queue straight over a pipe.
+"""
+
+import multiprocessing as mp
+import pickle
+import queue
+import time
+
+
+class PipeQueue:
+    """
+    Queue over a one way pipe, with the part of the queue.Queue interface workers use.
+
+    The putting process pickles each item straight into the pipe and the getting process reads
+    it out, with no feeder thread like mp.Queue and no server process like a manager queue.
+    Like mp.Queue, it can only be shared with processes as a Process argument.
+
+    `maxsize <= 0` means infinite size, though a put blocks while the pipe's buffer is full.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.maxsize = maxsize
+
+        self.__reader, self.__writer = mp.Pipe(duplex=False)
+        # Whole items only, several processes may put or get at once
+        self.__read_lock = mp.Lock()
+        self.__write_lock = mp.Lock()
+        # Free places, None for infinite size
+        self.__free = mp.BoundedSemaphore(maxsize) if maxsize > 0 else None
+        self.__size = mp.Value("i", 0)
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Put an item, waiting up to timeout (s, None for forever) for a free place.
+
+        Raises queue.Full if there was none.
+        """
+        if self.__free is not None and not self.__free.acquire(block, timeout):
+            raise queue.Full
+
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+
+        # Counted first, so it is never negative while an item is read before being counted
+        with self.__size.get_lock():
+            self.__size.value += 1
+
+        with self.__write_lock:
+            self.__writer.send_bytes(data)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Put an item if there is a free place, otherwise raises queue.Full.
+        """
+        self.put(item, False)
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Get the oldest item, waiting up to timeout (s, None for forever) for one.
+
+        Raises queue.Empty if none came.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.__read_lock.acquire(block, timeout):
+            raise queue.Empty
+
+        try:
+            wait = 0.0
+            if block:
+                wait = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+            if not self.__reader.poll(wait):
+                raise queue.Empty
+
+            data = self.__reader.recv_bytes()
+        finally:
+            self.__read_lock.release()
+
+        with self.__size.get_lock():
+            self.__size.value -= 1
+
+        if self.__free is not None:
+            self.__free.release()
+
+        return pickle.loads(data)
+
+    def get_nowait(self) -> object:
+        """
+        Get the oldest item if there is one, otherwise raises queue.Empty.
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items, it can change as soon as it is read.
+        """
+        return self.__size.value
+
+    def empty(self) -> bool:
+        """
+        Whether there are approximately no items.
+        """
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        """
+        Whether there are approximately maxsize items.
+        """
+        return 0 < self.maxsize <= self.qsize()
@@ -2,10 +2,28 @@
 Queue.
 """
 
+import enum
+import multiprocessing as mp
 import multiprocessing.managers
 import queue
 import time
 
+from . import pipe_queue
+
+
+class QueueBackend(enum.Enum):
+    """
+    What carries the items between processes.
+    """
+
+    # Proxy to a queue in the manager's server process, every put and get is a round trip to it.
+    # The only one that can be passed through another queue
+    MANAGER = 0
+    # mp.Queue, a background thread in the putting process feeds a pipe
+    QUEUE = 1
+    # pipe_queue.PipeQueue, the putting process writes straight into a pipe
+    PIPE = 2
+
 
 class QueueProxyWrapper:
     """
@@ -17,9 +35,45 @@ class QueueProxyWrapper:
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, maxsize: int = 0) -> None:
-        self.queue = mp_manager.Queue(maxsize)
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager | None,
+        maxsize: int = 0,
+        backend: QueueBackend = QueueBackend.MANAGER,
+    ) -> None:
+        """
+        mp_manager is only needed for the manager backend.
+        """
+        if backend == QueueBackend.MANAGER:
+            assert mp_manager is not None, "Manager backend needs a manager"
+            self.queue = mp_manager.Queue(maxsize)
+        elif backend == QueueBackend.QUEUE:
+            self.queue = mp.Queue(maxsize)
+        else:
+            self.queue = pipe_queue.PipeQueue(maxsize)
+
         self.maxsize = maxsize
+        self.backend = backend
+
+    def get_available(self, timeout: float) -> list:
+        """
+        Waits for an item, then also takes every item queued behind it, oldest first.
+
+        timeout: Time waiting in seconds for the first item, returns an empty list if none came.
+        """
+        try:
+            items = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        # Only what is queued now, a fast producer would otherwise keep this draining forever
+        try:
+            for _ in range(self.queue.qsize()):
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        return items
 
     def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
         """
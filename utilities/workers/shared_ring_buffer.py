@@ -0,0 +1,236 @@
+"""
+Queue of fixed size records in shared memory.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import queue
+import struct
+import time
+
+
+class SharedRingBuffer:  # pylint: disable=too-many-instance-attributes
+    """
+    Bounded queue of fixed size records copied straight into preallocated slots of a ring
+    in shared memory, with no pickling, and put, get and get_nowait like QueueProxyWrapper.queue.
+
+    The head (next slot to write) and tail (next slot to read) are in the shared memory.
+    Two semaphores count the filled and free slots, so a full or empty queue waits without polling,
+    and a slot is only counted as filled once it is written, or free once it is read.
+    With a single producer and a single consumer nothing else is locked;
+    with several producers (or consumers) a lock makes each put (or get) whole and in order.
+
+    None can be put as a sentinel, like on QueueProxyWrapper.
+    """
+
+    __create_key = object()
+
+    __INDEX_FORMAT = struct.Struct("<Q")
+    # Head and tail on separate cache lines, as the producer and consumer each write their own
+    __HEAD_OFFSET = 0
+    __TAIL_OFFSET = 64
+    __SLOTS_OFFSET = 128
+    # First byte of each slot
+    __RECORD = 0
+    __SENTINEL = 1
+
+    __QUEUE_TIMEOUT = 0.1  # seconds
+    __QUEUE_DELAY = 0.1  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        record_size: int,
+        capacity: int,
+        multiple_producers: bool = False,
+        multiple_consumers: bool = False,
+    ) -> "tuple[bool, SharedRingBuffer | None]":
+        """
+        Creates the shared memory for capacity records of record_size bytes.
+
+        multiple_producers is whether more than one process puts,
+        multiple_consumers is whether more than one process gets.
+        """
+        if record_size <= 0 or capacity <= 0:
+            return False, None
+
+        try:
+            shared_memory = multiprocessing.shared_memory.SharedMemory(
+                create=True, size=cls.__SLOTS_OFFSET + capacity * (1 + record_size)
+            )
+        # Catching all exceptions for library call
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            return False, None
+
+        return True, SharedRingBuffer(
+            cls.__create_key,
+            shared_memory,
+            record_size,
+            capacity,
+            multiple_producers,
+            multiple_consumers,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        shared_memory: multiprocessing.shared_memory.SharedMemory,
+        record_size: int,
+        capacity: int,
+        multiple_producers: bool,
+        multiple_consumers: bool,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is SharedRingBuffer.__create_key, "Use create() method"
+
+        self.__shared_memory = shared_memory
+        self.record_size = record_size
+        self.maxsize = capacity
+        self.__slot_size = 1 + record_size
+
+        self.__INDEX_FORMAT.pack_into(shared_memory.buf, self.__HEAD_OFFSET, 0)
+        self.__INDEX_FORMAT.pack_into(shared_memory.buf, self.__TAIL_OFFSET, 0)
+
+        self.__filled = mp.Semaphore(0)
+        self.__free = mp.Semaphore(capacity)
+        self.__put_lock = mp.Lock() if multiple_producers else None
+        self.__get_lock = mp.Lock() if multiple_consumers else None
+
+    def put(
+        self, record: "bytes | None", block: bool = True, timeout: "float | None" = None
+    ) -> None:
+        """
+        Copy the record into the next slot, waiting up to timeout (s, None for forever)
+        for a free one.
+
+        Raises queue.Full if there was none, ValueError if the record is not record_size bytes.
+        """
+        if record is not None and len(record) != self.record_size:
+            raise ValueError(f"Record is {len(record)} bytes, not {self.record_size}")
+
+        if not self.__free.acquire(block, timeout):
+            raise queue.Full
+
+        if self.__put_lock is not None:
+            with self.__put_lock:
+                self.__write(record)
+        else:
+            self.__write(record)
+
+        # Only after the record is whole, so the consumer never reads it half written
+        self.__filled.release()
+
+    def put_nowait(self, record: "bytes | None") -> None:
+        """
+        Copy the record into the next slot if there is a free one, otherwise raises queue.Full.
+        """
+        self.put(record, False)
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> "bytes | None":
+        """
+        Copy out the oldest record, waiting up to timeout (s, None for forever) for one.
+
+        Raises queue.Empty if none came.
+        """
+        if not self.__filled.acquire(block, timeout):
+            raise queue.Empty
+
+        if self.__get_lock is not None:
+            with self.__get_lock:
+                record = self.__read()
+        else:
+            record = self.__read()
+
+        # Only after the record is copied out, so the producer never overwrites it first
+        self.__free.release()
+
+        return record
+
+    def get_nowait(self) -> "bytes | None":
+        """
+        Copy out the oldest record if there is one, otherwise raises queue.Empty.
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of records, it can change as soon as it is read.
+        """
+        buffer = self.__shared_memory.buf
+        head = self.__INDEX_FORMAT.unpack_from(buffer, self.__HEAD_OFFSET)[0]
+        tail = self.__INDEX_FORMAT.unpack_from(buffer, self.__TAIL_OFFSET)[0]
+
+        return max(head - tail, 0)
+
+    def empty(self) -> bool:
+        """
+        Whether there are approximately no records.
+        """
+        return self.qsize() == 0
+
+    def fill_and_drain_queue(self) -> None:
+        """
+        Frees workers blocked on the queue at exit, like QueueProxyWrapper.fill_and_drain_queue():
+        fills with sentinels (None) while there is room, waits for consumers to take them,
+        then takes everything left.
+        """
+        try:
+            for _ in range(self.maxsize):
+                self.put(None, timeout=self.__QUEUE_TIMEOUT)
+        except queue.Full:
+            pass
+
+        time.sleep(self.__QUEUE_DELAY)
+
+        try:
+            for _ in range(self.maxsize):
+                self.get(timeout=self.__QUEUE_TIMEOUT)
+        except queue.Empty:
+            pass
+
+    def __write(self, record: "bytes | None") -> None:
+        """
+        Fill the slot at the head and move the head on, the caller has a free slot.
+        """
+        buffer = self.__shared_memory.buf
+        head = self.__INDEX_FORMAT.unpack_from(buffer, self.__HEAD_OFFSET)[0]
+        start = self.__SLOTS_OFFSET + (head % self.maxsize) * self.__slot_size
+
+        if record is None:
+            buffer[start] = self.__SENTINEL
+        else:
+            buffer[start] = self.__RECORD
+            buffer[start + 1 : start + self.__slot_size] = record
+
+        self.__INDEX_FORMAT.pack_into(buffer, self.__HEAD_OFFSET, head + 1)
+
+    def __read(self) -> "bytes | None":
+        """
+        Copy the slot at the tail and move the tail on, the caller has a filled slot.
+        """
+        buffer = self.__shared_memory.buf
+        tail = self.__INDEX_FORMAT.unpack_from(buffer, self.__TAIL_OFFSET)[0]
+        start = self.__SLOTS_OFFSET + (tail % self.maxsize) * self.__slot_size
+
+        record = None
+        if buffer[start] == self.__RECORD:
+            record = bytes(buffer[start + 1 : start + self.__slot_size])
+
+        self.__INDEX_FORMAT.pack_into(buffer, self.__TAIL_OFFSET, tail + 1)
+
+        return record
+
+    def close(self) -> None:
+        """
+        Detaches this process from the shared memory.
+        """
+        self.__shared_memory.close()
+
+    def unlink(self) -> None:
+        """
+        Frees the shared memory, call once from the creating process after all workers exit.
+        """
+        self.__shared_memory.unlink()
@@ -16,11 +16,11 @@ class WorkerController:
 
     def __init__(self) -> None:
         """
-        Constructor creates internal queue and semaphore.
+        Constructor creates internal event and semaphore.
         """
         self.__pause = mp.BoundedSemaphore(1)
         self.__is_paused = False
-        self.__exit_queue = mp.Queue(1)
+        self.__exit_event = mp.Event()
 
     def request_pause(self) -> None:
         """
@@ -51,8 +51,7 @@ class WorkerController:
         Does nothing if already requested.
         """
         time.sleep(self.__QUEUE_DELAY)
-        if self.__exit_queue.empty():
-            self.__exit_queue.put(None)
+        self.__exit_event.set()
 
     def clear_exit(self) -> None:
         """
@@ -60,8 +59,7 @@ class WorkerController:
         Does nothing if already cleared.
         """
         time.sleep(self.__QUEUE_DELAY)
-        if not self.__exit_queue.empty():
-            _ = self.__exit_queue.get()
+        self.__exit_event.clear()
 
     def is_exit_requested(self) -> bool:
         """
@@ -69,4 +67,12 @@ class WorkerController:
         There is a race condition, but it's fine because the worker process
         will do at most 1 additional loop.
         """
-        return not self.__exit_queue.empty()
+        return self.__exit_event.is_set()
+
+    def wait_for_exit(self, timeout: float) -> bool:
+        """
+        Blocks worker until main requests it to exit or the timeout (s) passes,
+        for workers to sleep without delaying their exit.
+        Returns whether main has requested the worker process to exit.
+        """
+        return self.__exit_event.wait(timeout)